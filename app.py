@@ -1,13 +1,37 @@
-from flask import Flask, request, render_template, redirect, url_for, flash, jsonify
+from flask import Flask, Request, current_app, request, render_template, redirect, url_for, flash, jsonify, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import json
+import time
 import logging
+import multiprocessing
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.metrics import ERRORS, METRICS
+from utils.summary_stats import summary_statistics
+
+# Route that streams uploaded files to disk; every other body is read into memory
+UPLOAD_ENDPOINT = 'summarize_text'
+
+class SummarizerRequest(Request):
+    """Request whose body limit depends on whether the route streams uploads"""
+    
+    @property
+    def max_content_length(self):
+        if self.endpoint == UPLOAD_ENDPOINT:
+            return current_app.config['MAX_UPLOAD_LENGTH']
+        return current_app.config['MAX_CONTENT_LENGTH']
 
 # Initialize Flask app
 app = Flask(__name__)
+app.request_class = SummarizerRequest
 app.secret_key = 'your-secret-key-change-this-in-production'
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# JSON and form bodies are parsed in memory, so they always keep a limit
+app.config['MAX_CONTENT_LENGTH'] = int(float(os.environ.get('SUMMARIZER_MAX_BODY_MB', 16)) * 1024 * 1024)
+# Uploads are streamed to disk, so their limit can be raised (SUMMARIZER_MAX_UPLOAD_MB=0 lifts it)
+app.config['MAX_UPLOAD_LENGTH'] = int(float(os.environ.get('SUMMARIZER_MAX_UPLOAD_MB', 16)) * 1024 * 1024) or None
 
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -16,15 +40,87 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Characters of an uploaded file shown as the original text on the result page
+PREVIEW_CHARS = 20000
+
+def _env_list(name):
+    """Read a comma-separated list from the environment"""
+    items = [item.strip() for item in os.environ.get(name, '').split(',') if item.strip()]
+    return items or None
+
+def _env_mapping(name):
+    """Read comma-separated key=value pairs from the environment"""
+    pairs = [item.split('=', 1) for item in _env_list(name) or [] if '=' in item]
+    return {key.strip(): value.strip() for key, value in pairs} or None
+
+def _env_float(name):
+    """Read an optional number from the environment"""
+    value = os.environ.get(name)
+    return float(value) if value else None
+
 # Initialize components with error handling
 try:
-    from models.summarizer import TextSummarizer
+    from models.summarizer import TextSummarizer, TextTooShortError
     from utils.text_processor import TextProcessor
     from utils.file_handler import FileHandler
+    from utils.url_fetcher import URLFetcher
+    from utils.cache import SummaryCache
+    from utils.jobs import JobManager
     
     text_processor = TextProcessor()
-    file_handler = FileHandler()
-    summarizer = TextSummarizer()
+    file_handler = FileHandler(
+        pdf_workers=int(os.environ['SUMMARIZER_PDF_WORKERS']) if os.environ.get('SUMMARIZER_PDF_WORKERS') else None,
+        max_pdf_pages=int(os.environ['SUMMARIZER_MAX_PDF_PAGES']) if os.environ.get('SUMMARIZER_MAX_PDF_PAGES') else None,
+        # Pages fetched again are revalidated against SUMMARIZER_URL_CACHE_DIR instead of re-downloaded
+        url_fetcher=URLFetcher(
+            cache_dir=os.environ.get('SUMMARIZER_URL_CACHE_DIR'),
+            max_per_host=int(os.environ.get('SUMMARIZER_URL_MAX_PER_HOST', 4)),
+            max_workers=int(os.environ.get('SUMMARIZER_URL_WORKERS', 16))
+        )
+    )
+    # Summaries of repeated documents; SUMMARIZER_CACHE_DB adds a disk tier shared by workers
+    cache_size = int(os.environ.get('SUMMARIZER_CACHE_SIZE', 256))
+    summary_cache = None
+    if cache_size > 0:
+        summary_cache = SummaryCache(
+            max_entries=cache_size,
+            db_path=os.environ.get('SUMMARIZER_CACHE_DB'),
+            ttl_seconds=_env_float('SUMMARIZER_CACHE_TTL'),
+            max_disk_mb=_env_float('SUMMARIZER_CACHE_MAX_MB')
+        )
+    
+    # Chunk summaries let lightly edited documents reuse most of their inference
+    chunk_cache_size = int(os.environ.get('SUMMARIZER_CHUNK_CACHE_SIZE', 2048))
+    chunk_cache = None
+    if chunk_cache_size > 0:
+        chunk_cache = SummaryCache(
+            max_entries=chunk_cache_size,
+            db_path=os.environ.get('SUMMARIZER_CACHE_DB'),
+            ttl_seconds=_env_float('SUMMARIZER_CACHE_TTL'),
+            max_disk_mb=_env_float('SUMMARIZER_CACHE_MAX_MB')
+        )
+    
+    # Models load on first use; SUMMARIZER_WARMUP pre-loads the ones a deployment serves
+    summarizer = TextSummarizer(
+        allowed_models=_env_list('SUMMARIZER_MODELS'),
+        memory_budget_mb=_env_float('SUMMARIZER_MEMORY_BUDGET_MB'),
+        # Spawned extraction workers re-import this module when it is run directly; they need no models
+        warm_up=_env_list('SUMMARIZER_WARMUP') if multiprocessing.parent_process() is None else None,
+        batch_size=int(os.environ.get('SUMMARIZER_BATCH_SIZE', 8)),
+        use_scheduler=os.environ.get('SUMMARIZER_SCHEDULER', '0') == '1',
+        max_batch_size=int(os.environ.get('SUMMARIZER_MAX_BATCH_SIZE', 16)),
+        max_wait_ms=float(os.environ.get('SUMMARIZER_MAX_WAIT_MS', 10)),
+        chunk_overlap=int(os.environ.get('SUMMARIZER_CHUNK_OVERLAP', 0)),
+        cache=summary_cache,
+        chunk_cache=chunk_cache,
+        backends=_env_mapping('SUMMARIZER_BACKENDS'),
+        onnx_dir=os.environ.get('SUMMARIZER_ONNX_DIR'),
+        reduce_fan_in=int(os.environ.get('SUMMARIZER_REDUCE_FAN_IN', 8)),
+        reduce_max_depth=int(os.environ.get('SUMMARIZER_REDUCE_MAX_DEPTH', 3)),
+        generation_profile=os.environ.get('SUMMARIZER_PROFILE', 'balanced'),
+        deadline_s=_env_float('SUMMARIZER_DEADLINE_S')
+    )
+    job_manager = JobManager(max_workers=int(os.environ.get('SUMMARIZER_JOB_WORKERS', 2)))
     logger.info("All components initialized successfully")
 except Exception as e:
     logger.error(f"Error initializing components: {e}")
@@ -32,22 +128,37 @@ except Exception as e:
     text_processor = None
     file_handler = None
     summarizer = None
+    job_manager = None
 
 @app.route('/')
 def index():
     """Main page with input form"""
-    return render_template('index.html')
+    max_bytes = app.config['MAX_UPLOAD_LENGTH']
+    return render_template('index.html', max_upload_mb=max_bytes // (1024 * 1024) if max_bytes else None)
+
+def _text_preview(blocks, max_chars=PREVIEW_CHARS):
+    """Return the first characters of streamed text without reading the rest"""
+    preview = ''
+    with closing(blocks):
+        for block in blocks:
+            preview += block
+            if len(preview) >= max_chars:
+                break
+    return preview[:max_chars].strip()
 
 @app.route('/summarize', methods=['POST'])
 def summarize_text():
     """Handle text summarization requests"""
+    upload_path = None
     try:
         # Get input method
         input_method = request.form.get('input_method', 'text')
         summary_length = int(request.form.get('summary_length', 3))
         model_type = request.form.get('model_type', 'bart')
+        profile = request.form.get('profile') or None
         
         text_content = ""
+        source = None  # What is summarized when it is not text_content itself
         
         if input_method == 'text':
             # Direct text input
@@ -56,26 +167,56 @@ def summarize_text():
                 flash('Please enter some text to summarize.', 'error')
                 return redirect(url_for('index'))
         
-        # Preprocess text
-        if text_processor:
-            processed_text = text_processor.preprocess(text_content)
-        else:
-            processed_text = text_content
+        elif input_method == 'file':
+            upload = request.files.get('file')
+            if not upload or not upload.filename:
+                flash('Please choose a file to upload.', 'error')
+                return redirect(url_for('index'))
+            if not file_handler or not file_handler.allowed_file(upload.filename):
+                flash('Please upload a PDF, TXT or DOCX file.', 'error')
+                return redirect(url_for('index'))
+            
+            upload_path = file_handler.save_upload(
+                upload.stream, app.config['UPLOAD_FOLDER'], upload.filename.rsplit('.', 1)[1]
+            )
+            # The file is read again block by block while summarizing; only a preview is kept
+            text_content = _text_preview(file_handler.iter_text(upload_path))
+            if not text_content:
+                flash('Could not extract any text from that file.', 'error')
+                return redirect(url_for('index'))
+            source = file_handler.iter_text(upload_path)
         
-        if len(processed_text.split()) < 10:
-            flash('Text is too short for meaningful summarization. Please provide longer text.', 'error')
-            return redirect(url_for('index'))
+        elif input_method == 'url':
+            url = request.form.get('url_input', '').strip()
+            if not url:
+                flash('Please enter a URL to summarize.', 'error')
+                return redirect(url_for('index'))
+            if file_handler:
+                text_content = file_handler.extract_from_url(url)
+            if not text_content:
+                flash('Could not extract any text from that URL.', 'error')
+                return redirect(url_for('index'))
         
-        # Generate summary
         if summarizer:
-            summary_data = summarizer.generate_summary(
-                text=processed_text,
-                max_length=summary_length,
-                model_type=model_type
-            )
+            # Repeated documents are served from the cache before any preprocessing
+            try:
+                summary_data = summarizer.summarize_document(
+                    source if source is not None else text_content,
+                    max_length=summary_length,
+                    model_type=model_type,
+                    text_processor=text_processor,
+                    profile=profile
+                )
+            except TextTooShortError:
+                flash('Text is too short for meaningful summarization. Please provide longer text.', 'error')
+                return redirect(url_for('index'))
         else:
+            if len(text_content.split()) < 10:
+                flash('Text is too short for meaningful summarization. Please provide longer text.', 'error')
+                return redirect(url_for('index'))
+            
             # Fallback simple summary
-            sentences = processed_text.split('.')
+            sentences = text_content.split('.')
             summary = '. '.join(sentences[:summary_length]) + '.'
             summary_data = {
                 'summary': summary,
@@ -84,27 +225,268 @@ def summarize_text():
             }
         
         # Calculate statistics
-        original_word_count = len(text_content.split())
-        summary_word_count = len(summary_data['summary'].split())
-        compression_ratio = round((1 - summary_word_count / original_word_count) * 100, 1)
-        
-        results = {
-            'original_text': text_content,
-            'summary': summary_data['summary'],
-            'key_points': summary_data.get('key_points', []),
-            'original_word_count': original_word_count,
-            'summary_word_count': summary_word_count,
-            'compression_ratio': compression_ratio,
-            'model_used': model_type.upper(),
-            'processing_time': summary_data.get('processing_time', 0)
-        }
+        results = summary_statistics(text_content, summary_data, model_type)
+        results['original_text'] = text_content
         
         return render_template('result.html', **results)
         
     except Exception as e:
         logger.error(f"Error in summarization: {str(e)}")
+        ERRORS.inc(stage='request')
         flash(f'An error occurred during summarization: {str(e)}', 'error')
         return redirect(url_for('index'))
+    finally:
+        if upload_path and os.path.exists(upload_path):
+            os.remove(upload_path)
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    """Reject uploads above MAX_UPLOAD_LENGTH and other bodies above MAX_CONTENT_LENGTH"""
+    limit_mb = request.max_content_length / (1024 * 1024)
+    if request.endpoint != UPLOAD_ENDPOINT:
+        return jsonify({'error': f'Request body is too large. The limit is {limit_mb:g}MB.'}), 413
+    flash(f'File is too large. The limit is {limit_mb:g}MB.', 'error')
+    return redirect(url_for('index'))
+
+def _run_summary_job(text_content, summary_length, model_type, profile=None, deadline_s=None,
+                     progress_callback=None):
+    """Background job body: summarize a document and return its JSON result"""
+    summary_data = summarizer.summarize_document(
+        text_content,
+        max_length=summary_length,
+        model_type=model_type,
+        text_processor=text_processor,
+        progress_callback=progress_callback,
+        profile=profile,
+        deadline_s=deadline_s
+    )
+    return summary_statistics(text_content, summary_data, model_type)
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue a document for background summarization"""
+    if not summarizer or not job_manager:
+        return jsonify({'error': 'Summarizer not available'}), 503
+    
+    data = request.get_json(silent=True) or request.form
+    text_content = (data.get('text') or data.get('text_input') or '').strip()
+    if not text_content:
+        return jsonify({'error': 'No text provided'}), 400
+    
+    try:
+        summary_length = int(data.get('summary_length', 3))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'summary_length must be an integer'}), 400
+    try:
+        deadline_s = float(data['deadline_s']) if data.get('deadline_s') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'deadline_s must be a number'}), 400
+    model_type = data.get('model_type', 'bart')
+    try:
+        profile = summarizer.policy.resolve(data.get('profile') or None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    job_id = job_manager.submit(_run_summary_job, text_content, summary_length, model_type, profile, deadline_s)
+    return jsonify({
+        'job_id': job_id,
+        'status_url': url_for('job_status', job_id=job_id),
+        'events_url': url_for('job_events', job_id=job_id)
+    }), 202
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Report the status, progress and (when finished) result of a job"""
+    job = job_manager.get(job_id) if job_manager else None
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream job progress and partial summaries as Server-Sent Events"""
+    if not job_manager or job_manager.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    # Reconnecting clients resume after the last event they received
+    start = request.headers.get('Last-Event-ID', type=int)
+    start = start + 1 if start is not None else 0
+    
+    def stream():
+        for item in job_manager.iter_events(job_id, start=start):
+            if item is None:
+                yield ': keep-alive\n\n'
+                continue
+            index, event = item
+            yield f"id: {index}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _summarize_batch_document(index, document, defaults):
+    """Summarize one document of a batch request; errors are reported, not raised"""
+    start_time = time.time()
+    result = {'index': index, 'id': document.get('id', index)}
+    
+    try:
+        text_content = (document.get('text') or '').strip()
+        if not text_content and document.get('url'):
+            raise ValueError(f"Could not extract any text from {document['url']}")
+        if not text_content:
+            raise ValueError('No text provided')
+        summary_length = int(document.get('summary_length', defaults['summary_length']))
+        model_type = document.get('model_type', defaults['model_type'])
+        deadline_s = document.get('deadline_s', defaults['deadline_s'])
+        
+        summary_data = summarizer.summarize_document(
+            text_content,
+            max_length=summary_length,
+            model_type=model_type,
+            text_processor=text_processor,
+            profile=document.get('profile', defaults['profile']),
+            deadline_s=float(deadline_s) if deadline_s is not None else None
+        )
+        result.update(summary_statistics(text_content, summary_data, model_type))
+        result['status'] = 'ok'
+    except Exception as e:
+        ERRORS.inc(stage='request')
+        result['status'] = 'error'
+        result['error'] = str(e)
+    
+    result['total_time'] = round(time.time() - start_time, 2)
+    return result
+
+@app.route('/api/summarize/batch', methods=['POST'])
+def summarize_batch():
+    """Summarize many documents concurrently and return JSON (or NDJSON as each finishes)"""
+    if not summarizer:
+        return jsonify({'error': 'Summarizer not available'}), 503
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('documents'), list):
+        return jsonify({'error': 'Expected a JSON object with a "documents" list'}), 400
+    
+    documents = data['documents']
+    max_documents = int(os.environ.get('SUMMARIZER_BATCH_MAX_DOCS', 1000))
+    if len(documents) > max_documents:
+        return jsonify({'error': f'At most {max_documents} documents per request'}), 400
+    if not all(isinstance(document, dict) for document in documents):
+        return jsonify({'error': 'Each document must be a JSON object'}), 400
+    for index, document in enumerate(documents):
+        for field in ('text', 'url'):
+            if document.get(field) is not None and not isinstance(document[field], str):
+                return jsonify({'error': f'Document {index}: "{field}" must be a string'}), 400
+    
+    defaults = {
+        'summary_length': data.get('summary_length', 3),
+        'model_type': data.get('model_type', 'bart'),
+        'profile': data.get('profile'),
+        'deadline_s': data.get('deadline_s')
+    }
+    workers = max(1, min(int(os.environ.get('SUMMARIZER_BATCH_WORKERS', 4)), len(documents)))
+    stream = data.get('stream') or request.accept_mimetypes.best == 'application/x-ndjson'
+    
+    def run_all():
+        # Documents given by URL are fetched up front, concurrently within the per-host limit
+        by_url = [index for index, document in enumerate(documents)
+                  if not document.get('text') and document.get('url')]
+        fetched = {}
+        if by_url and file_handler:
+            texts = file_handler.extract_from_urls([documents[index]['url'] for index in by_url])
+            fetched = dict(zip(by_url, texts))
+        
+        # With SUMMARIZER_SCHEDULER=1, chunks of concurrent documents share generate batches
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='summary-batch') as executor:
+            futures = [
+                executor.submit(_summarize_batch_document, index,
+                                dict(document, text=fetched[index]) if index in fetched else document,
+                                defaults)
+                for index, document in enumerate(documents)
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    if stream:
+        def ndjson():
+            for result in run_all():
+                yield json.dumps(result) + '\n'
+        
+        return Response(stream_with_context(ndjson()), mimetype='application/x-ndjson')
+    
+    start_time = time.time()
+    results = sorted(run_all(), key=lambda result: result['index'])
+    return jsonify({
+        'results': results,
+        'succeeded': sum(1 for result in results if result['status'] == 'ok'),
+        'failed': sum(1 for result in results if result['status'] != 'ok'),
+        'total_time': round(time.time() - start_time, 2)
+    })
+
+@app.route('/api/clauses', methods=['POST'])
+def summarize_clauses():
+    """List a document's clauses, or summarize only the clauses about some topics"""
+    if not summarizer:
+        return jsonify({'error': 'Summarizer not available'}), 503
+    
+    data = request.get_json(silent=True) or request.form
+    text_content = (data.get('text') or '').strip()
+    if not text_content and data.get('url') and file_handler:
+        text_content = file_handler.extract_from_url(data['url'])
+    if not text_content:
+        return jsonify({'error': 'No text provided'}), 400
+    
+    topics = data.get('topics') or []
+    if isinstance(topics, str):
+        topics = [topic.strip() for topic in topics.split(',') if topic.strip()]
+    if not isinstance(topics, list) or not all(isinstance(topic, str) for topic in topics):
+        return jsonify({'error': 'topics must be a list of strings'}), 400
+    
+    index = summarizer.segmenter.segment(text_content)
+    if not topics:
+        return jsonify({'clauses': index.to_list(), 'total_clauses': len(index)})
+    
+    try:
+        summary_length = int(data.get('summary_length', 2))
+        deadline_s = float(data['deadline_s']) if data.get('deadline_s') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'summary_length and deadline_s must be numbers'}), 400
+    
+    try:
+        result = summarizer.summarize_clauses(
+            index,
+            topics,
+            max_length=summary_length,
+            model_type=data.get('model_type', 'bart'),
+            text_processor=text_processor,
+            profile=data.get('profile') or None,
+            deadline_s=deadline_s
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    result['topics'] = topics
+    return jsonify(result)
+
+@app.route('/api/stats')
+def api_stats():
+    """Report model and inference queue state"""
+    if not summarizer:
+        return jsonify({'error': 'Summarizer not available'}), 503
+    
+    return jsonify({
+        'models': summarizer.registry.stats(),
+        'scheduler': summarizer.scheduler.stats() if summarizer.scheduler else None,
+        'cache': summarizer.cache.stats() if summarizer.cache else None,
+        'chunk_cache': summarizer.chunk_cache.stats() if summarizer.chunk_cache else None,
+        'jobs': job_manager.stats() if job_manager else None
+    })
+
+@app.route('/metrics')
+def metrics():
+    """Stage latency histograms and counters in the Prometheus text format"""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,144 @@
+"""
+Compare inference backends for an abstractive model
+
+Each backend runs in a fresh process so load time and peak memory are
+measured in isolation. Summaries are compared with the torch backend's
+using unigram F1 (ROUGE-1).
+
+Usage:
+    python benchmarks/bench_backends.py --model-type legal --backends torch int8 onnx
+    python benchmarks/bench_backends.py --checkpoint ./my-model --documents 3 --words 1500
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import multiprocessing
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CLAUSES = [
+    "The user agrees to be bound by these terms of service and all policies referenced herein.",
+    "We may suspend or terminate your account at any time if you violate these terms.",
+    "Personal data is collected to provide the service and may be shared with trusted partners.",
+    "Subscriptions renew automatically unless cancelled before the end of the billing period.",
+    "Disputes will be resolved by binding arbitration and class actions are waived.",
+    "The service is provided as is without warranties of any kind, express or implied.",
+    "You retain ownership of your content but grant us a worldwide license to use it.",
+    "We may change these terms and will notify you of material changes by email.",
+]
+
+
+def make_documents(count, words, seed=0):
+    """Synthetic terms of service documents of roughly the given length"""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        sentences, length = [], 0
+        while length < words:
+            clause = rng.choice(CLAUSES)
+            sentences.append(clause)
+            length += len(clause.split())
+        documents.append(' '.join(sentences))
+    return documents
+
+
+def rouge1_f1(candidate, reference):
+    """Unigram overlap F1 between two summaries"""
+    candidate_counts = Counter(candidate.lower().split())
+    reference_counts = Counter(reference.lower().split())
+    overlap = sum((candidate_counts & reference_counts).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(candidate_counts.values())
+    recall = overlap / sum(reference_counts.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def run_backend(backend, model_type, checkpoint, documents, summary_length, onnx_dir):
+    """Load one backend and summarize every document (runs in a child process)"""
+    from models.model_registry import ModelRegistry
+    from models.summarizer import TextSummarizer
+
+    registry = ModelRegistry(
+        allowed_models=[model_type],
+        checkpoints={model_type: checkpoint},
+        backends={model_type: backend},
+        onnx_dir=onnx_dir
+    )
+    summarizer = TextSummarizer(registry=registry)
+
+    start = time.perf_counter()
+    registry.get(model_type)
+    load_time = time.perf_counter() - start
+
+    latencies, summaries = [], []
+    for text in documents:
+        start = time.perf_counter()
+        summaries.append(summarizer.generate_summary(text, summary_length, model_type)['summary'])
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'backend': backend,
+        'load_s': round(load_time, 2),
+        'model_mb': round(registry.memory_usage_mb(), 1),
+        # ru_maxrss is reported in kilobytes on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'latencies_s': [round(latency, 3) for latency in latencies],
+        'summaries': summaries,
+    }
+
+
+def main(argv=None):
+    from models.model_registry import MODEL_CHECKPOINTS
+
+    parser = argparse.ArgumentParser(description='Compare torch, int8 and ONNX inference backends')
+    parser.add_argument('--model-type', default='legal', choices=sorted(MODEL_CHECKPOINTS))
+    parser.add_argument('--checkpoint', default=None, help='Override the model type checkpoint')
+    parser.add_argument('--backends', nargs='+', default=['torch', 'int8', 'onnx'])
+    parser.add_argument('--documents', type=int, default=3, help='Synthetic documents to summarize')
+    parser.add_argument('--words', type=int, default=1500, help='Words per synthetic document')
+    parser.add_argument('--summary-length', type=int, default=3)
+    parser.add_argument('--onnx-dir', default=None, help='Reuse ONNX exports from this directory')
+    parser.add_argument('--output', default=None, help='Write the full report as JSON')
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or MODEL_CHECKPOINTS[args.model_type]
+    documents = make_documents(args.documents, args.words)
+    context = multiprocessing.get_context('spawn')
+
+    results = []
+    for backend in args.backends:
+        with context.Pool(1) as pool:
+            try:
+                results.append(pool.apply(run_backend, (
+                    backend, args.model_type, checkpoint, documents, args.summary_length, args.onnx_dir
+                )))
+            except Exception as e:
+                print(f"{backend}: failed ({e})")
+
+    reference = next((result for result in results if result['backend'] == 'torch'), None)
+    print(f"{'backend':>8} {'load s':>7} {'model MB':>9} {'peak RSS MB':>12} {'mean s/doc':>11} "
+          f"{'ROUGE-1 vs torch':>17}")
+    for result in results:
+        mean_latency = sum(result['latencies_s']) / len(result['latencies_s'])
+        similarity = ''
+        if reference:
+            scores = [rouge1_f1(a, b) for a, b in zip(result['summaries'], reference['summaries'])]
+            result['rouge1_vs_torch'] = round(sum(scores) / len(scores), 3)
+            similarity = f"{result['rouge1_vs_torch']:.3f}"
+        print(f"{result['backend']:>8} {result['load_s']:>7.1f} {result['model_mb']:>9.0f} "
+              f"{result['peak_rss_mb']:>12.0f} {mean_latency:>11.2f} {similarity:>17}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'checkpoint': checkpoint, 'results': results}, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Benchmark for DOCX extraction (Linux: peak memory is read from /proc)
+
+Compares the streaming XML extractor against building the python-docx
+object model (paragraphs only, as extraction worked before), on generated
+terms of service with fee tables, then measures bulk extraction of many
+files with FileHandler.extract_many.
+
+Usage:
+    python benchmarks/bench_docx.py --paragraphs 2000 20000 --files 16 --workers 1 2 4
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from utils.file_handler import FileHandler
+
+CLAUSES = [
+    "The user agrees to be bound by these Terms of Service.",
+    "Subscriptions renew automatically unless cancelled before the renewal date.",
+    "Disputes shall be resolved by binding arbitration; class actions are waived.",
+    "We may suspend accounts that violate these terms without prior notice.",
+    "The service is provided as is, without warranties of any kind.",
+]
+FEES = [("Late fee", "$25 per month"), ("Chargeback fee", "$15 per dispute"), ("Liability cap", "Fees paid in 12 months")]
+
+
+def make_docx(path, paragraphs, seed=0):
+    """Write a DOCX with a header, footer and a fee table every 50 paragraphs"""
+    rng = random.Random(seed)
+    document = Document()
+    document.sections[0].header.paragraphs[0].text = "Example Inc. Terms of Service"
+    document.sections[0].footer.paragraphs[0].text = "Confidential"
+    for index in range(paragraphs):
+        document.add_paragraph(' '.join(rng.choice(CLAUSES) for _ in range(3)))
+        if index % 50 == 49:
+            table = document.add_table(rows=len(FEES), cols=2)
+            for row, (name, amount) in enumerate(FEES):
+                table.cell(row, 0).text = name
+                table.cell(row, 1).text = amount
+    document.save(path)
+
+
+def legacy_extract(path):
+    """Extraction before the streaming extractor: python-docx paragraphs only"""
+    text = ""
+    for paragraph in Document(path).paragraphs:
+        text += paragraph.text + "\n"
+    return text.strip()
+
+
+def streaming_extract(path):
+    return FileHandler(pdf_workers=1).extract_text(path)
+
+
+def _rss_kb(field):
+    """Read VmRSS or VmHWM of this process in kilobytes (Linux)"""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return 0
+
+
+def _measure(args):
+    """Time one extraction in a fresh process and report how far its memory grew"""
+    name, path = args
+    func = legacy_extract if name == 'legacy' else streaming_extract
+    # Reset the high-water mark so start-up imports do not hide the extraction's peak
+    with open('/proc/self/clear_refs', 'w') as clear_refs:
+        clear_refs.write('5')
+    baseline = _rss_kb('VmRSS')
+    start = time.perf_counter()
+    text = func(path)
+    seconds = time.perf_counter() - start
+    return seconds, len(text), (_rss_kb('VmHWM') - baseline) / 1024
+
+
+def measure(name, path):
+    # A new process per run so peak memory is not inherited from the previous one
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.map(_measure, [(name, path)])[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark DOCX extraction throughput')
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[2000, 20000],
+                        help='Paragraphs per generated document')
+    parser.add_argument('--files', type=int, default=16, help='Documents in the bulk extraction run')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts for the bulk run')
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        print(f"{'paragraphs':>10} {'docx MB':>8} {'extractor':>10} {'seconds':>8} {'text MB/s':>10} "
+              f"{'text MB':>8} {'peak +MB':>9}")
+        for paragraphs in args.paragraphs:
+            path = os.path.join(tmp_dir, f'terms-{paragraphs}.docx')
+            make_docx(path, paragraphs)
+            megabytes = os.path.getsize(path) / (1024 * 1024)
+            for name in ('legacy', 'streaming'):
+                seconds, chars, peak_mb = measure(name, path)
+                text_mb = chars / (1024 * 1024)
+                print(f"{paragraphs:>10} {megabytes:>8.2f} {name:>10} {seconds:>8.3f} "
+                      f"{text_mb / seconds:>10.2f} {text_mb:>8.2f} {peak_mb:>9.1f}")
+
+        paths = []
+        for index in range(args.files):
+            path = os.path.join(tmp_dir, f'bulk-{index}.docx')
+            make_docx(path, args.paragraphs[0], seed=index)
+            paths.append(path)
+
+        print(f"\n{'files':>6} {'workers':>8} {'seconds':>8} {'files/s':>8}")
+        for workers in args.workers:
+            handler = FileHandler(pdf_workers=workers)
+            start = time.perf_counter()
+            for _ in handler.extract_many(paths):
+                pass
+            seconds = time.perf_counter() - start
+            print(f"{len(paths):>6} {workers:>8} {seconds:>8.2f} {len(paths) / seconds:>8.1f}")
+    finally:
+        shutil.rmtree(tmp_dir)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
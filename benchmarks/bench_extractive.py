@@ -0,0 +1,92 @@
+"""
+Micro-benchmark for the extractive summarizers
+
+Compares models.extractive against sumy on synthetic terms of service
+documents, reporting time per document, speedup and how many selected
+sentences agree. A batch run scores all documents of a size together.
+
+Usage:
+    python benchmarks/bench_extractive.py --sentences 50 200 1000 --documents 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
+from sumy.nlp.tokenizers import Tokenizer
+from sumy.summarizers.lex_rank import LexRankSummarizer
+from sumy.summarizers.luhn import LuhnSummarizer
+from sumy.summarizers.lsa import LsaSummarizer
+
+from models.extractive import ExtractiveSummarizer
+from utils.document import Document
+
+SUMY_SUMMARIZERS = {'lexrank': LexRankSummarizer, 'luhn': LuhnSummarizer, 'lsa': LsaSummarizer}
+
+VOCABULARY = ("user users service services terms provider providers data personal privacy account accounts "
+              "agree agrees may must shall third party partners cookies content license licenses rights "
+              "arbitration dispute disputes fees payment refund refunds subscription notice changes law "
+              "liability warranty warranties termination suspend suspension access information share "
+              "collect retain delete consent jurisdiction court claims damages indemnify the and of to "
+              "for with any our your you we this that by in on").split()
+
+
+def make_document(sentences, rng):
+    """A document of random ToS-like sentences"""
+    text = ' '.join(
+        ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(6, 30))).capitalize() + '.'
+        for _ in range(sentences)
+    )
+    return Document(text)
+
+
+def sumy_summary(document, algorithm, count, tokenizer):
+    """sumy's selection, parsed from the same sentences"""
+    parsed = ObjectDocumentModel([Paragraph([Sentence(s, tokenizer) for s in document.sentences()])])
+    return [str(sentence) for sentence in SUMY_SUMMARIZERS[algorithm]()(parsed, count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark extractive summarization')
+    parser.add_argument('--sentences', type=int, nargs='+', default=[50, 200, 1000],
+                        help='Sentences per document')
+    parser.add_argument('--documents', type=int, default=5, help='Documents per size')
+    parser.add_argument('--count', type=int, default=5, help='Sentences selected per summary')
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    rng = random.Random(0)
+    tokenizer = Tokenizer('english')
+    engine = ExtractiveSummarizer()
+
+    print(f"{'sentences':>9} {'algorithm':>9} {'sumy ms':>9} {'engine ms':>9} {'batch ms':>9} "
+          f"{'speedup':>8} {'agree':>6}")
+    for size in args.sentences:
+        documents = [make_document(size, rng) for _ in range(args.documents)]
+        for algorithm in SUMY_SUMMARIZERS:
+            start = time.perf_counter()
+            expected = [sumy_summary(document, algorithm, args.count, tokenizer) for document in documents]
+            sumy_time = (time.perf_counter() - start) / len(documents)
+
+            start = time.perf_counter()
+            selected = [engine.summarize(document, args.count, algorithm) for document in documents]
+            engine_time = (time.perf_counter() - start) / len(documents)
+
+            start = time.perf_counter()
+            engine.summarize_batch(documents, args.count, algorithm)
+            batch_time = (time.perf_counter() - start) / len(documents)
+
+            matched = sum(len(set(a) & set(b)) for a, b in zip(expected, selected))
+            total = sum(len(a) for a in expected)
+            print(f"{size:>9} {algorithm:>9} {sumy_time * 1000:>9.1f} {engine_time * 1000:>9.1f} "
+                  f"{batch_time * 1000:>9.1f} {sumy_time / engine_time:>7.1f}x {matched / total:>6.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
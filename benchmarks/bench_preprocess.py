@@ -0,0 +1,129 @@
+"""
+Micro-benchmark for TextProcessor.preprocess
+
+Compares the compiled single-pass engine against the previous multi-pass
+implementation on synthetic terms of service documents.
+
+Usage:
+    python benchmarks/bench_preprocess.py --sizes 1 5 20 --repeat 3
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk.tokenize import sent_tokenize
+from utils.text_processor import TextProcessor
+
+CLAUSES = [
+    "The user agrees to be bound by these Terms of Service.",
+    "We may update these terms at any time without prior notice!!",
+    "Contact support@example.com or visit https://example.com/help for assistance.",
+    "<p>Your personal data may be shared with third-party partners...</p>",
+    "Subscriptions renew automatically unless cancelled (see Section 4.2).",
+    "Are you sure you want to delete your account??",
+    "Disputes shall be resolved by binding arbitration; class actions are waived.",
+    "The service is provided \"as is\" -- without warranties of any kind.",
+]
+
+
+def make_document(size_mb, seed=0):
+    """Build an ASCII ToS document of roughly size_mb megabytes"""
+    rng = random.Random(seed)
+    target = int(size_mb * 1024 * 1024)
+    parts, length = [], 0
+    while length < target:
+        clause = rng.choice(CLAUSES)
+        separator = '\n\n' if rng.random() < 0.1 else '  '
+        parts.append(clause + separator)
+        length += len(clause) + len(separator)
+    return ''.join(parts)
+
+
+def legacy_clean(text):
+    """The multi-pass cleaning used before the compiled engine"""
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'[.]{2,}', '.', text)
+    text = re.sub(r'[!]{2,}', '!', text)
+    text = re.sub(r'[?]{2,}', '?', text)
+    text = re.sub(r'[^\w\s.,!?;:()"\'-]', ' ', text)
+
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+    text = re.sub(r'([.,!?;:])\s*', r'\1 ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+
+    for old, new in {'’': "'", '“': '"', '”': '"', ' ': ' '}.items():
+        text = text.replace(old, new)
+    return text
+
+
+def legacy_preprocess(text):
+    """The full preprocessing used before the compiled engine"""
+    text = legacy_clean(text)
+    cleaned_sentences = []
+    for sentence in sent_tokenize(text):
+        sentence = sentence.strip()
+        if len(sentence.split()) < 3:
+            continue
+        if sentence and sentence[-1] not in '.!?':
+            sentence += '.'
+        if sentence:
+            sentence = sentence[0].upper() + sentence[1:]
+        cleaned_sentences.append(sentence)
+    return ' '.join(cleaned_sentences)
+
+
+def engine_clean(processor, text):
+    """The compiled engine's cleaning passes, without sentence fixing"""
+    text = processor._fix_encoding(text)
+    text = processor._clean_text(text)
+    return processor._normalize_whitespace(text)
+
+
+def best_time(func, text, repeat):
+    """Fastest of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark text preprocessing throughput')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1, 5, 20], help='Document sizes in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (fastest is kept)')
+    args = parser.parse_args(argv)
+
+    processor = TextProcessor()
+    print(f"{'size':>8} {'stage':>10} {'legacy MB/s':>12} {'engine MB/s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        text = make_document(size)
+        megabytes = len(text) / (1024 * 1024)
+
+        if legacy_preprocess(text) != processor.preprocess(text):
+            print(f"{size:>6}MB output differs from the legacy implementation")
+            return 1
+
+        stages = [
+            ('cleaning', legacy_clean, lambda value: engine_clean(processor, value)),
+            ('total', legacy_preprocess, processor.preprocess),
+        ]
+        for stage, legacy_func, engine_func in stages:
+            legacy = best_time(legacy_func, text, args.repeat)
+            engine = best_time(engine_func, text, args.repeat)
+            print(f"{size:>6}MB {stage:>10} {megabytes / legacy:>12.2f} {megabytes / engine:>12.2f} "
+                  f"{legacy / engine:>7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,521 @@
+"""
+Reproducible benchmark suite for latency, throughput, memory and quality
+
+Builds a seeded corpus of synthetic terms of service documents (or loads
+one from JSONL), then measures file extraction, preprocessing and every
+model type on each document size. Each stage and model runs in a fresh
+process so peak memory is its own. Results go to a JSON report with stable
+ordering that can be diffed between commits, or compared directly with
+--baseline.
+
+Abstractive models run offline either on local checkpoints (--checkpoints)
+or on a stub pipeline (--stub). The stub copies the start of its input in
+place of generation, so it measures everything except the model itself.
+Abstractive models with neither option are skipped.
+
+Usage:
+    python benchmarks/bench_suite.py --stub --output report.json
+    python benchmarks/bench_suite.py --checkpoints bart=./tiny-bart t5=./tiny-t5 --sizes 1000 10000
+    python benchmarks/bench_suite.py --stub --output new.json --baseline report.json
+    python benchmarks/bench_suite.py --corpus documents.jsonl --models lexrank luhn
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+from types import SimpleNamespace
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ABSTRACTIVE_MODELS = ['bart', 't5', 'legal']
+EXTRACTIVE_MODELS = ['lexrank', 'luhn', 'lsa']
+STAGES = ['extract_txt', 'extract_docx', 'preprocess']
+
+# Each topic has one key clause (the reference summary sentence) and elaborations
+TOPICS = [
+    ("Disputes are resolved by binding individual arbitration and class actions are waived.", [
+        "The arbitrator may award the same damages as a court.",
+        "Arbitration takes place in the county where you live.",
+        "You may opt out of arbitration within thirty days of accepting.",
+    ]),
+    ("We collect personal data and share it with advertising partners.", [
+        "Partners receive device identifiers and approximate location.",
+        "Data shared with partners is governed by their own policies.",
+        "You can limit sharing in your privacy settings.",
+    ]),
+    ("Subscriptions renew automatically until you cancel them.", [
+        "Renewal charges use the payment method on file.",
+        "Cancellation takes effect at the end of the billing period.",
+        "Prices may change with thirty days notice.",
+    ]),
+    ("We may suspend or terminate your account at any time without notice.", [
+        "Termination removes access to purchased content.",
+        "Suspended accounts cannot create new accounts.",
+        "Appeals are reviewed within fourteen days.",
+    ]),
+    ("You grant us a worldwide royalty-free license to content you upload.", [
+        "The license survives deletion of your account.",
+        "We may sublicense content to service providers.",
+        "You keep ownership of your content.",
+    ]),
+    ("The service is provided as is without warranties of any kind.", [
+        "We do not guarantee uninterrupted availability.",
+        "Liability is limited to the fees paid in the last year.",
+        "Some jurisdictions do not allow these limitations.",
+    ]),
+    ("We may change these terms and continued use means acceptance.", [
+        "Material changes are announced by email.",
+        "Previous versions are archived on our website.",
+        "If you disagree you must stop using the service.",
+    ]),
+    ("Data is retained for up to five years after account deletion.", [
+        "Backups are purged on a rolling schedule.",
+        "Retention may be longer where the law requires it.",
+        "Anonymized data may be kept indefinitely.",
+    ]),
+]
+
+SUBJECTS = ['The company', 'Each user', 'Our affiliates', 'The provider', 'Account holders', 'Third parties']
+VERBS = ['may review', 'will maintain', 'shall process', 'can update', 'must respect', 'may disclose']
+OBJECTS = ['usage records', 'support requests', 'billing details', 'service settings', 'published materials',
+           'security logs']
+QUALIFIERS = ['as described above', 'where applicable', 'from time to time', 'subject to local law',
+              'in the ordinary course of business', 'unless otherwise stated']
+
+
+def make_document(words, topics=5, seed=0):
+    """
+    Build a synthetic terms of service document and its reference summary
+
+    The document has one section per topic: the topic's key clause, its
+    elaborations and seeded filler sentences. The reference is the key
+    clauses in document order.
+    """
+    rng = random.Random(seed)
+    chosen = rng.sample(TOPICS, min(topics, len(TOPICS)))
+    per_section = max(1, words // len(chosen))
+
+    sections = []
+    for key_clause, details in chosen:
+        sentences = [key_clause] + details
+        length = sum(len(sentence.split()) for sentence in sentences)
+        while length < per_section:
+            sentence = (f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} "
+                        f"{rng.choice(QUALIFIERS)}.")
+            sentences.append(sentence)
+            length += len(sentence.split())
+        sections.append(' '.join(sentences))
+
+    return {
+        'id': f"synthetic-{words}-{seed}",
+        'text': '\n\n'.join(sections),
+        'reference': ' '.join(key_clause for key_clause, _ in chosen),
+    }
+
+
+def make_corpus(sizes, documents, seed=0):
+    """Seeded synthetic corpus with the given number of documents per size"""
+    return {
+        size: [make_document(size, seed=seed * 1000003 + size * 101 + index) for index in range(documents)]
+        for size in sizes
+    }
+
+
+def load_corpus(path):
+    """Load JSONL documents ('text', optional 'id' and 'reference'), grouped by rounded word count"""
+    corpus = {}
+    with open(path, encoding='utf-8') as file:
+        for index, line in enumerate(file):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            words = len(record['text'].split())
+            # Group documents by size to the nearest power of ten's first digit (1k, 2k, ... 10k, 20k)
+            scale = 10 ** max(0, len(str(words)) - 1)
+            size = max(1, round(words / scale)) * scale
+            corpus.setdefault(size, []).append({
+                'id': record.get('id', index),
+                'text': record['text'],
+                'reference': record.get('reference'),
+            })
+    return dict(sorted(corpus.items()))
+
+
+def _ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _f1(overlap, candidate_total, reference_total):
+    if not overlap:
+        return 0.0
+    precision = overlap / candidate_total
+    recall = overlap / reference_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def rouge(candidate, reference):
+    """ROUGE-1, ROUGE-2 and ROUGE-L F1 on lowercased word tokens"""
+    candidate_tokens = re.findall(r"\w+", candidate.lower())
+    reference_tokens = re.findall(r"\w+", reference.lower())
+    scores = {}
+    for n in (1, 2):
+        candidate_ngrams = _ngrams(candidate_tokens, n)
+        reference_ngrams = _ngrams(reference_tokens, n)
+        overlap = sum((candidate_ngrams & reference_ngrams).values())
+        scores[f'rouge{n}'] = _f1(overlap, sum(candidate_ngrams.values()), sum(reference_ngrams.values()))
+
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(reference_tokens) + 1)
+    for token in candidate_tokens:
+        current = [0]
+        for j, reference_token in enumerate(reference_tokens):
+            current.append(previous[j] + 1 if token == reference_token else max(previous[j + 1], current[j]))
+        previous = current
+    scores['rougeL'] = _f1(previous[-1], len(candidate_tokens), len(reference_tokens))
+    return scores
+
+
+class StubTokenizer:
+    """Word-level tokenizer with the parts of the Hugging Face interface the pipeline uses"""
+
+    is_fast = True
+    model_max_length = 1024
+    pad_token_id = 0
+    bos_token_id = 1
+    eos_token_id = 2
+    TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+    def __init__(self):
+        self.vocabulary = {}
+        self.words = ['<pad>', '<s>', '</s>']
+
+    def _ids(self, text):
+        ids, offsets = [], []
+        for match in self.TOKEN_PATTERN.finditer(text):
+            word = match.group()
+            token_id = self.vocabulary.get(word)
+            if token_id is None:
+                token_id = self.vocabulary[word] = len(self.words)
+                self.words.append(word)
+            ids.append(token_id)
+            offsets.append(match.span())
+        return ids, offsets
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False, truncation=False,
+                 max_length=None, verbose=True):
+        texts = [text] if isinstance(text, str) else text
+        all_ids, all_offsets = [], []
+        for item in texts:
+            ids, offsets = self._ids(item)
+            if add_special_tokens:
+                ids = self.build_inputs_with_special_tokens(ids)
+            if truncation and max_length and len(ids) > max_length:
+                ids = ids[:max_length - 1] + [self.eos_token_id]
+            all_ids.append(ids)
+            all_offsets.append(offsets)
+        if isinstance(text, str):
+            encoded = {'input_ids': all_ids[0]}
+            if return_offsets_mapping:
+                encoded['offset_mapping'] = all_offsets[0]
+            return encoded
+        return {'input_ids': all_ids}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [self.bos_token_id] + list(ids) + [self.eos_token_id]
+
+    def decode(self, ids, skip_special_tokens=True, clean_up_tokenization_spaces=False):
+        ids = [int(token_id) for token_id in ids]
+        if skip_special_tokens:
+            ids = [token_id for token_id in ids if token_id > self.eos_token_id]
+        return re.sub(r" ([^\w\s])", r"\1", ' '.join(self.words[token_id] for token_id in ids))
+
+    def batch_decode(self, rows, skip_special_tokens=True, clean_up_tokenization_spaces=False):
+        return [self.decode(row.tolist(), skip_special_tokens) for row in rows]
+
+
+class StubModel:
+    """Generates the leading tokens of each input, so output length follows max_length"""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.config = SimpleNamespace(max_position_embeddings=tokenizer.model_max_length, prefix=None)
+
+    def generate(self, input_ids, attention_mask=None, max_length=20, **kwargs):
+        import torch
+
+        special = (self.tokenizer.pad_token_id, self.tokenizer.bos_token_id, self.tokenizer.eos_token_id)
+        rows = []
+        for row in input_ids.tolist():
+            content = [token_id for token_id in row if token_id not in special][:max(1, max_length - 2)]
+            rows.append(self.tokenizer.build_inputs_with_special_tokens(content))
+        width = max(len(row) for row in rows)
+        output = torch.zeros((len(rows), width), dtype=torch.long)
+        for index, row in enumerate(rows):
+            output[index, :len(row)] = torch.tensor(row, dtype=torch.long)
+        return output
+
+    def parameters(self):
+        return iter(())
+
+    def buffers(self):
+        return iter(())
+
+    def modules(self):
+        return iter(())
+
+
+def stub_pipeline(checkpoint):
+    """Pipeline stand-in built on the stub tokenizer and model"""
+    tokenizer = StubTokenizer()
+    return SimpleNamespace(tokenizer=tokenizer, model=StubModel(tokenizer), device='cpu', prefix='')
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize_latencies(latencies):
+    total = sum(latencies)
+    return {
+        'documents': len(latencies),
+        'p50_s': round(percentile(latencies, 50), 4),
+        'p95_s': round(percentile(latencies, 95), 4),
+        'mean_s': round(total / len(latencies), 4),
+        'docs_per_s': round(len(latencies) / total, 3) if total else None,
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_stage(stage, corpus):
+    """Time one extraction or preprocessing stage over the corpus (runs in a child process)"""
+    from utils.file_handler import FileHandler
+    from utils.text_processor import TextProcessor
+
+    file_handler = FileHandler()
+    text_processor = TextProcessor()
+    results = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        def measure(document, name):
+            if stage == 'preprocess':
+                start = time.perf_counter()
+                text_processor.build_document(document['text'])
+                return time.perf_counter() - start
+
+            extension = stage.split('_', 1)[1]
+            path = os.path.join(directory, f"{name}.{extension}")
+            if extension == 'txt':
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(document['text'])
+            else:
+                from docx import Document as DocxDocument
+                docx = DocxDocument()
+                for paragraph in document['text'].split('\n\n'):
+                    docx.add_paragraph(paragraph)
+                docx.save(path)
+
+            start = time.perf_counter()
+            file_handler.extract_text(path)
+            return time.perf_counter() - start
+
+        # One untimed pass so lazy imports and caches do not count against the first size
+        measure(next(iter(corpus.values()))[0], 'warmup')
+        for size, documents in corpus.items():
+            latencies = [measure(document, f"{size}-{index}") for index, document in enumerate(documents)]
+            results.append(dict(name=stage, kind='stage', words=size, **summarize_latencies(latencies)))
+
+    for result in results:
+        result['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def run_model(model_type, corpus, options):
+    """Summarize the corpus with one model type (runs in a child process)"""
+    from models.model_registry import ModelRegistry
+    from models.summarizer import TextSummarizer
+    from utils.text_processor import TextProcessor
+
+    abstractive = model_type in ABSTRACTIVE_MODELS
+    checkpoints = options['checkpoints']
+    registry = ModelRegistry(
+        allowed_models=[model_type] if abstractive else [],
+        checkpoints={model_type: checkpoints.get(model_type, 'stub')} if abstractive else None,
+        loader=stub_pipeline if abstractive and model_type not in checkpoints else None
+    )
+    summarizer = TextSummarizer(registry=registry, batch_size=options['batch_size'],
+                                generation_profile=options['profile'])
+    text_processor = TextProcessor()
+
+    load_s = None
+    if abstractive:
+        start = time.perf_counter()
+        registry.get(model_type)
+        load_s = round(time.perf_counter() - start, 3)
+
+    def summarize(document):
+        return summarizer.summarize_document(
+            document['text'],
+            max_length=options['summary_length'],
+            model_type=model_type,
+            text_processor=text_processor
+        )['summary']
+
+    # One untimed document so lazy imports and kernel setup do not count against the first size
+    summarize(next(iter(corpus.values()))[0])
+
+    results = []
+    for size, documents in corpus.items():
+        latencies, scores = [], []
+        for document in documents:
+            start = time.perf_counter()
+            summary = summarize(document)
+            latencies.append(time.perf_counter() - start)
+            if document.get('reference'):
+                scores.append(rouge(summary, document['reference']))
+
+        result = dict(name=model_type, kind='model', words=size, **summarize_latencies(latencies))
+        result['stub'] = abstractive and model_type not in checkpoints
+        result['load_s'] = load_s
+        for metric in ('rouge1', 'rouge2', 'rougeL'):
+            result[metric] = round(sum(score[metric] for score in scores) / len(scores), 4) if scores else None
+        results.append(result)
+
+    for result in results:
+        result['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def compare(results, baseline):
+    """Print the change of each result against a baseline report"""
+    previous = {(result['name'], result['words']): result for result in baseline.get('results', [])}
+    print(f"\n{'vs baseline':<14} {'words':>7} {'p50 change':>11} {'p95 change':>11} {'rougeL change':>14}")
+    for result in results:
+        old = previous.get((result['name'], result['words']))
+        if not old:
+            continue
+
+        def change(key):
+            if not old.get(key) or result.get(key) is None:
+                return ''
+            return f"{(result[key] - old[key]) / old[key] * 100:+.1f}%"
+
+        rouge_change = ''
+        if result.get('rougeL') is not None and old.get('rougeL') is not None:
+            rouge_change = f"{result['rougeL'] - old['rougeL']:+.4f}"
+        print(f"{result['name']:<14} {result['words']:>7} {change('p50_s'):>11} {change('p95_s'):>11} "
+              f"{rouge_change:>14}")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark extraction, preprocessing and every model type')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000, 100000],
+                        help='Words per synthetic document')
+    parser.add_argument('--documents', type=int, default=3, help='Synthetic documents per size')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', default=None, help='JSONL corpus instead of synthetic documents')
+    parser.add_argument('--models', nargs='+', default=ABSTRACTIVE_MODELS + EXTRACTIVE_MODELS)
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument('--checkpoints', nargs='*', default=[], metavar='MODEL=PATH',
+                        help='Local checkpoints for abstractive models')
+    parser.add_argument('--stub', action='store_true', help='Use a stub pipeline for abstractive models '
+                                                           'without a local checkpoint')
+    parser.add_argument('--summary-length', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--profile', default='balanced', choices=['fast', 'balanced', 'quality'])
+    parser.add_argument('--output', default=None, help='Write the report as JSON')
+    parser.add_argument('--baseline', default=None, help='Earlier JSON report to compare against')
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus) if args.corpus else make_corpus(args.sizes, args.documents, args.seed)
+    checkpoints = dict(item.split('=', 1) for item in args.checkpoints)
+    options = {
+        'checkpoints': checkpoints,
+        'summary_length': args.summary_length,
+        'batch_size': args.batch_size,
+        'profile': args.profile,
+    }
+
+    jobs = [(run_stage, (stage, corpus)) for stage in args.stages]
+    for model_type in args.models:
+        if model_type in ABSTRACTIVE_MODELS and model_type not in checkpoints and not args.stub:
+            print(f"{model_type}: skipped (pass --checkpoints {model_type}=PATH or --stub to run offline)")
+            continue
+        jobs.append((run_model, (model_type, corpus, options)))
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for function, job_args in jobs:
+        with context.Pool(1) as pool:
+            try:
+                results.extend(pool.apply(function, job_args))
+            except Exception as e:
+                print(f"{job_args[0]}: failed ({e})")
+
+    print(f"{'name':<14} {'words':>7} {'p50 s':>8} {'p95 s':>8} {'docs/s':>8} {'peak MB':>8} {'ROUGE-L':>8}")
+    for result in results:
+        rouge_l = f"{result['rougeL']:.3f}" if result.get('rougeL') is not None else ''
+        print(f"{result['name']:<14} {result['words']:>7} {result['p50_s']:>8.3f} {result['p95_s']:>8.3f} "
+              f"{result['docs_per_s'] or 0:>8.2f} {result['peak_rss_mb']:>8.0f} {rouge_l:>8}")
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'corpus': args.corpus or 'synthetic',
+            'sizes': sorted(corpus),
+            'documents': {str(size): len(documents) for size, documents in corpus.items()},
+            'seed': args.seed,
+            'summary_length': args.summary_length,
+            'batch_size': args.batch_size,
+            'profile': args.profile,
+            'checkpoints': checkpoints,
+            'stub': args.stub,
+        },
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            compare(results, json.load(file))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+            file.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Bulk summarization from the command line
+
+Examples:
+    python cli.py policies/ -o summaries.jsonl --model-type legal --workers 4
+    python cli.py crawl.jsonl -o summaries.jsonl --text-field body --id-field url
+
+Results are appended to the output file one JSON line per document. Running
+the same command again after a crash skips documents that already succeeded.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import logging
+import multiprocessing
+
+from utils.metrics import StageTimer
+from utils.summary_stats import summary_statistics
+
+# Per-process components, created once by _init_worker
+_components = {}
+
+
+def iter_documents(input_path, text_field='text', id_field='id'):
+    """
+    Yield (doc_id, task) pairs from a directory tree or a JSONL corpus
+
+    Directory tasks carry a file path; JSONL tasks carry the text itself.
+    """
+    if os.path.isdir(input_path):
+        allowed_extensions = {'txt', 'pdf', 'doc', 'docx'}
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for filename in sorted(files):
+                if '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extensions:
+                    path = os.path.join(root, filename)
+                    yield os.path.relpath(path, input_path), {'path': path}
+        return
+
+    with open(input_path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logging.getLogger(__name__).error(f"Skipping invalid JSON on line {line_number}")
+                continue
+            if not isinstance(record, dict):
+                logging.getLogger(__name__).error(f"Skipping line {line_number}: expected a JSON object")
+                continue
+            doc_id = str(record.get(id_field, line_number))
+            yield doc_id, {'text': record.get(text_field) or ''}
+
+
+def load_checkpoint(output_path):
+    """
+    Return ids already summarized successfully, repairing a torn final line
+
+    A crash can leave a partially written last record; it is truncated so
+    new results start on a fresh line.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, 'rb+') as file:
+        data = file.read()
+        if data and not data.endswith(b'\n'):
+            file.truncate(data.rfind(b'\n') + 1)
+            data = data[:data.rfind(b'\n') + 1]
+
+    for line in data.decode('utf-8').splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get('status') == 'ok':
+            completed.add(str(record['id']))
+    return completed
+
+
+def _init_worker(options):
+    """Create the processing components once per worker process"""
+    threads = options.get('threads_per_worker')
+    if threads:
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+
+    from models.summarizer import ABSTRACTIVE_MODELS, TextSummarizer
+    from utils.text_processor import TextProcessor
+    from utils.file_handler import FileHandler
+
+    model_type = options['model_type']
+    abstractive = model_type in ABSTRACTIVE_MODELS
+    if abstractive and threads:
+        import torch
+        torch.set_num_threads(threads)
+
+    _components['text_processor'] = TextProcessor()
+    _components['file_handler'] = FileHandler()
+    _components['summarizer'] = TextSummarizer(
+        allowed_models=[model_type] if abstractive else [],
+        warm_up=[model_type] if abstractive else None,
+        batch_size=options['batch_size'],
+        backends={model_type: options['backend']} if abstractive else None,
+        onnx_dir=options.get('onnx_dir'),
+        generation_profile=options.get('profile', 'balanced'),
+        deadline_s=options.get('deadline')
+    )
+    _components['options'] = options
+
+
+def _process(item):
+    """Extract, preprocess and summarize one document"""
+    doc_id, task = item
+    options = _components['options']
+    start_time = time.time()
+    record = {'id': doc_id}
+    timer = StageTimer()
+    if 'path' in task:
+        record['source'] = task['path']
+
+    try:
+        if 'path' in task:
+            with timer.stage('extraction'):
+                text_content = _components['file_handler'].extract_text(task['path'])
+        else:
+            text_content = task['text']
+        text_content = text_content.strip()
+        if not text_content:
+            raise ValueError('No text extracted')
+
+        summary_data = _components['summarizer'].summarize_document(
+            text_content,
+            max_length=options['summary_length'],
+            model_type=options['model_type'],
+            text_processor=_components['text_processor'],
+            timer=timer
+        )
+        record.update(summary_statistics(text_content, summary_data, options['model_type']))
+        record['status'] = 'ok'
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = str(e)
+
+    record['total_time'] = round(time.time() - start_time, 2)
+    return record
+
+
+def imap_bounded(pool, func, items, window):
+    """
+    Apply func to items on a pool, yielding results as they finish
+
+    Unlike Pool.imap_unordered, whose feeder thread drains the whole input
+    up front, at most window items are taken from items and kept in flight,
+    so a large corpus is read as it is summarized.
+
+    Args:
+        pool (multiprocessing.pool.Pool): Worker pool
+        func (callable): Function applied to each item
+        items (iterable): Inputs, consumed lazily
+        window (int): Maximum items in flight
+
+    Yields:
+        Results of func in completion order
+    """
+    finished = queue.Queue()
+    in_flight = 0
+    for item in items:
+        pool.apply_async(func, (item,), callback=finished.put, error_callback=finished.put)
+        in_flight += 1
+        # The next item is only read once a slot is free
+        if in_flight >= window:
+            yield _result(finished.get())
+            in_flight -= 1
+    while in_flight:
+        yield _result(finished.get())
+        in_flight -= 1
+
+
+def _result(outcome):
+    """Return a pool result, raising the exception of a failed call"""
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
+
+
+def run(options):
+    """Summarize every pending document and append results to the output file"""
+    logger = logging.getLogger(__name__)
+    completed = load_checkpoint(options['output'])
+    if completed:
+        logger.info(f"Resuming: {len(completed)} documents already summarized")
+
+    pending = (
+        item for item in iter_documents(options['input'], options['text_field'], options['id_field'])
+        if item[0] not in completed
+    )
+
+    counts = {'ok': 0, 'error': 0}
+    start_time = time.time()
+
+    if options['workers'] > 1:
+        pool = multiprocessing.Pool(
+            processes=options['workers'],
+            initializer=_init_worker,
+            initargs=(options,)
+        )
+        # A few documents per worker are queued, so memory does not grow with the corpus
+        results = imap_bounded(pool, _process, pending, window=options['workers'] * 2)
+    else:
+        pool = None
+        _init_worker(options)
+        results = map(_process, pending)
+
+    try:
+        with open(options['output'], 'a', encoding='utf-8') as output:
+            for record in results:
+                # Each record is flushed so a crash loses at most the documents in flight
+                output.write(json.dumps(record) + '\n')
+                output.flush()
+                os.fsync(output.fileno())
+
+                counts[record['status']] += 1
+                done = counts['ok'] + counts['error']
+                if done % options['report_every'] == 0:
+                    elapsed = time.time() - start_time
+                    logger.info(f"{done} documents, {done / elapsed:.2f} docs/sec")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    elapsed = time.time() - start_time
+    done = counts['ok'] + counts['error']
+    return {
+        'summarized': counts['ok'],
+        'failed': counts['error'],
+        'skipped': len(completed),
+        'elapsed': round(elapsed, 2),
+        'docs_per_sec': round(done / elapsed, 2) if elapsed else 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize a directory of documents or a JSONL corpus')
+    parser.add_argument('input', help='Directory of txt/pdf/docx files, or a JSONL file')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file results are appended to')
+    parser.add_argument('--model-type', default='legal', help='bart, t5, legal, lexrank, luhn or lsa')
+    parser.add_argument('--summary-length', type=int, default=3, help='Maximum summary sentences')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='Worker processes (each loads the model once)')
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help='Torch threads per worker (default: cores / workers)')
+    parser.add_argument('--batch-size', type=int, default=8, help='Chunks per generate call')
+    parser.add_argument('--backend', default='torch', choices=['torch', 'int8', 'onnx'],
+                        help='Inference backend for abstractive models')
+    parser.add_argument('--onnx-dir', default=None, help='Directory where ONNX exports are kept')
+    parser.add_argument('--profile', default='balanced', choices=['fast', 'balanced', 'quality'],
+                        help='Generation profile trading summary quality for speed')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Seconds per document before remaining chunks are summarized extractively')
+    parser.add_argument('--text-field', default='text', help='JSONL field holding the document text')
+    parser.add_argument('--id-field', default='id', help='JSONL field holding the document id')
+    parser.add_argument('--report-every', type=int, default=25, help='Log throughput every N documents')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    options = vars(args)
+    options['workers'] = max(1, args.workers)
+    options['report_every'] = max(1, args.report_every)
+    if options['threads_per_worker'] is None:
+        options['threads_per_worker'] = max(1, (os.cpu_count() or 1) // options['workers'])
+
+    summary = run(options)
+    print(json.dumps(summary))
+    return 0 if summary['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
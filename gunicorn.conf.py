@@ -0,0 +1,37 @@
+"""
+Production serving: gunicorn -c gunicorn.conf.py app:app
+
+The app, and with it the summarization models, is loaded once in the
+master process; workers are forked from it and share the model weights
+copy-on-write instead of each loading their own copy.
+"""
+import os
+
+from utils.serving import freeze_shared_state, limit_threads, set_thread_env, worker_threads
+
+bind = os.environ.get('SUMMARIZER_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('SUMMARIZER_WORKERS', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('SUMMARIZER_WORKER_THREADS', 4))
+timeout = int(os.environ.get('SUMMARIZER_WORKER_TIMEOUT', 300))
+preload_app = True
+
+# Intra-op threads per worker; by default the cores are split between workers
+torch_threads = int(os.environ.get('SUMMARIZER_TORCH_THREADS') or worker_threads(workers))
+
+# Set before the preloaded app imports torch
+set_thread_env(torch_threads)
+
+# Models must be resident before the fork; models loaded lazily would be loaded by every worker
+os.environ.setdefault('SUMMARIZER_WARMUP', os.environ.get('SUMMARIZER_MODELS', 'bart'))
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before the first fork"""
+    frozen = freeze_shared_state()
+    server.log.info(f"Froze {frozen} objects shared with {workers} workers")
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after it is forked"""
+    limit_threads(torch_threads)
@@ -0,0 +1,101 @@
+import logging
+
+from models.chunking import max_input_length, model_prefix
+
+
+class BatchedGenerator:
+    """Run seq2seq generation over many inputs as padded, length-sorted batches"""
+
+    def __init__(self, batch_size=8):
+        """
+        Args:
+            batch_size (int): Maximum number of inputs per generate call
+        """
+        self.logger = logging.getLogger(__name__)
+        self.batch_size = max(1, int(batch_size))
+
+    def generate(self, pipe, inputs, gen_kwargs, batch_size=None, on_result=None):
+        """
+        Summarize many inputs with as few generate calls as possible
+
+        Args:
+            pipe (Pipeline): Summarization pipeline providing the model and tokenizer
+            inputs (list): Texts or token id lists to summarize
+            gen_kwargs (dict or list): Generation settings shared by all inputs, or one per input
+            batch_size (int): Override the default batch size
+            on_result (callable): Called with (index, summary) as each batch finishes
+
+        Returns:
+            list: Summaries in the same order as inputs
+        """
+        if not inputs:
+            return []
+        if isinstance(gen_kwargs, dict):
+            gen_kwargs = [gen_kwargs] * len(inputs)
+
+        # Token ids (e.g. from TokenChunker) are used as-is; only raw texts are tokenized
+        encoded = list(inputs)
+        text_indices = [i for i, item in enumerate(inputs) if isinstance(item, str)]
+        if text_indices:
+            texts = [inputs[i] for i in text_indices]
+            for index, ids in zip(text_indices, self.encode(pipe, texts)):
+                encoded[index] = ids
+        summaries = [None] * len(inputs)
+
+        for batch in self._make_batches(encoded, gen_kwargs, batch_size or self.batch_size):
+            outputs = self._generate_batch(pipe, [encoded[i] for i in batch], gen_kwargs[batch[0]])
+            for index, summary in zip(batch, outputs):
+                summaries[index] = summary
+                if on_result:
+                    on_result(index, summary)
+
+        return summaries
+
+    def encode(self, pipe, texts):
+        """Tokenize texts in one call, without padding, truncated to the model's input limit"""
+        prefix = model_prefix(pipe)
+        encoded = pipe.tokenizer(
+            [prefix + text for text in texts],
+            truncation=True,
+            max_length=max_input_length(pipe)
+        )
+        return encoded['input_ids']
+
+    def _make_batches(self, encoded, gen_kwargs, batch_size):
+        """Group inputs with identical settings, sorted by length to minimise padding"""
+        groups = {}
+        for index, kwargs in enumerate(gen_kwargs):
+            key = tuple(sorted(kwargs.items()))
+            groups.setdefault(key, []).append(index)
+
+        batches = []
+        for indices in groups.values():
+            indices.sort(key=lambda i: len(encoded[i]))
+            for start in range(0, len(indices), batch_size):
+                batches.append(indices[start:start + batch_size])
+        return batches
+
+    def _generate_batch(self, pipe, input_ids, kwargs):
+        """Pad one batch, run generate and decode the outputs"""
+        import torch
+
+        # Right-pad to the longest input in the batch
+        width = max(len(ids) for ids in input_ids)
+        batch_ids = torch.full((len(input_ids), width), pipe.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(input_ids), width), dtype=torch.long)
+        for row, ids in enumerate(input_ids):
+            batch_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+
+        with torch.inference_mode():
+            output_ids = pipe.model.generate(
+                input_ids=batch_ids.to(pipe.device),
+                attention_mask=attention_mask.to(pipe.device),
+                **kwargs
+            )
+
+        return pipe.tokenizer.batch_decode(
+            output_ids,
+            skip_special_tokens=True,
+            clean_up_tokenization_spaces=False
+        )
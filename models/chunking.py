@@ -0,0 +1,235 @@
+import zlib
+import logging
+from bisect import bisect_left
+from contextlib import nullcontext
+
+from utils.document import sentence_spans
+
+
+def max_input_length(pipe):
+    """Return the longest input (in tokens) a pipeline's model accepts"""
+    limit = pipe.tokenizer.model_max_length
+    positions = getattr(pipe.model.config, 'max_position_embeddings', None)
+    if positions:
+        limit = min(limit, positions)
+    # Tokenizers without a configured limit report a huge sentinel value
+    return limit if limit < 100000 else 512
+
+
+def model_prefix(pipe):
+    """Return the task prefix the pipeline adds to inputs (e.g. 'summarize: ' for T5)"""
+    prefix = getattr(pipe, 'prefix', None)
+    if prefix is None:
+        prefix = getattr(pipe.model.config, 'prefix', None) or ''
+    return prefix
+
+
+class TokenChunker:
+    """Pack whole sentences into chunks that fit a model's context window"""
+
+    def __init__(self, overlap_sentences=0, stable_boundaries=False, min_fill=0.5):
+        """
+        Args:
+            overlap_sentences (int): Sentences repeated at the start of the next chunk
+            stable_boundaries (bool): Start chunks at content-defined anchor sentences so an
+                edit only changes the chunks around it, not every chunk after it
+            min_fill (float): Fraction of the window between consecutive anchors at least,
+                so a chunk ending at an anchor is at least this full
+        """
+        self.logger = logging.getLogger(__name__)
+        self.overlap_sentences = max(0, int(overlap_sentences))
+        self.stable_boundaries = stable_boundaries
+        self.min_fill = min_fill
+
+    def chunk(self, pipe, text, max_tokens=None, spans=None, timer=None):
+        """
+        Split text into model-ready chunks
+
+        The document is tokenized once; each chunk carries its token ids
+        (with the model prefix and special tokens) so inference does not
+        re-tokenize it.
+
+        Args:
+            pipe (Pipeline): Summarization pipeline providing the tokenizer
+            text (str): Text to split
+            max_tokens (int): Input limit including special tokens (default: the model's limit)
+            spans (list): Sentence (start, end) offsets already known for text,
+                e.g. from TextProcessor.preprocess(return_sentences=True)
+            timer (StageTimer): Records the time spent tokenizing
+
+        Returns:
+            list: Chunks as dicts with 'text', 'input_ids', 'start' and 'end'
+        """
+        tokenizer = pipe.tokenizer
+        if spans is None:
+            spans = self.sentence_spans(text)
+        if not spans:
+            return []
+
+        with timer.stage('tokenization') if timer else nullcontext():
+            token_ids, sentence_starts = self._tokenize(tokenizer, text, spans)
+        sentence_starts.append(len(token_ids))
+
+        prefix_ids = self._prefix_ids(pipe)
+        if max_tokens is None:
+            max_tokens = max_input_length(pipe)
+        budget = max_tokens - tokenizer.num_special_tokens_to_add(pair=False) - len(prefix_ids)
+        budget = max(1, budget)
+
+        def make_chunk(first, last, token_start, token_end):
+            start, end = spans[first][0], spans[last][1]
+            ids = prefix_ids + token_ids[token_start:token_end]
+            return {
+                'text': text[start:end],
+                'input_ids': tokenizer.build_inputs_with_special_tokens(ids),
+                'start': start,
+                'end': end,
+            }
+
+        anchors = self._anchors(text, spans, sentence_starts, budget) if self.stable_boundaries else ()
+        
+        chunks = []
+        current = []  # Sentence indices in the chunk being packed
+        current_tokens = 0
+
+        for index in range(len(spans)):
+            length = sentence_starts[index + 1] - sentence_starts[index]
+
+            if length > budget:
+                # A sentence longer than the window is split on token boundaries
+                if current:
+                    chunks.append(make_chunk(current[0], current[-1], sentence_starts[current[0]],
+                                             sentence_starts[current[-1] + 1]))
+                    current, current_tokens = [], 0
+                for token_start in range(sentence_starts[index], sentence_starts[index + 1], budget):
+                    token_end = min(token_start + budget, sentence_starts[index + 1])
+                    chunks.append(make_chunk(index, index, token_start, token_end))
+                    chunks[-1]['text'] = tokenizer.decode(token_ids[token_start:token_end]).strip()
+                continue
+
+            if current and (current_tokens + length > budget or index in anchors):
+                chunks.append(make_chunk(current[0], current[-1], sentence_starts[current[0]],
+                                         sentence_starts[current[-1] + 1]))
+                current = self._overlap(current, sentence_starts, budget - length)
+                current_tokens = sum(sentence_starts[i + 1] - sentence_starts[i] for i in current)
+
+            current.append(index)
+            current_tokens += length
+
+        if current:
+            chunks.append(make_chunk(current[0], current[-1], sentence_starts[current[0]],
+                                     sentence_starts[current[-1] + 1]))
+
+        return chunks
+
+    def group(self, pipe, texts, fan_in=None, max_tokens=None):
+        """
+        Pack consecutive texts into groups whose concatenation fits the model
+
+        Used to reduce chunk summaries: each group is summarized as one input.
+        A text longer than the window forms a group of its own (and is
+        truncated by the model).
+
+        Args:
+            pipe (Pipeline): Summarization pipeline providing the tokenizer
+            texts (list): Texts to pack, in order
+            fan_in (int): Most texts per group (default: unlimited)
+            max_tokens (int): Input limit including special tokens (default: the model's limit)
+
+        Returns:
+            list: Groups as lists of text indices, in order
+        """
+        if not texts:
+            return []
+        tokenizer = pipe.tokenizer
+        if max_tokens is None:
+            max_tokens = max_input_length(pipe)
+        budget = max_tokens - tokenizer.num_special_tokens_to_add(pair=False) - len(self._prefix_ids(pipe))
+        budget = max(1, budget)
+        fan_in = max(1, int(fan_in)) if fan_in else len(texts)
+
+        # Texts are joined with a space, which the leading token of each text absorbs
+        lengths = [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False, verbose=False)['input_ids']]
+
+        groups = []
+        current, current_tokens = [], 0
+        for index, length in enumerate(lengths):
+            if current and (current_tokens + length > budget or len(current) >= fan_in):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += length
+        if current:
+            groups.append(current)
+        return groups
+
+    def sentence_spans(self, text):
+        """Return (start, end) character offsets of each sentence"""
+        return sentence_spans(text)
+
+    def _anchors(self, text, spans, sentence_starts, budget):
+        """
+        Sentences that start a chunk whatever came before them
+        
+        A sentence is an anchor when its content hash is the highest of all
+        sentences starting within min_fill of the window on either side.
+        That depends only on nearby text, never on where the current chunk
+        started, so an edit moves only the anchors near it and boundaries
+        further on stay put.
+        """
+        reach = max(1, int(budget * self.min_fill))
+        hashes = [zlib.crc32(' '.join(text[start:end].split()).encode('utf-8')) for start, end in spans]
+        anchors = set()
+        for index in range(1, len(hashes)):
+            if self._highest_within(hashes, sentence_starts, index, reach):
+                anchors.add(index)
+        return anchors
+    
+    @staticmethod
+    def _highest_within(hashes, sentence_starts, index, reach):
+        """Whether a sentence's hash beats every other within reach tokens (the earlier one wins ties)"""
+        position = sentence_starts[index]
+        for step in (-1, 1):
+            other = index + step
+            while 0 <= other < len(hashes) and abs(sentence_starts[other] - position) <= reach:
+                if hashes[other] > hashes[index] or (hashes[other] == hashes[index] and other < index):
+                    return False
+                other += step
+        return True
+
+    def _overlap(self, previous, sentence_starts, room):
+        """Carry trailing sentences of the previous chunk into the next one"""
+        carried = []
+        candidates = previous[-self.overlap_sentences:] if self.overlap_sentences else []
+        for index in reversed(candidates):
+            length = sentence_starts[index + 1] - sentence_starts[index]
+            if length > room:
+                break
+            carried.insert(0, index)
+            room -= length
+        return carried
+
+    def _tokenize(self, tokenizer, text, spans):
+        """Tokenize the document once and find where each sentence starts"""
+        if tokenizer.is_fast:
+            encoded = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+            token_starts = [offset[0] for offset in encoded['offset_mapping']]
+            sentence_starts = [bisect_left(token_starts, start) for start, _ in spans]
+            sentence_starts[0] = 0
+            return encoded['input_ids'], sentence_starts
+
+        # Slow tokenizers have no offsets: tokenize all sentences in one call instead
+        encoded = tokenizer([text[start:end] for start, end in spans], add_special_tokens=False, verbose=False)
+        token_ids, sentence_starts = [], []
+        for ids in encoded['input_ids']:
+            sentence_starts.append(len(token_ids))
+            token_ids.extend(ids)
+        return token_ids, sentence_starts
+
+    @staticmethod
+    def _prefix_ids(pipe):
+        """Token ids of the model's task prefix (e.g. 'summarize: ' for T5)"""
+        prefix = model_prefix(pipe)
+        if not prefix:
+            return []
+        return pipe.tokenizer(prefix, add_special_tokens=False)['input_ids']
@@ -0,0 +1,73 @@
+import time
+
+
+class Deadline:
+    """
+    Time budget of one summarization request
+
+    Stages record how long their model calls take; the deadline projects the
+    cost of the work left from that rate and tells the summarizer when it has
+    to switch to something cheaper. Every switch is recorded so the result
+    can be flagged as degraded.
+    """
+
+    def __init__(self, budget_s, safety_margin=0.1, clock=time.monotonic):
+        """
+        Args:
+            budget_s (float): Seconds the request may take, counted from now
+            safety_margin (float): Fraction of the budget kept in reserve
+            clock (callable): Monotonic time source
+        """
+        self.clock = clock
+        self.budget_s = float(budget_s)
+        self.started = clock()
+        self.expires = self.started + self.budget_s * (1.0 - safety_margin)
+        self.degradations = []
+        self._rates = {}  # model type -> [inputs done, seconds spent]
+
+    @property
+    def degraded(self):
+        return bool(self.degradations)
+
+    def remaining(self):
+        """Seconds left before the deadline (negative once it has passed)"""
+        return self.expires - self.clock()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def record(self, model_type, inputs, seconds):
+        """Add the duration of a model call over some inputs to the model's observed rate"""
+        rate = self._rates.setdefault(model_type, [0, 0.0])
+        rate[0] += inputs
+        rate[1] += seconds
+
+    def has_rate(self, model_type):
+        """Whether a call of the model has been timed yet"""
+        return bool(self._rates.get(model_type, (0, 0.0))[0])
+
+    def at_risk(self, model_type, inputs):
+        """
+        Whether running a model over more inputs would miss the deadline
+
+        Before the model's first call there is no rate to project from, so
+        only an expired deadline counts as a risk; callers probe the rate
+        with a single input first (see has_rate).
+
+        Args:
+            model_type (str): Model that would run
+            inputs (int): Inputs it would summarize
+
+        Returns:
+            bool: True if the work should be degraded
+        """
+        if self.expired():
+            return True
+        done, spent = self._rates.get(model_type, (0, 0.0))
+        if not done or not inputs:
+            return False
+        return spent / done * inputs > self.remaining()
+
+    def degrade(self, stage, replacement, inputs):
+        """Record that some inputs of a stage were handed to a cheaper replacement"""
+        self.degradations.append({'stage': stage, 'to': replacement, 'inputs': inputs})
@@ -0,0 +1,229 @@
+import re
+import logging
+
+import numpy as np
+from scipy import sparse
+
+ALGORITHMS = ('lexrank', 'luhn', 'lsa')
+
+# Terms counted as words: letters, optionally joined by apostrophes or hyphens
+WORD_TERM_PATTERN = re.compile(r"^[^\W\d_](?:[^\W\d_]|['-])*$")
+
+
+class ExtractiveSummarizer:
+    """
+    LexRank, Luhn and LSA sentence ranking over sparse sentence-term matrices
+
+    Scores follow sumy's definitions so the same sentences are selected, but
+    every document of a batch is scored with a few vectorized operations
+    instead of per-sentence Python loops.
+    """
+
+    def __init__(self, lexrank_threshold=0.1, lexrank_epsilon=0.1, luhn_max_gap=4, lsa_smoothing=0.4,
+                 max_iterations=1000):
+        """
+        Args:
+            lexrank_threshold (float): Cosine similarity above which sentences are linked
+            lexrank_epsilon (float): Power iteration stops once scores move less than this
+            luhn_max_gap (int): Insignificant words that end a Luhn chunk
+            lsa_smoothing (float): Smoothing of the maximum-tf normalization used by LSA
+            max_iterations (int): Upper bound on power iterations
+        """
+        self.logger = logging.getLogger(__name__)
+        self.lexrank_threshold = lexrank_threshold
+        self.lexrank_epsilon = lexrank_epsilon
+        self.luhn_max_gap = luhn_max_gap
+        self.lsa_smoothing = lsa_smoothing
+        self.max_iterations = max_iterations
+
+    def summarize(self, document, sentences_count, algorithm='lexrank'):
+        """
+        Select the best sentences of a document
+
+        Args:
+            document (Document): Tokenized document
+            sentences_count (int): Number of sentences to select
+            algorithm (str): 'lexrank', 'luhn' or 'lsa'
+
+        Returns:
+            list: Selected sentences in document order
+        """
+        return self.summarize_batch([document], sentences_count, algorithm)[0]
+
+    def summarize_batch(self, documents, sentences_count, algorithm='lexrank'):
+        """Select the best sentences of many documents scored together (sentences_count may be per document)"""
+        if isinstance(sentences_count, int):
+            sentences_count = [sentences_count] * len(documents)
+        results = []
+        for document, scores, count in zip(documents, self.score_batch(documents, algorithm), sentences_count):
+            # Highest scores first, earlier sentences winning ties, then back in document order
+            best = np.sort(np.argsort(-scores, kind='stable')[:count])
+            results.append([document.sentence(index) for index in best])
+        return results
+
+    def score_batch(self, documents, algorithm='lexrank'):
+        """
+        Score every sentence of many documents in one pass
+
+        Args:
+            documents (list): Tokenized documents
+            algorithm (str): 'lexrank', 'luhn' or 'lsa'
+
+        Returns:
+            list: One array of sentence scores per document
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown extractive algorithm {algorithm}")
+
+        matrix = _SentenceTermMatrix(documents)
+        if not matrix.counts.shape[1]:
+            # No sentence has a word to rank it by, e.g. chunks like "." or "1. 2. 3."
+            scores = np.zeros(matrix.counts.shape[0])
+        elif algorithm == 'lexrank':
+            scores = self._lexrank(matrix)
+        elif algorithm == 'luhn':
+            scores = self._luhn(matrix)
+        else:
+            scores = self._lsa(matrix)
+        return np.split(scores, matrix.sentence_offsets[1:-1])
+
+    def term_counts(self, documents):
+        """Number of distinct word terms in each document; documents without any cannot be ranked"""
+        return _SentenceTermMatrix(documents).term_counts.astype(int).tolist()
+
+    def _lexrank(self, matrix):
+        """Stationary distribution of the thresholded idf-modified cosine graph"""
+        counts = matrix.counts
+        sentence_doc = matrix.sentence_doc
+
+        # Term frequency normalized by each sentence's most frequent term
+        row_max = counts.max(axis=1).toarray().ravel()
+        row_max[row_max == 0] = 1
+        tf = sparse.diags(1.0 / row_max) @ counts
+
+        # Each sentence is a document for idf; columns never span documents
+        containing = np.diff(counts.tocsc().indptr)
+        idf = np.log(matrix.sentence_counts[matrix.term_doc] / (1.0 + containing))
+        weights = tf @ sparse.diags(idf)
+
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        weights = sparse.diags(inverse_norms) @ weights
+
+        # Similarities are block diagonal: sentences of different documents share no terms
+        links = (weights @ weights.T > self.lexrank_threshold).astype(np.float64)
+        degrees = np.asarray(links.sum(axis=1)).ravel()
+        degrees[degrees == 0] = 1
+        transition = (sparse.diags(1.0 / degrees) @ links).T.tocsr()
+
+        documents = len(matrix.sentence_counts)
+        scores = 1.0 / matrix.sentence_counts[sentence_doc]
+        active = np.ones(documents, dtype=bool)
+        for _ in range(self.max_iterations):
+            next_scores = transition @ scores
+            doc_norms = np.sqrt(np.bincount(sentence_doc, next_scores ** 2, minlength=documents))
+            next_scores /= np.where(doc_norms > 0, doc_norms, 1.0)[sentence_doc]
+            change = np.sqrt(np.bincount(sentence_doc, (next_scores - scores) ** 2, minlength=documents))
+
+            # Documents stop iterating independently, as if ranked one at a time
+            updating = active[sentence_doc]
+            scores[updating] = next_scores[updating]
+            active &= (change > self.lexrank_epsilon) & (doc_norms > 0)
+            if not active.any():
+                break
+        return scores
+
+    def _luhn(self, matrix):
+        """Best chunk of significant words per sentence"""
+        document_counts = np.asarray(matrix.counts.sum(axis=0)).ravel()
+        # Significant words occur more than once in their document
+        significant = np.flatnonzero(document_counts[matrix.word_terms] > 1)
+        scores = np.zeros(matrix.counts.shape[0])
+        if not len(significant):
+            return scores
+
+        sentences = matrix.word_sentences[significant]
+        # A chunk ends at a sentence boundary or after luhn_max_gap insignificant words
+        starts = np.ones(len(significant), dtype=bool)
+        starts[1:] = (np.diff(sentences) != 0) | (np.diff(significant) > self.luhn_max_gap)
+        chunk_starts = np.flatnonzero(starts)
+        chunk_ends = np.append(chunk_starts[1:], len(significant)) - 1
+
+        significant_words = (chunk_ends - chunk_starts + 1).astype(np.float64)
+        lengths = significant[chunk_ends] - significant[chunk_starts] + 1
+        ratings = np.where(significant_words > 1, significant_words ** 2 / lengths, 0.0)
+        np.maximum.at(scores, sentences[chunk_starts], ratings)
+        return scores
+
+    def _lsa(self, matrix):
+        """
+        LSA rank of each sentence
+
+        With every singular value kept (sumy's default reduction ratio of 1),
+        sqrt(sum(sigma_i**2 * v_ij**2)) equals the norm of sentence column j of
+        the smoothed term matrix, so it is computed directly without an SVD.
+        """
+        counts = matrix.counts.tocsr()
+        smooth = self.lsa_smoothing
+        row_max = counts.max(axis=1).toarray().ravel()
+
+        # Cells of a sentence with any terms become smooth + (1 - smooth) * tf / max_tf,
+        # so absent terms contribute smooth ** 2 each
+        row_of = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        normalized = smooth + (1.0 - smooth) * counts.data / row_max[row_of]
+        present = np.bincount(row_of, normalized ** 2 - smooth ** 2, minlength=counts.shape[0])
+        vocabulary_sizes = matrix.term_counts[matrix.sentence_doc]
+        squared = np.where(row_max > 0, vocabulary_sizes * smooth ** 2 + present, 0.0)
+        return np.sqrt(squared)
+
+
+class _SentenceTermMatrix:
+    """Sentence-by-term counts of a batch, with terms numbered per document"""
+
+    def __init__(self, documents):
+        word_sentences, word_terms = [], []
+        sentence_counts, term_counts = [], []
+        sentence_offset = term_offset = 0
+        word_filters = {}
+
+        for document in documents:
+            sentence_index, term_ids = self._document_words(document, word_filters)
+            # Renumber terms so every document owns a disjoint block of columns
+            terms, local_ids = np.unique(term_ids, return_inverse=True)
+
+            word_sentences.append(sentence_index + sentence_offset)
+            word_terms.append(local_ids.ravel() + term_offset)
+            sentence_counts.append(document.sentence_count)
+            term_counts.append(len(terms))
+            sentence_offset += document.sentence_count
+            term_offset += len(terms)
+
+        self.word_sentences = np.concatenate(word_sentences) if word_sentences else np.zeros(0, dtype=np.int64)
+        self.word_terms = np.concatenate(word_terms) if word_terms else np.zeros(0, dtype=np.int64)
+        self.sentence_counts = np.array(sentence_counts, dtype=np.float64)
+        self.term_counts = np.array(term_counts, dtype=np.float64)
+        self.sentence_offsets = np.concatenate([[0], np.cumsum(sentence_counts, dtype=np.int64)])
+        self.sentence_doc = np.repeat(np.arange(len(sentence_counts)), sentence_counts)
+        self.term_doc = np.repeat(np.arange(len(term_counts)), term_counts)
+        self.counts = sparse.csr_matrix(
+            (np.ones(len(self.word_terms)), (self.word_sentences, self.word_terms)),
+            shape=(sentence_offset, term_offset)
+        )
+
+    @staticmethod
+    def _document_words(document, word_filters):
+        """Sentence index and term id of each word that counts as a word"""
+        term_ids = document.term_ids
+        sentence_index = document.word_sentences()
+
+        # Which vocabulary terms are words is decided once per vocabulary
+        word_filter = word_filters.get(id(document.vocabulary))
+        if word_filter is None or len(word_filter) < len(document.vocabulary):
+            word_filter = np.array(
+                [bool(WORD_TERM_PATTERN.match(term)) for term in document.terms()], dtype=bool
+            )
+            word_filters[id(document.vocabulary)] = word_filter
+
+        keep = (sentence_index >= 0) & (term_ids >= 0)
+        keep[keep] = word_filter[term_ids[keep]]
+        return sentence_index[keep], term_ids[keep]
@@ -0,0 +1,138 @@
+import logging
+
+# Per-profile generation settings:
+#   length_ratio        summary tokens per input token
+#   min_summary/max_summary  bounds on the summary length in tokens
+#   max_beams           widest beam search used
+#   beam_token_budget   beams * summary tokens allowed per chunk; longer summaries get fewer beams
+#   greedy_below        summaries shorter than this many tokens use greedy search
+#   skip_below          chunks shorter than this many tokens are not sent to the model
+#   short_chunks        what replaces a skipped chunk's summary: 'passthrough' or 'extractive'
+#   length_penalty      beam search length penalty
+PROFILES = {
+    'fast': {
+        'length_ratio': 0.25,
+        'min_summary': 10,
+        'max_summary': 100,
+        'max_beams': 1,
+        'beam_token_budget': 100,
+        'greedy_below': 0,
+        'skip_below': 96,
+        'short_chunks': 'extractive',
+        'length_penalty': 1.0,
+    },
+    'balanced': {
+        'length_ratio': 0.33,
+        'min_summary': 30,
+        'max_summary': 150,
+        'max_beams': 4,
+        'beam_token_budget': 600,
+        'greedy_below': 40,
+        'skip_below': 48,
+        'short_chunks': 'passthrough',
+        'length_penalty': 2.0,
+    },
+    'quality': {
+        'length_ratio': 0.4,
+        'min_summary': 40,
+        'max_summary': 200,
+        'max_beams': 6,
+        'beam_token_budget': 1200,
+        'greedy_below': 0,
+        'skip_below': 16,
+        'short_chunks': 'passthrough',
+        'length_penalty': 2.0,
+    },
+}
+
+# Summary lengths are rounded up to a multiple of this so chunks of similar
+# size share generation settings and therefore batches
+LENGTH_BUCKET = 16
+
+
+class GenerationPolicy:
+    """
+    Choose generation settings for each input from its length and a profile
+
+    Short inputs get short summaries and cheap searches, long inputs get
+    wider beams within the profile's decoding budget, and inputs too short
+    to be worth a model call are skipped altogether.
+    """
+
+    def __init__(self, default_profile='balanced', profiles=None):
+        """
+        Args:
+            default_profile (str): Profile used when a request names none
+            profiles (dict): Profile settings overriding PROFILES
+        """
+        self.logger = logging.getLogger(__name__)
+        self.profiles = dict(PROFILES)
+        self.profiles.update(profiles or {})
+        self.default_profile = self.resolve(default_profile)
+
+    def resolve(self, profile=None):
+        """
+        Return the profile name to use for a request
+
+        Raises:
+            ValueError: If the profile is not known
+        """
+        if profile is None:
+            return self.default_profile
+        if profile not in self.profiles:
+            raise ValueError(f"Unknown generation profile {profile}; expected one of {', '.join(self.profiles)}")
+        return profile
+
+    def chunk_kwargs(self, input_tokens, profile=None):
+        """
+        Generation settings for one input
+
+        Args:
+            input_tokens (int): Length of the input in tokens
+            profile (str): Profile name (default: the default profile)
+
+        Returns:
+            dict: Settings for generate(), or None if the input should be skipped
+        """
+        settings = self.profiles[self.resolve(profile)]
+        if input_tokens < settings['skip_below']:
+            return None
+
+        max_length = int(input_tokens * settings['length_ratio'])
+        max_length = -(-max_length // LENGTH_BUCKET) * LENGTH_BUCKET
+        max_length = max(LENGTH_BUCKET, min(settings['max_summary'], max_length))
+        # Keep the lower bound below the upper one for short inputs
+        min_length = min(settings['min_summary'], max_length // 2)
+        return self._search_kwargs(settings, min_length, max_length)
+
+    def final_kwargs(self, max_sentences, profile=None):
+        """Generation settings for the last reduce step, sized by the requested sentence count"""
+        settings = self.profiles[self.resolve(profile)]
+        return self._search_kwargs(settings, max_sentences * 10, max_sentences * 20)
+
+    def short_chunk_strategy(self, profile=None):
+        """How a skipped chunk is summarized: 'passthrough' or 'extractive'"""
+        return self.profiles[self.resolve(profile)]['short_chunks']
+
+    def signature(self, profile=None):
+        """Settings that change summaries, used as part of cache keys"""
+        name = self.resolve(profile)
+        return {'profile': name, 'settings': self.profiles[name], 'length_bucket': LENGTH_BUCKET}
+
+    @staticmethod
+    def _search_kwargs(settings, min_length, max_length):
+        """Beam or greedy search settings for a summary length"""
+        beams = max(1, min(settings['max_beams'], settings['beam_token_budget'] // max_length))
+        if max_length < settings['greedy_below']:
+            beams = 1
+
+        kwargs = {
+            'min_length': min_length,
+            'max_length': max_length,
+            'do_sample': False,
+            'num_beams': beams,
+        }
+        if beams > 1:
+            kwargs['length_penalty'] = settings['length_penalty']
+            kwargs['early_stopping'] = True
+        return kwargs
@@ -0,0 +1,111 @@
+import logging
+
+import numpy as np
+from scipy import sparse
+
+# Common words never used as keywords
+KEY_POINT_STOP_WORDS = frozenset([
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by',
+    'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'shall', 'can', 'this', 'that', 'these',
+    'those', 'from', 'such', 'your', 'their', 'which', 'other', 'than', 'then', 'into', 'about',
+])
+
+
+class KeyPointExtractor:
+    """
+    Pick the sentences that best cover a document's keywords
+
+    Every sentence is scored in one sparse matrix-vector product over a
+    sentence-by-term incidence matrix, so the cost is linear in the length
+    of the document and no sentence is skipped.
+    """
+
+    def __init__(self, max_points=5, keywords=10, min_sentence_chars=30, min_term_length=4):
+        """
+        Args:
+            max_points (int): Key points returned per document
+            keywords (int): Highest tf-idf terms used to score sentences
+            min_sentence_chars (int): Shorter sentences are never key points
+            min_term_length (int): Shorter terms are never keywords
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_points = max_points
+        self.keywords = keywords
+        self.min_sentence_chars = min_sentence_chars
+        self.min_term_length = min_term_length
+
+    def extract(self, document):
+        """
+        Score every sentence and return the best ones
+
+        A sentence scores the summed weight of the distinct keywords it
+        contains, where a keyword's weight is its tf-idf relative to the
+        strongest keyword.
+
+        Args:
+            document (Document): Tokenized document
+
+        Returns:
+            list: Dicts with 'text', 'score' (0-1), 'position' (sentence index),
+                'start' and 'end' (character offsets), in document order
+        """
+        if not document.sentence_count:
+            return []
+
+        # Sentence-by-term incidence: a term counts once per sentence
+        word_sentences = document.word_sentences()
+        keep = (word_sentences >= 0) & (document.term_ids >= 0)
+        incidence = sparse.csr_matrix(
+            (np.ones(int(keep.sum())), (word_sentences[keep], document.term_ids[keep])),
+            shape=(document.sentence_count, len(document.vocabulary))
+        )
+        incidence.sum_duplicates()
+        incidence.data[:] = 1.0
+
+        weights = self._keyword_weights(document, np.asarray(incidence.sum(axis=0)).ravel())
+        if not weights.any():
+            return []
+        scores = incidence @ weights
+
+        lengths = document.sentence_spans[:, 1] - document.sentence_spans[:, 0]
+        scores[lengths < self.min_sentence_chars] = 0
+
+        # Best scores first, earlier sentences winning ties, then back in document order
+        ranked = np.argsort(-scores, kind='stable')[:self.max_points]
+        best = np.sort(ranked[scores[ranked] > 0])
+        top_score = scores[ranked[0]] or 1.0
+
+        key_points = []
+        for position in best.tolist():
+            start, end = document.sentence_spans[position].tolist()
+            key_points.append({
+                'text': document.text[start:end],
+                'score': round(float(scores[position] / top_score), 3),
+                'position': position,
+                'start': start,
+                'end': end,
+            })
+        return key_points
+
+    def _keyword_weights(self, document, sentence_frequency):
+        """
+        Weight of each vocabulary term: relative tf-idf for keywords, 0 otherwise
+
+        Sentences act as documents for idf, so boilerplate repeated in every
+        paragraph does not crowd out terms specific to a few clauses.
+        """
+        counts = document.term_counts().astype(np.float64)
+        for term_id, term in enumerate(document.terms()):
+            if counts[term_id] and (len(term) < self.min_term_length or term in KEY_POINT_STOP_WORDS):
+                counts[term_id] = 0
+
+        idf = np.log((document.sentence_count + 1) / np.maximum(sentence_frequency, 1))
+        tfidf = counts * idf
+
+        weights = np.zeros_like(tfidf)
+        top = np.argsort(-tfidf, kind='stable')[:self.keywords]
+        top = top[tfidf[top] > 0]
+        if len(top):
+            weights[top] = tfidf[top] / tfidf[top[0]]
+        return weights
@@ -0,0 +1,305 @@
+import gc
+import os
+import sys
+import threading
+import time
+import logging
+from collections import OrderedDict
+
+from utils.metrics import MODEL_LOADS
+
+# Hugging Face checkpoints backing each abstractive model type
+MODEL_CHECKPOINTS = {
+    'bart': 'facebook/bart-large-cnn',
+    't5': 't5-small',
+    'legal': 'ml6team/distilbart-tos-summarizer-tosdr',
+}
+
+# Inference backends a model type can be served with:
+#   torch - the fp32 transformers pipeline
+#   int8  - the same pipeline with nn.Linear layers dynamically quantized to int8
+#   onnx  - ONNX Runtime encoder/decoder sessions with KV-cache (requires optimum)
+BACKENDS = ('torch', 'int8', 'onnx')
+
+# Approximate fp32 resident size of each model, used to make room before loading
+MODEL_SIZE_HINTS_MB = {
+    'bart': 1630,
+    't5': 240,
+    'legal': 1230,
+}
+
+
+class ModelRegistry:
+    """Load summarization pipelines on first use and keep them within a memory budget"""
+
+    def __init__(self, allowed_models=None, memory_budget_mb=None, loader=None,
+                 checkpoints=None, size_hints_mb=None, backends=None, onnx_dir=None):
+        """
+        Args:
+            allowed_models (list): Model types this process may load (default: all known)
+            memory_budget_mb (float): Evict least recently used models above this size
+            loader (callable): Builds a pipeline from a checkpoint name
+            checkpoints (dict): Model type to checkpoint mapping
+            size_hints_mb (dict): Model type to expected size mapping
+            backends (dict): Model type to backend ('torch', 'int8' or 'onnx'; default torch)
+            onnx_dir (str): Directory where ONNX exports are kept between runs
+        """
+        self.logger = logging.getLogger(__name__)
+        self.checkpoints = dict(checkpoints or MODEL_CHECKPOINTS)
+        self.size_hints_mb = dict(size_hints_mb or MODEL_SIZE_HINTS_MB)
+        if allowed_models is None:
+            allowed_models = self.checkpoints.keys()
+        self.allowed_models = [name for name in allowed_models if name in self.checkpoints]
+        self.memory_budget_mb = memory_budget_mb
+        self._loader = loader or self._load_pipeline
+        self.backends = dict(backends or {})
+        for model_type, backend in self.backends.items():
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown backend {backend} for model {model_type}")
+        self.onnx_dir = onnx_dir
+
+        self._models = OrderedDict()  # Least recently used first
+        self._sizes_mb = {}
+        self._lock = threading.RLock()
+        self._load_locks = {name: threading.Lock() for name in self.allowed_models}
+
+        self.load_count = 0
+        self.eviction_count = 0
+
+    def is_allowed(self, model_type):
+        """Check whether a model type may be served by this process"""
+        return model_type in self.allowed_models
+
+    def backend(self, model_type):
+        """Return the inference backend configured for a model type"""
+        return self.backends.get(model_type, 'torch')
+
+    def is_loaded(self, model_type):
+        """Check whether a model type is currently resident"""
+        with self._lock:
+            return model_type in self._models
+
+    def loaded_models(self):
+        """Return resident model types, least recently used first"""
+        with self._lock:
+            return list(self._models)
+
+    def get(self, model_type):
+        """
+        Return the pipeline for a model type, loading it on first use
+
+        Args:
+            model_type (str): Model to fetch ('bart', 't5', 'legal')
+
+        Returns:
+            Pipeline: Loaded summarization pipeline
+        """
+        if not self.is_allowed(model_type):
+            raise ValueError(f"Model {model_type} not available")
+
+        with self._lock:
+            model = self._models.get(model_type)
+            if model is not None:
+                self._models.move_to_end(model_type)
+                return model
+
+        # Only one thread loads a given model; others wait and reuse it
+        with self._load_locks[model_type]:
+            with self._lock:
+                model = self._models.get(model_type)
+                if model is not None:
+                    self._models.move_to_end(model_type)
+                    return model
+
+            self._make_room(self.size_hints_mb.get(model_type, 0), keep=model_type)
+
+            start_time = time.time()
+            model = self._load(model_type)
+            size_mb = self._estimate_size_mb(model, model_type)
+
+            with self._lock:
+                self._models[model_type] = model
+                self._sizes_mb[model_type] = size_mb
+                self.load_count += 1
+            MODEL_LOADS.inc(model=model_type, backend=self.backend(model_type))
+
+            self.logger.info(
+                f"Loaded {model_type} model ({self.backend(model_type)}) in "
+                f"{time.time() - start_time:.1f}s ({size_mb:.0f}MB)"
+            )
+            self._make_room(0, keep=model_type)
+            return model
+
+    def warm_up(self, model_types=None):
+        """
+        Pre-load models so the first request does not pay the load cost
+
+        Args:
+            model_types (list): Models to load (default: all allowed models)
+
+        Returns:
+            list: Model types that were loaded successfully
+        """
+        loaded = []
+        for model_type in model_types or self.allowed_models:
+            try:
+                self.get(model_type)
+                loaded.append(model_type)
+            except Exception as e:
+                self.logger.error(f"Error warming up {model_type}: {str(e)}")
+        return loaded
+
+    def evict(self, model_type):
+        """Drop a resident model so its memory can be reclaimed"""
+        with self._lock:
+            model = self._models.pop(model_type, None)
+            self._sizes_mb.pop(model_type, None)
+            if model is None:
+                return False
+            self.eviction_count += 1
+
+        del model
+        self._release_memory()
+        self.logger.info(f"Evicted {model_type} model")
+        return True
+
+    def memory_usage_mb(self):
+        """Return the estimated size of all resident models"""
+        with self._lock:
+            return sum(self._sizes_mb.values())
+
+    def stats(self):
+        """Return registry state for monitoring"""
+        with self._lock:
+            return {
+                'allowed_models': list(self.allowed_models),
+                'backends': {name: self.backend(name) for name in self.allowed_models},
+                'loaded_models': list(self._models),
+                'memory_mb': round(sum(self._sizes_mb.values()), 1),
+                'memory_budget_mb': self.memory_budget_mb,
+                'loads': self.load_count,
+                'evictions': self.eviction_count,
+            }
+
+    def _make_room(self, incoming_mb, keep=None):
+        """Evict least recently used models until incoming_mb fits the budget"""
+        if not self.memory_budget_mb:
+            return
+
+        while True:
+            with self._lock:
+                used_mb = sum(self._sizes_mb.values())
+                candidates = [name for name in self._models if name != keep]
+                if used_mb + incoming_mb <= self.memory_budget_mb or not candidates:
+                    return
+                victim = candidates[0]
+            self.evict(victim)
+
+    def _load(self, model_type):
+        """Build the pipeline for a model type with its configured backend"""
+        checkpoint = self.checkpoints[model_type]
+        backend = self.backend(model_type)
+        if backend == 'onnx':
+            return self._load_onnx_pipeline(checkpoint)
+
+        pipe = self._loader(checkpoint)
+        if backend == 'int8':
+            pipe = self._quantize_pipeline(pipe)
+        return pipe
+
+    def _estimate_size_mb(self, model, model_type):
+        """Measure parameter and buffer memory of a loaded pipeline"""
+        try:
+            module = model.model
+            if not hasattr(module, 'parameters'):
+                # ONNX Runtime sessions hold roughly the size of their exported graphs
+                export_dir = str(module.model_save_dir)
+                total_bytes = sum(
+                    os.path.getsize(os.path.join(export_dir, name))
+                    for name in os.listdir(export_dir) if '.onnx' in name
+                )
+                return total_bytes / (1024 * 1024)
+
+            total_bytes = sum(p.numel() * p.element_size() for p in module.parameters())
+            total_bytes += sum(b.numel() * b.element_size() for b in module.buffers())
+            # Dynamically quantized layers keep packed weights outside parameters()
+            for layer in module.modules():
+                if hasattr(layer, '_packed_params') and callable(getattr(layer, 'weight', None)):
+                    weight = layer.weight()
+                    total_bytes += weight.numel() * weight.element_size()
+            return total_bytes / (1024 * 1024)
+        except Exception:
+            return float(self.size_hints_mb.get(model_type, 0))
+
+    def _release_memory(self):
+        """Return freed model memory to the allocator"""
+        gc.collect()
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    @staticmethod
+    def _load_pipeline(checkpoint):
+        """Build a summarization pipeline for a checkpoint"""
+        # Imported lazily so extractive-only workers never load torch
+        import torch
+        from transformers import pipeline
+
+        return pipeline(
+            "summarization",
+            model=checkpoint,
+            device=0 if torch.cuda.is_available() else -1
+        )
+
+    @staticmethod
+    def _quantize_pipeline(pipe):
+        """Quantize a pipeline's linear layers to int8 in place (CPU inference)"""
+        import torch
+
+        torch.ao.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return pipe
+
+    def _load_onnx_pipeline(self, checkpoint):
+        """
+        Build a summarization pipeline on ONNX Runtime sessions
+
+        The checkpoint is exported (encoder, decoder and decoder-with-past for
+        KV-cache reuse) on first use; with onnx_dir set the export is saved
+        and later loads skip it.
+        """
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError:
+            raise ValueError("The onnx backend requires optimum[onnxruntime]")
+        from transformers import AutoTokenizer, pipeline
+
+        export_dir = None
+        if self.onnx_dir:
+            export_dir = os.path.join(self.onnx_dir, checkpoint.strip('/').replace('/', '--'))
+
+        if export_dir and os.path.isdir(export_dir):
+            model = ORTModelForSeq2SeqLM.from_pretrained(export_dir, use_cache=True)
+            tokenizer = AutoTokenizer.from_pretrained(export_dir)
+        else:
+            model = ORTModelForSeq2SeqLM.from_pretrained(checkpoint, export=True, use_cache=True)
+            tokenizer = AutoTokenizer.from_pretrained(checkpoint)
+            if export_dir:
+                self._save_export(model, tokenizer, export_dir)
+
+        return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+    def _save_export(self, model, tokenizer, export_dir):
+        """Save an ONNX export atomically, so concurrent workers never see a partial one"""
+        import shutil
+
+        temp_dir = f"{export_dir}.tmp-{os.getpid()}"
+        try:
+            model.save_pretrained(temp_dir)
+            tokenizer.save_pretrained(temp_dir)
+            os.rename(temp_dir, export_dir)
+            self.logger.info(f"Saved ONNX export to {export_dir}")
+        except OSError as e:
+            # Another worker finished the same export first
+            self.logger.info(f"ONNX export not saved to {export_dir}: {str(e)}")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
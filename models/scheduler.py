@@ -0,0 +1,169 @@
+import os
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future, as_completed
+
+
+class InferenceScheduler:
+    """Collect chunks from concurrent requests and summarize them in shared batches"""
+
+    def __init__(self, registry, generator, max_batch_size=16, max_wait_ms=10):
+        """
+        Args:
+            registry (ModelRegistry): Source of loaded pipelines
+            generator (BatchedGenerator): Runs batched generation
+            max_batch_size (int): Most chunks sent to one generate call
+            max_wait_ms (float): How long to wait for more chunks before running a batch
+        """
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry
+        self.generator = generator
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_queue_depth': 0,
+            'total_batch_size': 0,
+            'total_queue_wait': 0.0,
+        }
+
+    def submit(self, model_type, chunk, gen_kwargs):
+        """
+        Queue one chunk for summarization
+
+        Args:
+            model_type (str): Model to run the chunk through
+            chunk (str or list): Chunk text or token ids
+            gen_kwargs (dict): Generation settings for the chunk
+
+        Returns:
+            Future: Resolves to the chunk summary
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((model_type, chunk, gen_kwargs, future, time.time()))
+
+        with self._lock:
+            self._metrics['submitted'] += 1
+            depth = self._queue.qsize()
+            if depth > self._metrics['max_queue_depth']:
+                self._metrics['max_queue_depth'] = depth
+        return future
+
+    def generate(self, model_type, chunks, gen_kwargs, timeout=None, on_result=None):
+        """
+        Summarize chunks through the shared queue and wait for the results
+
+        Args:
+            model_type (str): Model to run the chunks through
+            chunks (list): Chunk texts or token ids
+            gen_kwargs (dict or list): Settings shared by all chunks, or one per chunk
+            timeout (float): Seconds to wait for each result
+            on_result (callable): Called with (index, summary) as each chunk finishes
+
+        Returns:
+            list: Summaries in the same order as chunks
+        """
+        if isinstance(gen_kwargs, dict):
+            gen_kwargs = [gen_kwargs] * len(chunks)
+        futures = [self.submit(model_type, chunk, kwargs) for chunk, kwargs in zip(chunks, gen_kwargs)]
+        if on_result:
+            positions = {future: index for index, future in enumerate(futures)}
+            for future in as_completed(futures, timeout=timeout):
+                on_result(positions[future], future.result())
+        return [future.result(timeout=timeout) for future in futures]
+
+    def stats(self):
+        """Return queue and batching metrics"""
+        with self._lock:
+            metrics = dict(self._metrics)
+
+        batches = metrics.pop('batches')
+        total_batch_size = metrics.pop('total_batch_size')
+        total_queue_wait = metrics.pop('total_queue_wait')
+        processed = metrics['completed'] + metrics['failed']
+
+        metrics.update({
+            'queue_depth': self._queue.qsize(),
+            'batches': batches,
+            'avg_batch_size': round(total_batch_size / batches, 2) if batches else 0,
+            'avg_queue_wait_ms': round(total_queue_wait * 1000 / processed, 2) if processed else 0,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+        })
+        return metrics
+
+    def _ensure_started(self):
+        """Start the worker thread, including after a fork (threads do not survive fork)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Worker loop: gather a batch, then run it"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self._process(batch)
+            except Exception as e:
+                self.logger.error(f"Scheduler batch error: {str(e)}")
+
+    def _process(self, batch):
+        """Run one gathered batch, grouped per model, and resolve its futures"""
+        started = time.time()
+        groups = {}
+        for item in batch:
+            future = item[3]
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(item[0], []).append(item)
+
+        for model_type, items in groups.items():
+            try:
+                pipe = self.registry.get(model_type)
+                summaries = self.generator.generate(
+                    pipe,
+                    [item[1] for item in items],
+                    [item[2] for item in items],
+                    batch_size=self.max_batch_size
+                )
+                for item, summary in zip(items, summaries):
+                    item[3].set_result(summary)
+                outcome = 'completed'
+            except Exception as e:
+                self.logger.error(f"Batched generation error for {model_type}: {str(e)}")
+                for item in items:
+                    item[3].set_exception(e)
+                outcome = 'failed'
+
+            with self._lock:
+                self._metrics[outcome] += len(items)
+                self._metrics['batches'] += 1
+                self._metrics['total_batch_size'] += len(items)
+                self._metrics['total_queue_wait'] += sum(started - item[4] for item in items)
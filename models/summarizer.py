@@ -1,14 +1,19 @@
 import time
 import logging
 
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lex_rank import LexRankSummarizer
-from sumy.summarizers.luhn import LuhnSummarizer
-from sumy.summarizers.lsa import LsaSummarizer
 import nltk
-import torch
+
+from models.batching import BatchedGenerator
+from models.chunking import TokenChunker
+from models.deadline import Deadline
+from models.extractive import ALGORITHMS, ExtractiveSummarizer
+from models.generation_policy import GenerationPolicy
+from models.key_points import KeyPointExtractor
+from models.model_registry import ModelRegistry
+from models.scheduler import InferenceScheduler
+from utils.clauses import ClauseIndex, ClauseSegmenter
+from utils.document import Document
+from utils.metrics import CACHE_REQUESTS, CHUNK_GENERATION_SECONDS, ERRORS, FALLBACKS, StageTimer
 
 # Download required NLTK data
 try:
@@ -16,200 +21,611 @@ try:
 except LookupError:
     nltk.download('punkt')
 
+ABSTRACTIVE_MODELS = ['bart', 't5', 'legal']
+
+# Bumped whenever a change makes previously cached summaries stale
+CACHE_VERSION = 5
+
+class TextTooShortError(ValueError):
+    """Raised when a document has too few words to summarize"""
+
 class TextSummarizer:
     """Comprehensive text summarization class with multiple model support"""
     
-    def __init__(self):
-        self.models = {}
-        self.logger = logging.getLogger(__name__)
-        self._initialize_models()
+    MIN_WORDS = 10
     
-    def _initialize_models(self):
-        """Initialize all available summarization models"""
-        try:
-            # BART model for abstractive summarization
-            self.models['bart'] = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn",
-                device=0 if torch.cuda.is_available() else -1
-            )
-            
-            # T5 model for versatile summarization
-            self.models['t5'] = pipeline(
-                "summarization",
-                model="t5-small",
-                device=0 if torch.cuda.is_available() else -1
-            )
-            
-            # DistilBART specifically for legal documents
-            tokenizer = AutoTokenizer.from_pretrained("ml6team/distilbart-tos-summarizer-tosdr")
-            model = AutoModelForSeq2SeqLM.from_pretrained("ml6team/distilbart-tos-summarizer-tosdr")
-            
-            self.models['legal'] = pipeline(
-                "summarization",
-                model=model,
-                tokenizer=tokenizer,
-                device=0 if torch.cuda.is_available() else -1
+    def __init__(self, allowed_models=None, memory_budget_mb=None, warm_up=None, registry=None,
+                 batch_size=8, use_scheduler=False, max_batch_size=16, max_wait_ms=10,
+                 chunk_overlap=0, cache=None, chunk_cache=None, backends=None, onnx_dir=None,
+                 reduce_fan_in=8, reduce_max_depth=3, generation_profile='balanced', deadline_s=None,
+                 degrade_model='t5'):
+        """
+        Args:
+            allowed_models (list): Abstractive models this instance may load (default: all)
+            memory_budget_mb (float): Memory budget for resident models (default: unlimited)
+            warm_up (list): Models to load immediately instead of on first use
+            registry (ModelRegistry): Shared registry to use instead of creating one
+            batch_size (int): Number of chunks summarized per generate call
+            use_scheduler (bool): Batch chunks across concurrent requests
+            max_batch_size (int): Scheduler limit on chunks per generate call
+            max_wait_ms (float): Scheduler wait for more chunks before running a batch
+            chunk_overlap (int): Sentences repeated between consecutive chunks
+            cache (SummaryCache): Cache for summaries of repeated documents
+            chunk_cache (SummaryCache): Cache for chunk summaries, so an edited document
+                only re-runs inference on the chunks that changed
+            backends (dict): Inference backend per model type ('torch', 'int8' or 'onnx')
+            onnx_dir (str): Directory where ONNX exports are kept between runs
+            reduce_fan_in (int): Most chunk summaries combined into one input when reducing
+            reduce_max_depth (int): Most reduce levels; the last one combines every
+                remaining summary even if that input has to be truncated
+            generation_profile (str): Default generation profile ('fast', 'balanced' or 'quality')
+            deadline_s (float): Default time budget per request in seconds (default: none)
+            degrade_model (str): Cheaper abstractive model that takes over remaining chunks when
+                a deadline is at risk, if it is already loaded; extractive selection otherwise
+        """
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry or ModelRegistry(
+            allowed_models=allowed_models,
+            memory_budget_mb=memory_budget_mb,
+            backends=backends,
+            onnx_dir=onnx_dir
+        )
+        # Content-defined chunk boundaries keep unchanged chunks identical across edits
+        self.chunker = TokenChunker(
+            overlap_sentences=chunk_overlap,
+            stable_boundaries=chunk_cache is not None
+        )
+        self.generator = BatchedGenerator(batch_size=batch_size)
+        self.extractive = ExtractiveSummarizer()
+        self.key_points = KeyPointExtractor()
+        self.segmenter = ClauseSegmenter()
+        self.policy = GenerationPolicy(default_profile=generation_profile)
+        self.deadline_s = deadline_s
+        self.degrade_model = degrade_model
+        self.cache = cache
+        self.chunk_cache = chunk_cache
+        self.reduce_fan_in = max(2, int(reduce_fan_in))
+        self.reduce_max_depth = max(1, int(reduce_max_depth))
+        self.scheduler = None
+        if use_scheduler:
+            self.scheduler = InferenceScheduler(
+                self.registry,
+                self.generator,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms
             )
-            
-            self.logger.info("All models initialized successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing models: {str(e)}")
+        if warm_up:
+            self.registry.warm_up(warm_up)
+    
+    def summarize_document(self, text, max_length=3, model_type='bart', text_processor=None,
+                           progress_callback=None, profile=None, deadline_s=None, timer=None):
+        """
+        Summarize raw document text, serving repeated documents from the cache
+        
+        A cache hit skips preprocessing, chunking and inference entirely. Text
+        may also be given as an iterable of blocks (e.g. FileHandler.iter_text),
+        which is preprocessed segment by segment so the raw document is never
+        held in memory at once; such documents are cached by their
+        preprocessed text, so a hit still pays for preprocessing.
+        
+        Args:
+            text (str or iterable): Raw document text, or pieces of it in order
+            max_length (int): Maximum number of sentences in summary
+            model_type (str): Model to use ('bart', 't5', 'legal', 'extractive')
+            text_processor (TextProcessor): Preprocessor applied on a cache miss
+            progress_callback (callable): Receives progress event dicts as chunks complete
+            profile (str): Generation profile ('fast', 'balanced' or 'quality')
+            deadline_s (float): Time budget in seconds, including preprocessing
+            timer (StageTimer): Collects stage timings, e.g. one that already timed file extraction
+        
+        Returns:
+            dict: Summary results with metadata
+        
+        Raises:
+            TextTooShortError: If the preprocessed text is too short to summarize
+            ValueError: If the generation profile is not known
+        """
+        start_time = time.time()
+        profile = self.policy.resolve(profile)
+        timer = timer or StageTimer()
+        streamed = not isinstance(text, str)
+        
+        cache_key = None
+        if self.cache and not streamed:
+            cache_key = self._summary_cache_key(text, model_type, max_length, profile)
+            cached = self._cached_summary(cache_key, timer, start_time)
+            if cached is not None:
+                return cached
+        
+        # Split once; every later stage reads the same sentence and word offsets
+        with timer.stage('preprocessing'):
+            if streamed:
+                document = (text_processor.build_document_stream(text) if text_processor
+                            else Document(''.join(text)))
+            else:
+                document = text_processor.build_document(text) if text_processor else Document(text)
+        if document.word_count < self.MIN_WORDS:
+            raise TextTooShortError('Text is too short for meaningful summarization.')
+        
+        if self.cache and streamed:
+            cache_key = self._summary_cache_key(document.text, model_type, max_length, profile,
+                                                source='document')
+            cached = self._cached_summary(cache_key, timer, start_time)
+            if cached is not None:
+                return cached
+        
+        if deadline_s is None:
+            deadline_s = self.deadline_s
+        if deadline_s is not None:
+            deadline_s -= time.time() - start_time
+        
+        summary_data = self.generate_summary(
+            document,
+            max_length=max_length,
+            model_type=model_type,
+            progress_callback=progress_callback,
+            profile=profile,
+            deadline_s=deadline_s,
+            timer=timer
+        )
+        summary_data['processing_time'] = round(time.time() - start_time, 2)
+        summary_data['original_word_count'] = document.word_count
+        
+        # Fallback and degraded output is not cached so the next request retries the model
+        if cache_key and not summary_data.get('fallback') and not summary_data.get('degraded'):
+            self.cache.set(cache_key, summary_data)
+        
+        summary_data['cached'] = False
+        summary_data['timings'] = timer.as_dict()
+        return summary_data
     
-    def generate_summary(self, text, max_length=3, model_type='bart'):
+    def summarize_clauses(self, text, topics, max_length=2, model_type='bart', text_processor=None,
+                          profile=None, deadline_s=None):
+        """
+        Summarize only the clauses of a document that are about some topics
+        
+        Finding clauses is a scan of the raw lines; only the matching clauses
+        are preprocessed and summarized, each as a document of its own, so a
+        clause seen before (in this or another document) is served from the
+        summary cache.
+        
+        Args:
+            text (str or ClauseIndex): Raw document text, or its clause index
+            topics (list): Topic names from CLAUSE_TOPICS (e.g. 'termination') or phrases
+            max_length (int): Maximum number of sentences per clause summary
+            model_type (str): Model to use ('bart', 't5', 'legal', 'extractive')
+            text_processor (TextProcessor): Preprocessor applied to each clause
+            profile (str): Generation profile ('fast', 'balanced' or 'quality')
+            deadline_s (float): Time budget in seconds for all clauses together
+        
+        Returns:
+            dict: 'clauses' (matching clauses with text of their own, with their 'topics',
+                'summary', 'word_count', 'cached' and 'degraded'), 'total_clauses' and 'processing_time'
+        
+        Raises:
+            ValueError: If the generation profile is not known
+        """
+        start_time = time.time()
+        profile = self.policy.resolve(profile)
+        index = text if isinstance(text, ClauseIndex) else self.segmenter.segment(text)
+        if deadline_s is None:
+            deadline_s = self.deadline_s
+        
+        clauses = []
+        for clause in index.find(topics):
+            body = index.clause_text(clause)
+            if not body:
+                # A heading whose text is all in its subclauses
+                continue
+            remaining = deadline_s - (time.time() - start_time) if deadline_s is not None else None
+            try:
+                summary_data = self.summarize_document(
+                    body,
+                    max_length=max_length,
+                    model_type=model_type,
+                    text_processor=text_processor,
+                    profile=profile,
+                    deadline_s=remaining
+                )
+                clause.update(
+                    summary=summary_data['summary'],
+                    word_count=summary_data['original_word_count'],
+                    cached=summary_data['cached'],
+                    degraded=summary_data.get('degraded', False)
+                )
+            except TextTooShortError:
+                # A clause this short is its own summary
+                summary = text_processor.preprocess(body) if text_processor else ' '.join(body.split())
+                clause.update(summary=summary, word_count=len(summary.split()), cached=False, degraded=False)
+            clauses.append(clause)
+        
+        return {
+            'clauses': clauses,
+            'total_clauses': len(index),
+            'processing_time': round(time.time() - start_time, 2)
+        }
+    
+    def _summary_cache_key(self, text, model_type, max_length, profile, **params):
+        """Cache key of a document's summary under the settings that shape it"""
+        return self.cache.make_key(
+            text,
+            model_type=model_type,
+            max_length=max_length,
+            params=self._generation_signature(model_type, profile),
+            **params
+        )
+    
+    def _cached_summary(self, cache_key, timer, start_time):
+        """Return the cached summary for a key, marked as cached, or None"""
+        with timer.stage('cache_lookup'):
+            cached = self.cache.get(cache_key)
+        CACHE_REQUESTS.inc(cache='summary', result='miss' if cached is None else 'hit')
+        if cached is not None:
+            cached['cached'] = True
+            cached['processing_time'] = round(time.time() - start_time, 2)
+            cached['timings'] = timer.as_dict()
+        return cached
+    
+    def generate_summary(self, text, max_length=3, model_type='bart', progress_callback=None, profile=None,
+                         deadline_s=None, timer=None):
         """
         Generate comprehensive summary with multiple approaches
         
         Args:
-            text (str): Input text to summarize
+            text (str or Document): Input text to summarize
             max_length (int): Maximum number of sentences in summary
             model_type (str): Model to use ('bart', 't5', 'legal', 'extractive')
+            progress_callback (callable): Receives progress event dicts as chunks complete
+            profile (str): Generation profile ('fast', 'balanced' or 'quality')
+            deadline_s (float): Time budget in seconds; once it is at risk the remaining work
+                switches to cheaper models and the result is flagged as degraded
+            timer (StageTimer): Collects stage timings (default: a new one)
         
         Returns:
             dict: Summary results with metadata
         """
         start_time = time.time()
+        fallback = False
+        profile = self.policy.resolve(profile)
+        if deadline_s is None:
+            deadline_s = self.deadline_s
+        deadline = Deadline(deadline_s) if deadline_s is not None else None
+        timer = timer or StageTimer()
+        document = text if isinstance(text, Document) else Document(text)
         
         try:
-            if model_type in ['bart', 't5', 'legal']:
-                summary = self._abstractive_summary(text, max_length, model_type)
+            if model_type in ABSTRACTIVE_MODELS:
+                try:
+                    summary = self._abstractive_summary(document, max_length, model_type, progress_callback,
+                                                        profile, deadline, timer)
+                except Exception as e:
+                    self.logger.error(f"Abstractive summarization error: {str(e)}")
+                    ERRORS.inc(stage='abstractive')
+                    FALLBACKS.inc(reason='error')
+                    # Fallback to extractive
+                    with timer.stage('extractive'):
+                        summary = self._extractive_summary(document, max_length, 'lexrank')
+                    fallback = True
+                if deadline and deadline.degraded:
+                    FALLBACKS.inc(reason='deadline')
             else:
-                summary = self._extractive_summary(text, max_length, model_type)
+                with timer.stage('extractive'):
+                    summary = self._extractive_summary(document, max_length, model_type)
             
             # Extract key points
-            key_points = self._extract_key_points(text)
+            with timer.stage('key_points'):
+                key_point_details = self._extract_key_points(document)
             
             processing_time = round(time.time() - start_time, 2)
             
             return {
                 'summary': summary,
-                'key_points': key_points,
-                'processing_time': processing_time
+                'key_points': [point['text'] for point in key_point_details],
+                'key_point_details': key_point_details,
+                'processing_time': processing_time,
+                'fallback': fallback,
+                'profile': profile,
+                'degraded': bool(deadline and deadline.degraded),
+                'degradations': deadline.degradations if deadline else [],
+                'timings': timer.as_dict()
             }
             
         except Exception as e:
             self.logger.error(f"Summarization error: {str(e)}")
+            ERRORS.inc(stage='summarize')
             raise
     
-    def _abstractive_summary(self, text, max_length, model_type):
+    def _abstractive_summary(self, document, max_length, model_type, progress_callback=None, profile=None,
+                             deadline=None, timer=None):
         """Generate abstractive summary using transformer models"""
-        try:
-            model = self.models.get(model_type)
-            if not model:
-                raise ValueError(f"Model {model_type} not available")
-            
-            # Handle long texts by chunking
-            max_chunk_length = 1024
-            chunks = self._chunk_text(text, max_chunk_length)
+        timer = timer or StageTimer()
+        
+        # Split into sentence-aligned chunks that fit the model's context window
+        with timer.stage('model_load'):
+            model = self.registry.get(model_type)
+        with timer.stage('chunking'):
+            chunks = self.chunker.chunk(model, document.text, spans=document.sentence_spans.tolist(), timer=timer)
+        
+        # Summarize all chunks in padded batches, reusing their token ids
+        gen_kwargs = [self.policy.chunk_kwargs(len(chunk['input_ids']), profile) for chunk in chunks]
+        with timer.stage('generation'):
+            summaries = self._summarize_chunks(model_type, chunks, gen_kwargs, progress_callback, profile, deadline)
+        
+        # If multiple chunks, summarize the summaries
+        with timer.stage('reduce'):
+            return self._reduce_summaries(model_type, summaries, max_length, progress_callback, profile, deadline)
+    
+    def _reduce_summaries(self, model_type, summaries, max_length, progress_callback=None, profile=None,
+                          deadline=None):
+        """
+        Reduce chunk summaries to one summary with a tree of bounded fan-in
+        
+        Summaries are packed into groups that fit the model's context window,
+        every group of a level is summarized in one batched call, and the
+        results are reduced again until they fit in one input. The final level
+        uses the overall summary length; it is forced once reduce_max_depth
+        levels have run, truncating the input if it still does not fit. If a
+        level would miss the deadline, the best sentences of the summaries are
+        selected instead.
+        """
+        model = self.registry.get(model_type)
+        level = 0
+        while len(summaries) > 1:
+            combined_summary = " ".join(summaries)
+            if len(combined_summary.split()) <= max_length * 20:
+                return combined_summary
             
-            summaries = []
-            for chunk in chunks:
-                result = model(
-                    chunk,
-                    max_length=min(150, len(chunk.split()) // 3),
-                    min_length=30,
-                    do_sample=False,
-                    length_penalty=2.0,
-                    num_beams=4,
-                    early_stopping=True
+            level += 1
+            groups = self.chunker.group(model, summaries, fan_in=self.reduce_fan_in)
+            if len(groups) > 1 and level >= self.reduce_max_depth:
+                self.logger.warning(
+                    f"Reduce depth limit {self.reduce_max_depth} reached with {len(groups)} groups; "
+                    f"truncating the final input"
                 )
-                summaries.append(result[0]['summary_text'])
+                groups = [list(range(len(summaries)))]
             
-            # If multiple chunks, summarize the summaries
-            if len(summaries) > 1:
-                combined_summary = " ".join(summaries)
-                if len(combined_summary.split()) > max_length * 20:
-                    final_result = model(
-                        combined_summary,
-                        max_length=max_length * 20,
-                        min_length=max_length * 10,
-                        do_sample=False
-                    )
-                    return final_result[0]['summary_text']
-                return combined_summary
+            if deadline and deadline.at_risk(model_type, len(groups)):
+                self._degrade(deadline, 'reduce', 'extractive', len(groups), progress_callback)
+                return " ".join(self.extractive.summarize(Document(combined_summary), max_length))
             
-            return summaries[0]
+            texts = [" ".join(summaries[index] for index in group) for group in groups]
+            if progress_callback:
+                progress_callback({'type': 'reduce', 'level': level, 'groups': len(groups)})
+            if len(groups) == 1:
+                return self._generate(model_type, texts, self.policy.final_kwargs(max_length, profile),
+                                      deadline=deadline)[0]
             
-        except Exception as e:
-            self.logger.error(f"Abstractive summarization error: {str(e)}")
-            # Fallback to extractive
-            return self._extractive_summary(text, max_length, 'lexrank')
+            # Groups too short to be worth a model call are carried to the next level as they are
+            encoded = self.generator.encode(model, texts)
+            gen_kwargs = [self.policy.chunk_kwargs(len(ids), profile) for ids in encoded]
+            summaries = list(texts)
+            pending = [index for index, kwargs in enumerate(gen_kwargs) if kwargs is not None]
+            results = self._generate(
+                model_type,
+                [encoded[index] for index in pending],
+                [gen_kwargs[index] for index in pending],
+                deadline=deadline
+            )
+            for index, summary in zip(pending, results):
+                summaries[index] = summary
+        
+        return summaries[0]
     
-    def _extractive_summary(self, text, max_length, algorithm='lexrank'):
-        """Generate extractive summary using traditional algorithms"""
-        try:
-            parser = PlaintextParser.from_string(text, Tokenizer("english"))
-            
-            if algorithm == 'lexrank':
-                summarizer = LexRankSummarizer()
-            elif algorithm == 'luhn':
-                summarizer = LuhnSummarizer()
-            elif algorithm == 'lsa':
-                summarizer = LsaSummarizer()
-            else:
-                summarizer = LexRankSummarizer()  # Default
+    def _summarize_chunks(self, model_type, chunks, gen_kwargs, progress_callback=None, profile=None,
+                          deadline=None):
+        """Summarize chunks, reusing cached summaries of unchanged chunks"""
+        summaries = [None] * len(chunks)
+        keys = [None] * len(chunks)
+        
+        def report(index, summary):
+            if progress_callback:
+                progress_callback({'type': 'chunk', 'index': index, 'total': len(chunks), 'summary': summary})
+        
+        if progress_callback:
+            progress_callback({'type': 'chunks', 'total': len(chunks)})
+        
+        # Chunks the policy skips never reach the model
+        for index, (chunk, kwargs) in enumerate(zip(chunks, gen_kwargs)):
+            if kwargs is None:
+                summaries[index] = self._short_chunk_summary(chunk['text'], profile)
+                report(index, summaries[index])
+        
+        if self.chunk_cache:
+            checkpoint = (self.registry.checkpoints.get(model_type), self.registry.backend(model_type))
+            for index, (chunk, kwargs) in enumerate(zip(chunks, gen_kwargs)):
+                if summaries[index] is not None:
+                    continue
+                keys[index] = self.chunk_cache.make_key(chunk['text'], checkpoint=checkpoint, generation=kwargs)
+                cached = self.chunk_cache.get(keys[index])
+                CACHE_REQUESTS.inc(cache='chunk', result='miss' if cached is None else 'hit')
+                if cached is not None:
+                    summaries[index] = cached['summary']
+                    report(index, summaries[index])
+        
+        missing = [index for index, summary in enumerate(summaries) if summary is None]
+        
+        def on_result(position, summary):
+            index = missing[position]
+            summaries[index] = summary
+            if self.chunk_cache:
+                self.chunk_cache.set(keys[index], {'summary': summary})
+            report(index, summary)
+        
+        if missing and deadline:
+            # Degraded summaries are reported but never cached
+            done = self._generate_in_waves(
+                model_type,
+                [chunks[index]['input_ids'] for index in missing],
+                [gen_kwargs[index] for index in missing],
+                on_result,
+                deadline
+            )
+            remaining = missing[done:]
             
-            sentences = summarizer(parser.document, max_length)
-            return ' '.join([str(sentence) for sentence in sentences])
+            def on_degraded(position, summary):
+                summaries[remaining[position]] = summary
+                report(remaining[position], summary)
             
-        except Exception as e:
-            self.logger.error(f"Extractive summarization error: {str(e)}")
-            # Simple fallback
-            sentences = text.split('.')[:max_length]
-            return '. '.join(sentences) + '.'
+            if remaining:
+                self._degrade_chunks(model_type, [chunks[index]['text'] for index in remaining], on_degraded,
+                                     deadline, progress_callback)
+        elif missing:
+            self._generate(
+                model_type,
+                [chunks[index]['input_ids'] for index in missing],
+                [gen_kwargs[index] for index in missing],
+                on_result=on_result
+            )
+        
+        if self.chunk_cache:
+            self.logger.info(f"Generated {len(missing)} of {len(chunks)} chunk summaries")
+        return summaries
     
-    def _chunk_text(self, text, max_length):
-        """Split text into manageable chunks for processing"""
-        words = text.split()
-        chunks = []
+    def _generate_in_waves(self, model_type, inputs, gen_kwargs, on_result, deadline):
+        """
+        Summarize inputs one batch at a time while the deadline allows it
+        
+        Before each batch, the time the remaining inputs plus one reduce input
+        would take at the model's observed rate is checked against the deadline.
+        Until the model has a rate in this request, a single input is run to
+        measure it, so a slow model cannot spend the budget on a full batch.
         
-        for i in range(0, len(words), max_length):
-            chunk = ' '.join(words[i:i + max_length])
-            chunks.append(chunk)
+        Returns:
+            int: Number of leading inputs summarized; the rest still need a summary
+        """
+        batch_size = self.scheduler.max_batch_size if self.scheduler else self.generator.batch_size
+        done = 0
+        while done < len(inputs) and not deadline.at_risk(model_type, len(inputs) - done + 1):
+            wave_size = batch_size if deadline.has_rate(model_type) else 1
+            self._generate(
+                model_type,
+                inputs[done:done + wave_size],
+                gen_kwargs[done:done + wave_size],
+                on_result=lambda position, summary, offset=done: on_result(offset + position, summary),
+                deadline=deadline
+            )
+            done = min(done + wave_size, len(inputs))
+        return done
+    
+    def _degrade_chunks(self, model_type, texts, on_result, deadline, progress_callback=None):
+        """
+        Summarize chunks the deadline does not leave time for
         
-        return chunks
+        The degrade model takes over if it is already loaded (loading it now
+        would spend the budget), decoding greedily; whatever it cannot finish
+        in time gets an extractive summary.
+        """
+        summaries = [None] * len(texts)
+        
+        def store(position, summary):
+            summaries[position] = summary
+            on_result(position, summary)
+        
+        fallback_model = self.degrade_model
+        if (fallback_model and fallback_model != model_type and fallback_model in ABSTRACTIVE_MODELS
+                and self.registry.is_loaded(fallback_model)):
+            encoded = self.generator.encode(self.registry.get(fallback_model), texts)
+            gen_kwargs = [self.policy.chunk_kwargs(len(ids), 'fast') for ids in encoded]
+            pending = [position for position, kwargs in enumerate(gen_kwargs) if kwargs is not None]
+            done = self._generate_in_waves(
+                fallback_model,
+                [encoded[position] for position in pending],
+                [gen_kwargs[position] for position in pending],
+                lambda position, summary: store(pending[position], summary),
+                deadline
+            )
+            if done:
+                self._degrade(deadline, 'chunks', fallback_model, done, progress_callback)
+        
+        remaining = [position for position, summary in enumerate(summaries) if summary is None]
+        for position, summary in zip(remaining, self._extract_chunks([texts[position] for position in remaining])):
+            store(position, summary)
+        if remaining:
+            self._degrade(deadline, 'chunks', 'extractive', len(remaining), progress_callback)
+    
+    def _degrade(self, deadline, stage, replacement, inputs, progress_callback=None):
+        """Record a switch to a cheaper replacement and report it"""
+        self.logger.warning(f"Deadline at risk: handing {inputs} {stage} input(s) to {replacement}")
+        deadline.degrade(stage, replacement, inputs)
+        if progress_callback:
+            progress_callback({'type': 'degraded', 'stage': stage, 'to': replacement, 'inputs': inputs})
+    
+    def _generate(self, model_type, texts, gen_kwargs, on_result=None, deadline=None):
+        """Summarize texts directly or through the shared scheduler"""
+        start = deadline.clock() if deadline else None
+        started = time.perf_counter()
+        if self.scheduler:
+            summaries = self.scheduler.generate(model_type, texts, gen_kwargs, on_result=on_result)
+        else:
+            summaries = self.generator.generate(self.registry.get(model_type), texts, gen_kwargs,
+                                                on_result=on_result)
+        if deadline:
+            deadline.record(model_type, len(texts), deadline.clock() - start)
+        if texts:
+            # Batched inputs share the cost of their generate calls
+            per_input = (time.perf_counter() - started) / len(texts)
+            for _ in texts:
+                CHUNK_GENERATION_SECONDS.observe(per_input, model=model_type)
+        return summaries
+    
+    def _short_chunk_summary(self, text, profile=None):
+        """Summary of a chunk too short for the model: the chunk itself or its best sentences"""
+        if self.policy.short_chunk_strategy(profile) != 'extractive':
+            return text
+        return self._extract_chunks([text])[0]
     
-    def _extract_key_points(self, text):
-        """Extract key points and important phrases from text"""
+    def _extract_chunks(self, texts):
+        """Best half of each chunk's sentences, in document order, scored in one batch"""
+        vocabulary = {}
+        documents = [Document(text, vocabulary=vocabulary) for text in texts]
+        counts = [max(1, document.sentence_count // 2) for document in documents]
+        summaries = [" ".join(sentences) for sentences in self.extractive.summarize_batch(documents, counts)]
+        # Single sentences, and chunks without words to rank (e.g. "."), are kept as they are
+        term_counts = self.extractive.term_counts(documents)
+        return [summary if document.sentence_count >= 2 and terms else text
+                for text, document, terms, summary in zip(texts, documents, term_counts, summaries)]
+    
+    def _generation_signature(self, model_type, profile=None):
+        """Settings that change a summary, used as part of the cache key"""
+        if model_type not in ABSTRACTIVE_MODELS:
+            return {'version': CACHE_VERSION, 'algorithm': model_type}
+        return {
+            'version': CACHE_VERSION,
+            'checkpoint': self.registry.checkpoints.get(model_type),
+            'backend': self.registry.backend(model_type),
+            'generation': self.policy.signature(profile),
+            'chunk_overlap': self.chunker.overlap_sentences,
+            'stable_boundaries': self.chunker.stable_boundaries,
+            'reduce_fan_in': self.reduce_fan_in,
+            'reduce_max_depth': self.reduce_max_depth
+        }
+    
+    def _extractive_summary(self, document, max_length, algorithm='lexrank'):
+        """Generate extractive summary using traditional algorithms"""
         try:
-            # Simple keyword extraction based on frequency
-            words = text.lower().split()
-            
-            # Remove common words
-            stop_words = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'shall', 'can'])
-            
-            filtered_words = [word.strip('.,!?;:"()[]') for word in words if word.lower() not in stop_words and len(word) > 3]
-            
-            # Count frequency
-            word_freq = {}
-            for word in filtered_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # Get top keywords
-            top_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
+            if algorithm not in ALGORITHMS:
+                algorithm = 'lexrank'  # Default
             
-            # Extract sentences containing top keywords
-            sentences = text.split('.')
-            key_sentences = []
-            
-            for sentence in sentences[:20]:  # Limit to first 20 sentences
-                sentence = sentence.strip()
-                if len(sentence) > 30:  # Minimum sentence length
-                    for keyword, _ in top_keywords[:5]:
-                        if keyword.lower() in sentence.lower():
-                            key_sentences.append(sentence + '.')
-                            break
-            
-            return key_sentences[:5]  # Return top 5 key points
+            sentences = self.extractive.summarize(document, max_length, algorithm)
+            return ' '.join(sentences)
             
+        except Exception as e:
+            self.logger.error(f"Extractive summarization error: {str(e)}")
+            # Simple fallback
+            return ' '.join(document.sentences()[:max_length])
+    
+    def _extract_key_points(self, document):
+        """Extract key points with their scores and positions"""
+        try:
+            return self.key_points.extract(document)
         except Exception as e:
             self.logger.error(f"Key point extraction error: {str(e)}")
             return []
 
-# Initialize the summarizer (downloaded automatically if not cached)
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+# BART registry for standalone use (downloaded automatically on first call)
+_local_registry = ModelRegistry(allowed_models=['bart'])
 
 def summarize_with_local_model(text, max_length=150, min_length=40):
+    summarizer = _local_registry.get('bart')
     summary = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
     return summary[0]['summary_text']
@@ -0,0 +1,156 @@
+import json
+import unittest
+from io import BytesIO
+from app import app
+
+SAMPLE_TEXT = (
+    "This is a sample terms and conditions document. "
+    "It contains important legal information about user rights and responsibilities. "
+    "Users must agree to these terms before using the service. "
+    "The service provider reserves the right to modify these terms at any time."
+)
+
+
+class BatchApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.payload = {
+            'model_type': 'lexrank',
+            'summary_length': 2,
+            'documents': [
+                {'id': 'terms', 'text': SAMPLE_TEXT},
+                {'id': 'empty', 'text': ''},
+            ]
+        }
+
+    def test_batch_json(self):
+        """Each document gets a structured result in request order"""
+        response = self.client.post('/api/summarize/batch', json=self.payload)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual([result['id'] for result in data['results']], ['terms', 'empty'])
+        self.assertEqual((data['succeeded'], data['failed']), (1, 1))
+
+        result = data['results'][0]
+        self.assertTrue(result['summary'])
+        self.assertIn('key_points', result)
+        self.assertGreater(result['original_word_count'], result['summary_word_count'])
+        self.assertIn('preprocessing', result['timings'])
+        print("✓ Batch endpoint returns structured JSON results")
+
+    def test_batch_ndjson_stream(self):
+        """Streaming mode emits one JSON line per document"""
+        self.payload['stream'] = True
+        response = self.client.post('/api/summarize/batch', json=self.payload)
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(sorted(line['id'] for line in lines), ['empty', 'terms'])
+        print("✓ Batch endpoint streams NDJSON")
+
+    def test_batch_rejects_bad_payload(self):
+        """Requests without a documents list are rejected"""
+        response = self.client.post('/api/summarize/batch', json={'text': SAMPLE_TEXT})
+        self.assertEqual(response.status_code, 400)
+        for document in ({'url': 123}, {'text': ['not', 'a', 'string']}):
+            response = self.client.post('/api/summarize/batch', json={
+                'documents': [document, {'text': SAMPLE_TEXT}], 'stream': True
+            })
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('must be a string', response.get_json()['error'])
+        print("✓ Batch endpoint validates its payload")
+
+
+class ClausesApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.text = (
+            "1. Fees\nSubscriptions renew automatically each month. Fees are charged to your card.\n\n"
+            "2. Termination\nWe may terminate your account at any time. You may cancel whenever you like.\n"
+        )
+
+    def test_clause_index(self):
+        """Without topics the clause index is returned"""
+        response = self.client.post('/api/clauses', json={'text': self.text})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['total_clauses'], 2)
+        self.assertEqual([clause['title'] for clause in data['clauses']], ['Fees', 'Termination'])
+        print("✓ Clauses endpoint returns the clause index")
+
+    def test_clause_summaries(self):
+        """Only the clauses matching the topics are summarized"""
+        response = self.client.post('/api/clauses', json={
+            'text': self.text, 'topics': 'termination', 'model_type': 'lexrank', 'summary_length': 1
+        })
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['topics'], ['termination'])
+        self.assertEqual([clause['title'] for clause in data['clauses']], ['Termination'])
+        self.assertTrue(data['clauses'][0]['summary'])
+
+        response = self.client.post('/api/clauses', json={'topics': ['payment']})
+        self.assertEqual(response.status_code, 400)
+        print("✓ Clauses endpoint summarizes matching clauses")
+
+
+class BodyLimitTestCase(unittest.TestCase):
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+        self.limits = app.config['MAX_CONTENT_LENGTH'], app.config['MAX_UPLOAD_LENGTH']
+        # Unlimited uploads must not lift the limit of the JSON endpoints
+        app.config['MAX_CONTENT_LENGTH'] = 4096
+        app.config['MAX_UPLOAD_LENGTH'] = None
+
+    def tearDown(self):
+        app.config['MAX_CONTENT_LENGTH'], app.config['MAX_UPLOAD_LENGTH'] = self.limits
+
+    def test_json_bodies_keep_their_limit(self):
+        """JSON bodies above the body limit are rejected even when uploads are unlimited"""
+        for path in ('/api/clauses', '/api/summarize/batch', '/api/jobs'):
+            response = self.client.post(path, json={'text': SAMPLE_TEXT * 50})
+            self.assertEqual(response.status_code, 413, path)
+            self.assertIn('error', response.get_json())
+
+        upload = (BytesIO((SAMPLE_TEXT + ' ').encode() * 50), 'terms.txt')
+        response = self.client.post('/summarize', data={
+            'input_method': 'file', 'file': upload, 'summary_length': '2', 'model_type': 'lexrank'
+        }, content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 200)
+        print("✓ Only the upload route lifts the body limit")
+
+
+class MetricsEndpointTestCase(unittest.TestCase):
+
+    def setUp(self):
+        app.config['TESTING'] = True
+        self.client = app.test_client()
+
+    def test_metrics_after_request(self):
+        """Stage histograms and error counters are exposed in Prometheus text format"""
+        self.client.post('/api/summarize/batch', json={
+            'model_type': 'lexrank',
+            'documents': [{'text': SAMPLE_TEXT}, {'text': ''}]
+        })
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        self.assertIn('# TYPE summarizer_stage_seconds histogram', body)
+        self.assertIn('summarizer_stage_seconds_bucket{stage="key_points",le="+Inf"}', body)
+        self.assertIn('summarizer_errors_total{stage="request"}', body)
+        print("✓ Metrics endpoint exposes stage timings and counters")
+
+
+if __name__ == '__main__':
+    unittest.main()
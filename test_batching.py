@@ -0,0 +1,85 @@
+import unittest
+from types import SimpleNamespace
+
+import torch
+
+from models.batching import BatchedGenerator
+
+
+class NumberTokenizer:
+    """Tokenizer that reads whitespace-separated numbers as token ids, with 0 as padding"""
+
+    pad_token_id = 0
+    model_max_length = 64
+
+    def __call__(self, texts, truncation=False, max_length=None):
+        return {'input_ids': [[int(word) for word in text.split()][:max_length] for text in texts]}
+
+    def batch_decode(self, rows, skip_special_tokens=False, clean_up_tokenization_spaces=False):
+        return [' '.join(str(token) for token in row.tolist() if token != self.pad_token_id) for row in rows]
+
+
+class EchoModel:
+    """Model whose generate call returns its input ids and records each batch"""
+
+    def __init__(self):
+        self.config = SimpleNamespace()
+        self.calls = []
+
+    def generate(self, input_ids, attention_mask, **kwargs):
+        self.calls.append((input_ids.clone(), attention_mask.clone(), kwargs))
+        return input_ids
+
+
+class BatchedGeneratorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.model = EchoModel()
+        self.pipe = SimpleNamespace(tokenizer=NumberTokenizer(), model=self.model, device='cpu')
+        self.generator = BatchedGenerator(batch_size=2)
+        self.inputs = ["5 6 7 8", "1", "9 9 9", [3, 4], "2 2 2 2 2", "7 1"]
+        self.beam = {'num_beams': 4, 'max_length': 20}
+        self.greedy = {'num_beams': 1, 'max_length': 10}
+        self.gen_kwargs = [self.beam, self.greedy, self.beam, self.beam, self.greedy, self.beam]
+
+    def test_outputs_follow_input_order(self):
+        """Summaries and callbacks are matched to the inputs they came from"""
+        reported = {}
+        summaries = self.generator.generate(self.pipe, self.inputs, self.gen_kwargs,
+                                            on_result=lambda index, summary: reported.setdefault(index, summary))
+
+        expected = ["5 6 7 8", "1", "9 9 9", "3 4", "2 2 2 2 2", "7 1"]
+        self.assertEqual(summaries, expected)
+        self.assertEqual(reported, dict(enumerate(expected)))
+        print("✓ Batched summaries come back in input order")
+
+    def test_batches_are_grouped_sorted_and_padded(self):
+        """Each generate call gets one settings group, sorted by length, right-padded and masked"""
+        self.generator.generate(self.pipe, self.inputs, self.gen_kwargs)
+
+        batches = []
+        for input_ids, attention_mask, kwargs in self.model.calls:
+            lengths = attention_mask.sum(dim=1).tolist()
+            for row, length in zip(input_ids, lengths):
+                # Real tokens first, then padding only
+                self.assertTrue((row[:length] != 0).all())
+                self.assertTrue((row[length:] == 0).all())
+            self.assertTrue(torch.equal(attention_mask, (input_ids != 0).long()))
+            self.assertEqual(input_ids.shape[1], max(lengths))
+            batches.append((kwargs['num_beams'], lengths))
+
+        # Beam inputs (lengths 4, 3, 2, 2) and greedy inputs (1, 5) never share a batch
+        self.assertEqual(batches, [(4, [2, 2]), (4, [3, 4]), (1, [1, 5])])
+        print("✓ Batches are grouped by settings, sorted by length and padded")
+
+    def test_shared_settings_and_empty_input(self):
+        """A single settings dict applies to every input; no inputs means no generate call"""
+        self.assertEqual(self.generator.generate(self.pipe, [], self.beam), [])
+        summaries = self.generator.generate(self.pipe, ["4 4", "8"], self.greedy, batch_size=8)
+        self.assertEqual(summaries, ["4 4", "8"])
+        self.assertEqual(len(self.model.calls), 1)
+        print("✓ Shared settings run in one batch")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import re
+import unittest
+from types import SimpleNamespace
+
+from models.chunking import TokenChunker
+
+CLS, SEP = 1, 2
+
+
+class WordPieceTokenizer:
+    """Tokenizer with one token per whitespace-separated word and [CLS] ... [SEP] special tokens"""
+
+    model_max_length = 512
+
+    def __init__(self, is_fast=True):
+        self.is_fast = is_fast
+        self.vocabulary = {}
+        self.calls = 0
+
+    def _ids(self, text):
+        return [self.vocabulary.setdefault(word, len(self.vocabulary) + 10) for word in text.split()]
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False, verbose=False):
+        self.calls += 1
+        if isinstance(text, list):
+            return {'input_ids': [self._ids(item) for item in text]}
+        encoded = {'input_ids': self._ids(text)}
+        if return_offsets_mapping:
+            assert self.is_fast
+            encoded['offset_mapping'] = [match.span() for match in re.finditer(r'\S+', text)]
+        return encoded
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 2
+
+    def build_inputs_with_special_tokens(self, ids):
+        return [CLS] + ids + [SEP]
+
+    def decode(self, ids):
+        words = {token: word for word, token in self.vocabulary.items()}
+        return ' '.join(words[token] for token in ids)
+
+
+def make_pipe(is_fast=True, prefix=None):
+    model = SimpleNamespace(config=SimpleNamespace(prefix=prefix))
+    return SimpleNamespace(tokenizer=WordPieceTokenizer(is_fast), model=model)
+
+
+# Six sentences of four tokens each
+SENTENCES = [f"Clause {name} binds users{index}." for index, name in
+             enumerate(['one', 'two', 'three', 'four', 'five', 'six'])]
+TEXT = ' '.join(SENTENCES)
+
+
+class TokenChunkerTestCase(unittest.TestCase):
+
+    def chunk_texts(self, chunks):
+        return [chunk['text'] for chunk in chunks]
+
+    def test_sentences_fill_the_budget(self):
+        """Whole sentences are packed up to the window minus special tokens and the prefix"""
+        pipe = make_pipe(prefix='summarize: ')
+        chunks = TokenChunker().chunk(pipe, TEXT, max_tokens=11)
+
+        # 11 tokens - 2 special - 1 prefix leaves room for two 4-token sentences
+        self.assertEqual(self.chunk_texts(chunks), [' '.join(SENTENCES[i:i + 2]) for i in range(0, 6, 2)])
+        prefix_id = pipe.tokenizer.vocabulary['summarize:']
+        for chunk in chunks:
+            self.assertEqual(chunk['input_ids'][:2], [CLS, prefix_id])
+            self.assertEqual(chunk['input_ids'][-1], SEP)
+            self.assertLessEqual(len(chunk['input_ids']), 11)
+            self.assertEqual(TEXT[chunk['start']:chunk['end']], chunk['text'])
+
+        # One token less and only one sentence fits
+        self.assertEqual(len(TokenChunker().chunk(make_pipe(prefix='summarize: '), TEXT, max_tokens=10)), 6)
+        print("✓ Sentences are packed within the token budget")
+
+    def test_overlap(self):
+        """Trailing sentences are repeated at the start of the next chunk"""
+        chunks = TokenChunker(overlap_sentences=1).chunk(make_pipe(), TEXT, max_tokens=14)
+        self.assertEqual(self.chunk_texts(chunks), [
+            ' '.join(SENTENCES[0:3]),
+            ' '.join(SENTENCES[2:5]),
+            ' '.join(SENTENCES[4:6]),
+        ])
+        print("✓ Chunks overlap by whole sentences")
+
+    def test_long_sentence_is_split(self):
+        """A sentence longer than the window is cut on token boundaries"""
+        words = [f"word{index}" for index in range(25)]
+        text = SENTENCES[0] + ' ' + ' '.join(words) + '. ' + SENTENCES[1]
+        pipe = make_pipe()
+        chunks = TokenChunker().chunk(pipe, text, max_tokens=12)
+
+        self.assertEqual(self.chunk_texts(chunks), [
+            SENTENCES[0],
+            ' '.join(words[0:10]),
+            ' '.join(words[10:20]),
+            ' '.join(words[20:]) + '.',
+            SENTENCES[1],
+        ])
+        self.assertTrue(all(len(chunk['input_ids']) <= 12 for chunk in chunks))
+        print("✓ Over-long sentences are split")
+
+    def test_slow_tokenizer_fallback(self):
+        """Tokenizers without offsets give the same chunks, tokenizing all sentences in one call"""
+        fast = TokenChunker().chunk(make_pipe(is_fast=True), TEXT, max_tokens=12)
+        slow_pipe = make_pipe(is_fast=False)
+        slow = TokenChunker().chunk(slow_pipe, TEXT, max_tokens=12)
+
+        self.assertEqual(self.chunk_texts(slow), self.chunk_texts(fast))
+        self.assertEqual([len(chunk['input_ids']) for chunk in slow], [len(chunk['input_ids']) for chunk in fast])
+        self.assertEqual(slow_pipe.tokenizer.calls, 1)
+        print("✓ Slow tokenizers fall back to per-sentence tokenization")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+
+from models.summarizer import TextSummarizer
+from utils.cache import SummaryCache
+from utils.clauses import ClauseSegmenter
+from utils.text_processor import TextProcessor
+
+TERMS = """Example Inc. Terms of Service
+
+These terms govern your use of the service. Please read them carefully before you sign up.
+
+1. ACCEPTANCE OF TERMS
+By using the service you agree to be bound by these terms and any policies they reference.
+
+2. Accounts
+2.1 Eligibility
+You must be at least 18 years old to create an account with the service.
+2.2 Suspension. We may suspend accounts that violate these terms at any time and without notice.
+
+Section 3 - Fees and Payment
+Subscriptions renew automatically at the end of each billing period. Fees are non-refundable except where the law requires otherwise.
+
+4. We may share your personal data with third parties and advertising partners. Partners may share it with their own affiliates.
+
+IV. LIMITATION OF LIABILITY
+Our liability is limited to the fees you paid in the twelve months before the claim arose.
+
+## Termination
+Either party may terminate the agreement with thirty days written notice to the other party.
+"""
+
+
+class ClauseSegmenterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ClauseSegmenter().segment(TERMS)
+
+    def test_headings_and_numbering(self):
+        """Numbered, keyword, roman, markdown and all-caps headings start clauses"""
+        headings = [(clause['number'], clause['title'], clause['level']) for clause in self.index.clauses]
+        self.assertEqual(headings, [
+            (None, 'Example Inc. Terms of Service', 1),
+            ('1', 'ACCEPTANCE OF TERMS', 1),
+            ('2', 'Accounts', 1),
+            ('2.1', 'Eligibility', 2),
+            ('2.2', 'Suspension', 2),
+            ('3', 'Fees and Payment', 1),
+            ('4', '', 1),
+            ('IV', 'LIMITATION OF LIABILITY', 1),
+            (None, 'Termination', 1),
+        ])
+        self.assertEqual(self.index.clauses[3]['parent'], 2)
+        print("✓ Clause headings and numbering are detected")
+
+    def test_offsets(self):
+        """Clauses tile the document and their text excludes the heading"""
+        clauses = self.index.clauses
+        self.assertEqual(clauses[0]['start'], 0)
+        self.assertEqual(clauses[-1]['end'], len(TERMS))
+        for previous, clause in zip(clauses, clauses[1:]):
+            self.assertEqual(previous['end'], clause['start'])
+
+        self.assertTrue(TERMS[clauses[4]['start']:].startswith('2.2 Suspension.'))
+        self.assertTrue(self.index.clause_text(clauses[4]).startswith('We may suspend accounts'))
+        self.assertTrue(self.index.clause_text(clauses[6]).startswith('We may share your personal data'))
+        print("✓ Clause offsets point into the raw text")
+
+    def test_topic_lookup(self):
+        """Topics match headings first and clause text otherwise"""
+        def titles(topics):
+            return [clause['title'] for clause in self.index.find(topics)]
+
+        self.assertEqual(titles(['termination']), ['Suspension', 'Termination'])
+        self.assertEqual(titles(['payment']), ['Fees and Payment'])
+        # No heading mentions sharing, so the clause text decides
+        self.assertEqual([clause['number'] for clause in self.index.find(['data sharing'])], ['4'])
+        # Free-text topics use their own words; subclauses inherit their section's heading
+        self.assertEqual(titles(['accounts']), ['Accounts', 'Eligibility', 'Suspension'])
+
+        matched = self.index.find(['termination', 'liability'])
+        self.assertEqual([clause['topics'] for clause in matched], [['termination'], ['liability'], ['termination']])
+        print("✓ Clauses are found by topic")
+
+    def test_keywords_match_whole_words(self):
+        """Keywords do not match inside longer words; stems do"""
+        index = ClauseSegmenter().segment(
+            "1. Feedback\nSend feedback to the seller. Feedback is read by our exchange desk.\n\n"
+            "2. Terminating Your Plan\nTermination takes effect at the end of the month.\n"
+        )
+        self.assertEqual(index.find(['payment']), [])
+        self.assertEqual(index.find(['data sharing']), [])
+        self.assertEqual(index.find(['changes']), [])
+        self.assertEqual([clause['number'] for clause in index.find(['termination'])], ['2'])
+        print("✓ Topic keywords match whole words")
+
+    def test_numbers_in_running_text(self):
+        """Numbers and section references that continue a sentence do not start clauses"""
+        index = ClauseSegmenter().segment(
+            "1. Service\nThe service is offered worldwide and\n"
+            "3.5 million users may rely on it at any time.\n"
+            "Section 4 of this Agreement applies to every user.\n"
+            "2. Fees\nFees are billed monthly.\n"
+        )
+        self.assertEqual([clause['title'] for clause in index.clauses], ['Service', 'Fees'])
+        self.assertIn('Section 4 of this Agreement applies', index.clause_text(index.clauses[0]))
+        print("✓ Numbers inside sentences do not split clauses")
+
+    def test_summarize_clauses(self):
+        """Only matching clauses are summarized, and repeated queries come from the cache"""
+        summarizer = TextSummarizer(allowed_models=[], cache=SummaryCache())
+        processor = TextProcessor()
+
+        result = summarizer.summarize_clauses(TERMS, ['termination', 'payment'], max_length=1,
+                                              model_type='lexrank', text_processor=processor)
+        self.assertEqual(result['total_clauses'], 9)
+        self.assertEqual([clause['title'] for clause in result['clauses']],
+                         ['Suspension', 'Fees and Payment', 'Termination'])
+        fees = result['clauses'][1]
+        self.assertEqual(fees['summary'], 'Subscriptions renew automatically at the end of each billing period.')
+        self.assertFalse(fees['cached'])
+        self.assertEqual(len(summarizer.cache.memory), 3)
+
+        again = summarizer.summarize_clauses(TERMS, ['payment'], max_length=1, model_type='lexrank',
+                                             text_processor=processor)
+        self.assertTrue(again['clauses'][0]['cached'])
+
+        # "2. Accounts" has no text of its own; only its subclauses are summarized
+        accounts = summarizer.summarize_clauses(TERMS, ['accounts'], max_length=1, model_type='lexrank',
+                                                text_processor=processor)
+        self.assertEqual([clause['title'] for clause in accounts['clauses']], ['Eligibility', 'Suspension'])
+        self.assertTrue(all(clause['summary'] for clause in accounts['clauses']))
+        print("✓ Clause summaries are generated for matches only and cached")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from cli import imap_bounded, iter_documents
+
+
+class BoundedSubmissionTestCase(unittest.TestCase):
+
+    def test_input_is_read_lazily(self):
+        """No more than the window of items is taken ahead of the results"""
+        taken = []
+        lock = threading.Lock()
+
+        def items():
+            for index in range(20):
+                with lock:
+                    taken.append(index)
+                yield index
+
+        with ThreadPool(2) as pool:
+            results = []
+            for result in imap_bounded(pool, lambda value: value * 2, items(), window=3):
+                with lock:
+                    self.assertLessEqual(len(taken) - len(results), 3)
+                results.append(result)
+
+        self.assertEqual(sorted(results), [index * 2 for index in range(20)])
+        print("✓ Bulk input is submitted through a bounded window")
+
+    def test_errors_are_raised(self):
+        """A call that fails on the pool raises in the caller"""
+        with ThreadPool(2) as pool:
+            with self.assertRaises(ZeroDivisionError):
+                list(imap_bounded(pool, lambda value: 1 / value, [1, 0, 2], window=2))
+        print("✓ Failed calls are raised")
+
+
+class IterDocumentsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_jsonl_skips_bad_records(self):
+        """Invalid JSON and JSON values that are not objects are skipped"""
+        path = os.path.join(self.tmp_dir, 'corpus.jsonl')
+        with open(path, 'w', encoding='utf-8') as corpus:
+            corpus.write('{"id": "a", "text": "First terms."}\n[1, 2]\n"x"\n{broken\n\n{"text": "Second terms."}\n')
+
+        with self.assertLogs('cli', level='ERROR') as logs:
+            documents = list(iter_documents(path))
+
+        self.assertEqual(documents, [('a', {'text': 'First terms.'}), ('6', {'text': 'Second terms.'})])
+        self.assertEqual(len(logs.output), 3)
+        print("✓ Non-object JSONL records are skipped")
+
+
+if __name__ == '__main__':
+    unittest.main()
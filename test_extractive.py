@@ -0,0 +1,89 @@
+import random
+import unittest
+from models.extractive import ExtractiveSummarizer
+from utils.document import Document
+
+try:
+    from sumy.models.dom import ObjectDocumentModel, Paragraph, Sentence
+    from sumy.nlp.tokenizers import Tokenizer
+    from sumy.summarizers.lex_rank import LexRankSummarizer
+    from sumy.summarizers.luhn import LuhnSummarizer
+    from sumy.summarizers.lsa import LsaSummarizer
+    SUMY_SUMMARIZERS = {'lexrank': LexRankSummarizer, 'luhn': LuhnSummarizer, 'lsa': LsaSummarizer}
+except ImportError:
+    SUMY_SUMMARIZERS = None
+
+VOCABULARY = ("user users service services terms provider providers data personal privacy account accounts "
+              "agree agrees may must shall third party partners cookies content license licenses rights "
+              "arbitration dispute disputes fees payment refund refunds subscription notice changes law "
+              "liability warranty warranties termination suspend suspension access information share "
+              "collect retain delete consent jurisdiction court claims damages indemnify").split()
+
+
+def make_document(rng, sentences):
+    """Random sentences drawn from a small ToS vocabulary"""
+    text = ' '.join(
+        ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(5, 20))).capitalize() + '.'
+        for _ in range(sentences)
+    )
+    return Document(text)
+
+
+class ExtractiveSummarizerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ExtractiveSummarizer()
+        rng = random.Random(7)
+        self.documents = [make_document(rng, rng.randint(4, 40)) for _ in range(10)]
+
+    @unittest.skipIf(SUMY_SUMMARIZERS is None, 'sumy is not installed')
+    def test_matches_sumy_selections(self):
+        """Selected sentences agree with sumy's implementations"""
+        tokenizer = Tokenizer('english')
+        for algorithm, summarizer_class in SUMY_SUMMARIZERS.items():
+            matched = total = 0
+            for document in self.documents:
+                parsed = ObjectDocumentModel([Paragraph([Sentence(s, tokenizer) for s in document.sentences()])])
+                expected = [str(sentence) for sentence in summarizer_class()(parsed, 3)]
+                selected = self.engine.summarize(document, 3, algorithm)
+                matched += len(set(expected) & set(selected))
+                total += len(expected)
+            # Exact score ties may be broken differently by floating point noise
+            self.assertGreaterEqual(matched / total, 0.95, algorithm)
+        print("✓ Extractive selections match sumy")
+
+    def test_batch_scores_match_single_documents(self):
+        """Scoring documents together gives the same scores as one at a time"""
+        for algorithm in ('lexrank', 'luhn', 'lsa'):
+            batch = self.engine.score_batch(self.documents, algorithm)
+            for document, scores in zip(self.documents, batch):
+                single = self.engine.score_batch([document], algorithm)[0]
+                self.assertEqual(len(scores), document.sentence_count)
+                self.assertTrue((abs(scores - single) < 1e-9).all(), algorithm)
+        print("✓ Batched scoring matches per-document scoring")
+
+    def test_documents_without_words(self):
+        """Sentences without any word terms get zero scores instead of failing"""
+        empty = [Document("."), Document("1. 2. 3.")]
+        for algorithm in ('lexrank', 'luhn', 'lsa'):
+            scores = self.engine.score_batch(empty, algorithm)
+            self.assertEqual([list(document_scores) for document_scores in scores], [[0.0], [0.0, 0.0, 0.0]])
+            mixed = self.engine.score_batch([self.documents[0], empty[0]], algorithm)
+            self.assertEqual(list(mixed[1]), [0.0])
+        self.assertEqual(self.engine.summarize(empty[1], 1), ["1."])
+        print("✓ Documents without words are scored without errors")
+
+    def test_summary_order_and_unknown_algorithm(self):
+        """Summaries keep document order; unknown algorithms are rejected"""
+        document = self.documents[0]
+        summary = self.engine.summarize(document, 2, 'lexrank')
+        sentences = document.sentences()
+        self.assertEqual(len(summary), 2)
+        self.assertLess(sentences.index(summary[0]), sentences.index(summary[1]))
+        with self.assertRaises(ValueError):
+            self.engine.summarize(document, 2, 'textrank')
+        print("✓ Extractive summaries keep document order")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from utils.file_handler import FileHandler, get_extraction_pool
+
+
+class FileHandlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Create a scratch directory for generated documents"""
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def make_pdf(self, pages):
+        """Write a PDF with one numbered line per page"""
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+
+        path = os.path.join(self.tmp_dir, 'terms.pdf')
+        c = canvas.Canvas(path, pagesize=letter)
+        for page in range(pages):
+            c.drawString(100, 750, f"Clause {page} of the terms and conditions.")
+            c.showPage()
+        c.save()
+        return path
+
+    def make_docx(self, name='terms.docx', clauses=2):
+        """Write a DOCX with a header, paragraphs, a fee table and a footer"""
+        from docx import Document
+
+        document = Document()
+        document.sections[0].header.paragraphs[0].text = "Example Inc. Terms"
+        document.sections[0].footer.paragraphs[0].text = "Last updated 2026"
+        for clause in range(clauses):
+            document.add_paragraph(f"Clause {clause} of the terms and conditions.")
+        table = document.add_table(rows=2, cols=2)
+        table.cell(0, 0).text = "Late fee"
+        table.cell(0, 1).text = "$25 per month"
+        table.cell(1, 0).text = "Liability"
+        table.cell(1, 1).text = "Capped at fees paid"
+        table.cell(1, 1).add_paragraph("in the last 12 months")
+        document.add_paragraph("Disputes are settled by arbitration.")
+
+        path = os.path.join(self.tmp_dir, name)
+        document.save(path)
+        return path
+
+    def test_pdf_pages_stream_in_order(self):
+        """Serial and parallel extraction yield the same pages in order"""
+        path = self.make_pdf(12)
+        serial = list(FileHandler(pdf_workers=1).iter_pdf_pages(path))
+        parallel = list(FileHandler(pdf_workers=2, parallel_pdf_threshold=4, pdf_pages_per_task=3)
+                        .iter_pdf_pages(path))
+
+        self.assertEqual(len(serial), 12)
+        self.assertEqual(serial, parallel)
+        self.assertIn('Clause 11', parallel[-1])
+        print("✓ PDF pages stream in order, serially and in parallel")
+
+    def test_parallel_extraction_with_busy_threads(self):
+        """Workers are spawned from a shared pool, so locks held by other threads cannot leak into them"""
+        path = self.make_pdf(12)
+        handler = FileHandler(pdf_workers=2, parallel_pdf_threshold=4, pdf_pages_per_task=3)
+        held = threading.Lock()
+        release = threading.Event()
+
+        def hold_lock():
+            with held:
+                release.wait()
+
+        holder = threading.Thread(target=hold_lock, daemon=True)
+        holder.start()
+        pages = []
+        try:
+            extractor = threading.Thread(target=lambda: pages.extend(handler.iter_pdf_pages(path)), daemon=True)
+            extractor.start()
+            extractor.join(timeout=60)
+            self.assertFalse(extractor.is_alive())
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual(len(pages), 12)
+        pool = get_extraction_pool(2)
+        self.assertIs(pool, get_extraction_pool(2))
+        self.assertEqual(pool._mp_context.get_start_method(), 'spawn')
+        print("✓ Parallel extraction reuses a spawned worker pool")
+
+    def test_pdf_page_limits(self):
+        """Page ranges and max_pages limit extraction"""
+        path = self.make_pdf(6)
+        handler = FileHandler(pdf_workers=1)
+
+        pages = list(handler.iter_pdf_pages(path, start_page=2, max_pages=2))
+        self.assertEqual(len(pages), 2)
+        self.assertIn('Clause 2', pages[0])
+
+        text = FileHandler(pdf_workers=1, max_pdf_pages=3).extract_text(path)
+        self.assertIn('Clause 2', text)
+        self.assertNotIn('Clause 3', text)
+        print("✓ PDF extraction honours page limits")
+
+    def test_detect_encoding(self):
+        """Encodings are detected from a sample, BOM first"""
+        handler = FileHandler()
+        text = "The provider’s liability is limited to fees paid in the last twelve months. " * 20
+
+        self.assertEqual(handler.detect_encoding(text.encode('utf-8')), 'utf-8')
+        self.assertEqual(handler.detect_encoding(text.encode('utf-8-sig')), 'utf-8-sig')
+        self.assertEqual(handler.detect_encoding(text.encode('utf-16')), 'utf-16')
+        # A sample cut inside a multi-byte character is still UTF-8
+        self.assertEqual(handler.detect_encoding(text.encode('utf-8')[:23]), 'utf-8')
+        self.assertNotEqual(handler.detect_encoding(text.encode('cp1252')), 'utf-8')
+        print("✓ Text encodings are detected from a sample")
+
+    def test_txt_streams_in_blocks(self):
+        """Text files are decoded block by block without splitting characters"""
+        handler = FileHandler()
+        text = "Les conditions générales s’appliquent à tous les utilisateurs. " * 50
+        path = os.path.join(self.tmp_dir, 'terms.txt')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+        blocks = list(handler._iter_txt(path, block_size=101))
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual(''.join(blocks), text)
+        self.assertEqual(handler.extract_text(path), text)
+
+        legacy = "The provider’s liability is limited – fees paid are non-refundable. " * 20
+        with open(path, 'w', encoding='cp1252') as file:
+            file.write(legacy)
+        self.assertEqual(handler.extract_text(path), legacy)
+
+        open(path, 'w').close()
+        self.assertEqual(list(handler.iter_text(path)), [])
+        print("✓ Text files stream in blocks")
+
+    def test_docx_streams_tables_headers_and_footers(self):
+        """DOCX paragraphs, table rows, headers and footers are extracted in document order"""
+        handler = FileHandler()
+        paragraphs = list(handler.iter_docx_paragraphs(self.make_docx()))
+
+        self.assertEqual(paragraphs, [
+            "Example Inc. Terms",
+            "Clause 0 of the terms and conditions.",
+            "Clause 1 of the terms and conditions.",
+            "Late fee\t$25 per month",
+            "Liability\tCapped at fees paid in the last 12 months",
+            "Disputes are settled by arbitration.",
+            "Last updated 2026",
+        ])
+        self.assertEqual(handler.extract_text(self.make_docx()), "\n".join(paragraphs))
+        print("✓ DOCX tables, headers and footers are extracted in order")
+
+    def test_docx_nested_tables_and_text_boxes(self):
+        """Nested tables and text boxes are extracted once, with the cell or paragraph holding them"""
+        from docx import Document
+        from docx.oxml import parse_xml
+
+        def text_box(text):
+            # Word stores a text box twice: as a DrawingML mc:Choice and a VML mc:Fallback
+            content = f'<w:txbxContent><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:txbxContent>'
+            return parse_xml(
+                '<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+                'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+                'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+                'xmlns:v="urn:schemas-microsoft-com:vml"><mc:AlternateContent>'
+                f'<mc:Choice Requires="wps"><w:drawing><wps:txbx>{content}</wps:txbx></w:drawing></mc:Choice>'
+                f'<mc:Fallback><w:pict><v:textbox>{content}</v:textbox></w:pict></mc:Fallback>'
+                '</mc:AlternateContent></w:r>'
+            )
+
+        document = Document()
+        paragraph = document.add_paragraph("See the notice.")
+        paragraph._p.append(text_box("Fees may change."))
+        table = document.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "Plans"
+        table.cell(0, 0).paragraphs[0]._p.append(text_box("Monthly only."))
+        nested = table.cell(0, 1).add_table(rows=2, cols=2)
+        for row, (plan, price) in enumerate([("Basic", "$5"), ("Pro", "$20")]):
+            nested.cell(row, 0).text = plan
+            nested.cell(row, 1).text = price
+        path = os.path.join(self.tmp_dir, 'nested.docx')
+        document.save(path)
+
+        self.assertEqual(list(FileHandler().iter_docx_paragraphs(path)), [
+            "See the notice.\nFees may change.",
+            "Plans Monthly only.\tBasic\t$5 Pro\t$20",
+        ])
+        print("✓ DOCX nested tables and text boxes are not duplicated")
+
+    def test_extract_many(self):
+        """Many files are extracted in parallel, in input order"""
+        paths = [self.make_docx(f"terms{index}.docx", clauses=index + 1) for index in range(4)]
+        paths.append(os.path.join(self.tmp_dir, 'missing.docx'))
+
+        serial = list(FileHandler(pdf_workers=1).extract_many(paths))
+        parallel = []
+        # Another thread holds a lock throughout, as model and job threads do in the server
+        held = threading.Lock()
+        with held:
+            extractor = threading.Thread(
+                target=lambda: parallel.extend(FileHandler().extract_many(paths, workers=2)), daemon=True
+            )
+            extractor.start()
+            extractor.join(timeout=60)
+        self.assertFalse(extractor.is_alive())
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual([path for path, _ in parallel], paths)
+        self.assertIn("Clause 3 of the terms", parallel[3][1])
+        self.assertEqual(parallel[-1][1], "")
+        print("✓ Files are extracted in parallel")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from utils.jobs import JobManager
+
+
+def summarize_in_chunks(chunks, progress_callback=None):
+    """Job body that reports one event per chunk"""
+    progress_callback({'type': 'chunks', 'total': len(chunks)})
+    for index, chunk in enumerate(chunks):
+        progress_callback({'type': 'chunk', 'index': index, 'total': len(chunks), 'summary': chunk})
+    return {'summary': ' '.join(chunks)}
+
+
+def failing_job(progress_callback=None):
+    raise ValueError('Text is too short for meaningful summarization.')
+
+
+class JobManagerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = JobManager(max_workers=1)
+
+    def test_progress_events_stream_until_completion(self):
+        """Events arrive in order and the stream ends with the result"""
+        job_id = self.jobs.submit(summarize_in_chunks, ['First.', 'Second.'])
+
+        events = [item[1] for item in self.jobs.iter_events(job_id, heartbeat=0.1) if item is not None]
+
+        self.assertEqual([event['type'] for event in events],
+                         ['started', 'chunks', 'chunk', 'chunk', 'completed'])
+        job = self.jobs.get(job_id)
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['progress'], {'total_chunks': 2, 'completed_chunks': 2})
+        self.assertEqual(job['result'], {'summary': 'First. Second.'})
+        print("✓ Job progress streams until completion")
+
+    def test_failed_job_reports_error(self):
+        """Exceptions mark the job as failed"""
+        job_id = self.jobs.submit(failing_job)
+        list(self.jobs.iter_events(job_id, heartbeat=0.1))
+
+        job = self.jobs.get(job_id)
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('too short', job['error'])
+        self.assertIsNone(self.jobs.get('unknown'))
+        print("✓ Failed jobs report their error")
+
+
+if __name__ == '__main__':
+    unittest.main()
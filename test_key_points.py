@@ -0,0 +1,39 @@
+import unittest
+from models.key_points import KeyPointExtractor
+from utils.document import Document
+
+FILLER = "Nothing in this paragraph concerns anything of particular interest here."
+CLAUSES = [
+    "Arbitration is mandatory and arbitration waives class actions for every user.",
+    "Personal data is shared with advertising partners for arbitration records.",
+    "Personal data may be retained after account deletion for legal reasons.",
+]
+
+
+class KeyPointExtractorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = KeyPointExtractor(max_points=2)
+
+    def test_covers_whole_document(self):
+        """Key points are found beyond the first sentences of long documents"""
+        sentences = [FILLER] * 50 + CLAUSES
+        document = Document(' '.join(sentences))
+
+        key_points = self.extractor.extract(document)
+
+        self.assertEqual([point['position'] for point in key_points], [50, 51])
+        self.assertEqual(key_points[0]['text'], CLAUSES[0])
+        self.assertEqual(document.text[key_points[1]['start']:key_points[1]['end']], CLAUSES[1])
+        self.assertEqual(max(point['score'] for point in key_points), 1.0)
+        print("✓ Key points cover the whole document")
+
+    def test_no_keywords(self):
+        """Documents without usable keywords have no key points"""
+        self.assertEqual(self.extractor.extract(Document("It is. So it was. And so on.")), [])
+        self.assertEqual(self.extractor.extract(Document("")), [])
+        print("✓ Documents without keywords have no key points")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from utils.metrics import MetricsRegistry, StageTimer
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_text_format(self):
+        """Counters and cumulative histogram buckets render in the Prometheus text format"""
+        loads = self.registry.counter('loads', 'Models loaded', ['model'])
+        latency = self.registry.histogram('latency_seconds', 'Latency', ['stage'], buckets=(0.1, 1.0))
+        loads.inc(model='bart')
+        loads.inc(model='bart')
+        latency.observe(0.05, stage='chunking')
+        latency.observe(0.5, stage='chunking')
+
+        lines = self.registry.render().splitlines()
+        self.assertIn('# TYPE loads counter', lines)
+        self.assertIn('loads_total{model="bart"} 2', lines)
+        self.assertIn('latency_seconds_bucket{stage="chunking",le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{stage="chunking",le="1.0"} 2', lines)
+        self.assertIn('latency_seconds_bucket{stage="chunking",le="+Inf"} 2', lines)
+        self.assertIn('latency_seconds_sum{stage="chunking"} 0.55', lines)
+        self.assertIn('latency_seconds_count{stage="chunking"} 2', lines)
+        print("✓ Metrics render in Prometheus text format")
+
+    def test_stage_timer(self):
+        """Repeated stages add up per request and each run is observed"""
+        histogram = self.registry.histogram('stage_seconds', 'Stages', ['stage'])
+        timer = StageTimer(histogram)
+        timer.record('generation', 0.25)
+        timer.record('generation', 0.5)
+        with timer.stage('reduce'):
+            pass
+
+        self.assertEqual(timer.as_dict()['generation'], 0.75)
+        self.assertIn('reduce', timer.as_dict())
+        self.assertEqual(histogram.count(stage='generation'), 2)
+        print("✓ Stage timer accumulates per-request timings")
+
+
+if __name__ == '__main__':
+    unittest.main()
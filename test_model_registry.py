@@ -0,0 +1,99 @@
+import unittest
+from models.model_registry import ModelRegistry
+
+
+class StubPipeline:
+    """Stand-in for a transformers pipeline"""
+
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+
+
+class ModelRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a registry with a recording stub loader"""
+        self.loaded = []
+        self.checkpoints = {'bart': 'stub-bart', 't5': 'stub-t5', 'legal': 'stub-legal'}
+        self.size_hints = {'bart': 100, 't5': 40, 'legal': 80}
+
+    def make_registry(self, **kwargs):
+        def loader(checkpoint):
+            self.loaded.append(checkpoint)
+            return StubPipeline(checkpoint)
+
+        return ModelRegistry(
+            loader=loader,
+            checkpoints=self.checkpoints,
+            size_hints_mb=self.size_hints,
+            **kwargs
+        )
+
+    def test_models_load_on_first_use(self):
+        """Nothing loads at construction and each model loads once"""
+        registry = self.make_registry()
+        self.assertEqual(self.loaded, [])
+
+        first = registry.get('t5')
+        second = registry.get('t5')
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loaded, ['stub-t5'])
+        print("✓ Models load lazily and are reused")
+
+    def test_allow_list(self):
+        """Models outside the allow-list are rejected"""
+        registry = self.make_registry(allowed_models=['legal'])
+
+        with self.assertRaises(ValueError):
+            registry.get('bart')
+        self.assertEqual(self.loaded, [])
+        print("✓ Allow-list is enforced")
+
+    def test_lru_eviction_under_budget(self):
+        """Least recently used models are evicted to stay within the budget"""
+        registry = self.make_registry(memory_budget_mb=200)
+
+        registry.get('bart')
+        registry.get('t5')
+        registry.get('bart')  # t5 becomes least recently used
+        registry.get('legal')
+
+        self.assertEqual(registry.loaded_models(), ['bart', 'legal'])
+        self.assertLessEqual(registry.memory_usage_mb(), 200)
+        self.assertGreaterEqual(registry.stats()['evictions'], 1)
+        print("✓ LRU eviction keeps memory within budget")
+
+    def test_warm_up(self):
+        """Warm-up pre-loads only the requested models"""
+        registry = self.make_registry()
+
+        loaded = registry.warm_up(['legal'])
+
+        self.assertEqual(loaded, ['legal'])
+        self.assertEqual(registry.loaded_models(), ['legal'])
+        print("✓ Warm-up pre-loads requested models")
+
+    def test_int8_backend_quantizes_linear_layers(self):
+        """The int8 backend quantizes the loaded model; other models stay fp32"""
+        import torch
+
+        def loader(checkpoint):
+            pipe = StubPipeline(checkpoint)
+            pipe.model = torch.nn.Sequential(torch.nn.Linear(64, 64))
+            return pipe
+
+        registry = ModelRegistry(loader=loader, checkpoints=self.checkpoints, backends={'t5': 'int8'})
+
+        quantized = registry.get('t5').model[0]
+        self.assertNotIsInstance(quantized, torch.nn.Linear)
+        self.assertIsInstance(registry.get('bart').model[0], torch.nn.Linear)
+        self.assertEqual(registry.stats()['backends']['t5'], 'int8')
+        self.assertLess(registry._sizes_mb['t5'], registry._sizes_mb['bart'])
+        with self.assertRaises(ValueError):
+            ModelRegistry(backends={'bart': 'tensorrt'})
+        print("✓ Backends are selected per model")
+
+
+if __name__ == '__main__':
+    unittest.main()
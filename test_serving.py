@@ -0,0 +1,57 @@
+import gc
+import os
+import unittest
+
+from utils.serving import freeze_shared_state, limit_threads, worker_threads
+
+
+class ServingTestCase(unittest.TestCase):
+
+    def test_worker_threads(self):
+        """Cores are split between workers, with at least one thread each"""
+        self.assertEqual(worker_threads(4, cpu_count=16), 4)
+        self.assertEqual(worker_threads(3, cpu_count=8), 2)
+        self.assertEqual(worker_threads(8, cpu_count=4), 1)
+        self.assertEqual(worker_threads(0, cpu_count=4), 4)
+        print("✓ Inference threads are split between workers")
+
+    def test_freeze_shared_state(self):
+        """Objects allocated before the fork are moved out of the collector's reach"""
+        try:
+            self.assertGreater(freeze_shared_state(), 0)
+            self.assertEqual(gc.get_freeze_count(), freeze_shared_state())
+        finally:
+            gc.unfreeze()
+        print("✓ Shared state is frozen before forking")
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires fork')
+    def test_forked_worker_uses_parent_model(self):
+        """A forked worker runs the model loaded by its parent with its own thread count"""
+        import torch
+
+        model = torch.nn.Linear(16, 4)
+        expected = model(torch.ones(1, 16)).sum().item()
+        read_fd, write_fd = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                limit_threads(1)
+                with torch.no_grad():
+                    result = model(torch.ones(1, 16)).sum().item()
+                os.write(write_fd, f"{torch.get_num_threads()} {result}".encode())
+            finally:
+                os._exit(0)
+
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            threads, result = pipe.read().split()
+        os.waitpid(pid, 0)
+
+        self.assertEqual(int(threads), 1)
+        self.assertAlmostEqual(float(result), expected, places=5)
+        print("✓ Forked workers share the parent's model")
+
+
+if __name__ == '__main__':
+    unittest.main()
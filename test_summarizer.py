@@ -0,0 +1,314 @@
+import re
+import unittest
+from types import SimpleNamespace
+from models.deadline import Deadline
+from models.generation_policy import GenerationPolicy, PROFILES
+from models.summarizer import TextSummarizer
+from utils.cache import SummaryCache
+
+
+class WordTokenizer:
+    """Tokenizer with one token per word and no special tokens"""
+
+    model_max_length = 40
+
+    def __call__(self, texts, add_special_tokens=False, verbose=False):
+        return {'input_ids': [list(range(len(text.split()))) for text in texts]}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 0
+
+
+class StubRegistry:
+    """Registry that hands out a pipeline with a 40-token context window"""
+
+    def __init__(self):
+        self.pipe = SimpleNamespace(tokenizer=WordTokenizer(), model=SimpleNamespace(config=SimpleNamespace()))
+
+    def get(self, model_type):
+        return self.pipe
+
+    def is_loaded(self, model_type):
+        return False
+
+
+class RecordingGenerator:
+    """Generator that records its inputs and keeps the first six words of each"""
+
+    batch_size = 2
+
+    def __init__(self, clock=None, seconds_per_input=None):
+        self.calls = []
+        self.clock = clock
+        self.seconds_per_input = seconds_per_input
+
+    def encode(self, pipe, texts):
+        return [text.split() for text in texts]
+
+    def generate(self, pipe, inputs, gen_kwargs, on_result=None):
+        inputs = [' '.join(item) if isinstance(item, list) else item for item in inputs]
+        self.calls.append(inputs)
+        if self.clock:
+            # Every generate call takes one second, unless each input has a cost
+            self.clock.now += self.seconds_per_input * len(inputs) if self.seconds_per_input else 1.0
+        summaries = [' '.join(text.split()[:6]) for text in inputs]
+        for index, summary in enumerate(summaries):
+            if on_result:
+                on_result(index, summary)
+        return summaries
+
+
+class FakeClock:
+    """Monotonic clock advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TreeReduceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.summarizer = TextSummarizer(
+            registry=StubRegistry(), reduce_fan_in=3, reduce_max_depth=3, generation_profile='quality'
+        )
+        self.summarizer.generator = RecordingGenerator()
+        self.events = []
+        # 12 chunk summaries of 10 words each
+        self.summaries = [' '.join(f"w{index}" for _ in range(10)) for index in range(12)]
+
+    def test_groups_fit_context_and_fan_in(self):
+        """Each level batches groups that fit the window and respect the fan-in"""
+        summary = self.summarizer._reduce_summaries('bart', self.summaries, 1, self.events.append)
+
+        # 12 summaries -> 4 groups of 3 -> 2 groups, whose 12 words fit the requested length;
+        # the second group (6 words) is below the profile's skip threshold and carried over
+        calls = self.summarizer.generator.calls
+        self.assertEqual([len(call) for call in calls], [4, 1])
+        self.assertTrue(all(len(text.split()) <= 40 for text in calls[0]))
+        self.assertEqual(calls[0][0].split()[0], 'w0')
+        self.assertEqual(calls[0][-1].split()[-1], 'w11')
+        self.assertEqual(self.events, [
+            {'type': 'reduce', 'level': 1, 'groups': 4},
+            {'type': 'reduce', 'level': 2, 'groups': 2},
+        ])
+        self.assertEqual(len(summary.split()), 12)
+
+        # A larger fan-in is bounded by the 40-token window instead
+        pipe = self.summarizer.registry.get('bart')
+        groups = self.summarizer.chunker.group(pipe, self.summaries, fan_in=8)
+        self.assertEqual(groups, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]])
+        print("✓ Reduce levels respect the context window and fan-in")
+
+    def test_depth_limit_forces_final_reduce(self):
+        """The last allowed level combines every remaining summary"""
+        self.summarizer.reduce_max_depth = 1
+        summary = self.summarizer._reduce_summaries('bart', self.summaries, 1, self.events.append)
+
+        self.assertEqual([len(call) for call in self.summarizer.generator.calls], [1])
+        self.assertEqual(self.events, [{'type': 'reduce', 'level': 1, 'groups': 1}])
+        self.assertEqual(len(summary.split()), 6)
+        print("✓ Depth limit forces a single final reduce")
+
+    def test_short_summaries_are_joined(self):
+        """Summaries that already fit the requested length are not reduced"""
+        summary = self.summarizer._reduce_summaries('bart', self.summaries[:2], 3)
+        self.assertEqual(summary, ' '.join(self.summaries[:2]))
+        self.assertEqual(self.summarizer.generator.calls, [])
+        print("✓ Short summaries are joined without a reduce")
+
+
+class GenerationPolicyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = GenerationPolicy()
+
+    def test_length_bounds_are_consistent(self):
+        """Every profile keeps min_length <= max_length for any chunk size"""
+        for profile in PROFILES:
+            for tokens in range(PROFILES[profile]['skip_below'], 1100, 7):
+                kwargs = self.policy.chunk_kwargs(tokens, profile)
+                self.assertLessEqual(kwargs['min_length'], kwargs['max_length'])
+                self.assertLessEqual(kwargs['max_length'], PROFILES[profile]['max_summary'])
+        print("✓ Length bounds are consistent for every profile")
+
+    def test_cost_follows_chunk_size(self):
+        """Tiny chunks are skipped, short ones decode greedily and fast never uses beams"""
+        self.assertIsNone(self.policy.chunk_kwargs(10))
+        self.assertEqual(self.policy.chunk_kwargs(60)['num_beams'], 1)
+        self.assertEqual(self.policy.chunk_kwargs(1000)['num_beams'], 4)
+        self.assertEqual(self.policy.chunk_kwargs(1000, 'fast')['num_beams'], 1)
+        self.assertGreater(self.policy.chunk_kwargs(1000, 'quality')['max_length'],
+                           self.policy.chunk_kwargs(1000, 'fast')['max_length'])
+        with self.assertRaises(ValueError):
+            self.policy.resolve('slow')
+        print("✓ Generation cost follows chunk size and profile")
+
+    def test_short_chunks_without_words(self):
+        """Short chunks with nothing to rank are kept as they are under the fast profile"""
+        summarizer = TextSummarizer(registry=StubRegistry())
+        self.assertEqual(summarizer._short_chunk_summary(".", 'fast'), ".")
+        self.assertEqual(summarizer._short_chunk_summary("1. 2. 3.", 'fast'), "1. 2. 3.")
+
+        texts = ["1. 2. 3.", "Fees are due monthly. Late fees apply. Refunds are not given."]
+        summaries = summarizer._extract_chunks(texts)
+        self.assertEqual(summaries[0], texts[0])
+        self.assertEqual(len(summaries[1].split('. ')), 1)
+        print("✓ Chunks without words pass through the extractive fallback")
+
+
+class OffsetTokenizer:
+    """Fast-style tokenizer with one token per word and character offsets"""
+
+    # Room for about 40 sentences, so anchors rather than a full window end most chunks
+    model_max_length = 400
+    is_fast = True
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False, verbose=False):
+        spans = [match.span() for match in re.finditer(r'\S+', text)]
+        return {'input_ids': [hash(text[start:end]) % 30000 for start, end in spans], 'offset_mapping': spans}
+
+    def num_special_tokens_to_add(self, pair=False):
+        return 0
+
+    def build_inputs_with_special_tokens(self, ids):
+        return ids
+
+
+class CachingRegistry(StubRegistry):
+    """Stub registry with the checkpoint and backend that chunk cache keys include"""
+
+    checkpoints = {'bart': 'stub'}
+
+    def __init__(self):
+        super().__init__()
+        self.pipe = SimpleNamespace(tokenizer=OffsetTokenizer(), model=SimpleNamespace(config=SimpleNamespace()))
+
+    def backend(self, model_type):
+        return 'torch'
+
+
+class CountingGenerator:
+    """Generator that counts the chunks it summarizes"""
+
+    batch_size = 8
+
+    def __init__(self):
+        self.generated = 0
+
+    def generate(self, pipe, inputs, gen_kwargs, on_result=None):
+        summaries = []
+        for index, _ in enumerate(inputs):
+            self.generated += 1
+            summaries.append(f"summary {self.generated}")
+            if on_result:
+                on_result(index, summaries[-1])
+        return summaries
+
+
+class ChunkCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.summarizer = TextSummarizer(registry=CachingRegistry(), chunk_cache=SummaryCache())
+        self.summarizer.generator = CountingGenerator()
+        self.sentences = [f"Clause {index} requires party {index} to notify the provider." for index in range(600)]
+
+    def summarize(self, sentences):
+        """Chunk a document and summarize its chunks, returning the chunk texts"""
+        pipe = self.summarizer.registry.get('bart')
+        chunks = self.summarizer.chunker.chunk(pipe, ' '.join(sentences))
+        gen_kwargs = [{'num_beams': 1, 'max_length': 20} for _ in chunks]
+        self.summarizer._summarize_chunks('bart', chunks, gen_kwargs)
+        return [chunk['text'] for chunk in chunks]
+
+    def test_edit_regenerates_only_nearby_chunks(self):
+        """Editing one sentence re-runs the chunks around it; every other chunk is a cache hit"""
+        before = self.summarize(self.sentences)
+        self.assertEqual(self.summarizer.generator.generated, len(before))
+        self.assertGreater(len(before), 10)
+
+        edited = list(self.sentences)
+        # The longer sentence would shift every later boundary of greedily packed chunks
+        edited[300] = "Clause 300 lets either party end the agreement at any time and for any reason at all."
+        self.summarizer.generator.generated = 0
+        after = self.summarize(edited)
+
+        changed = [text for text in after if text not in before]
+        self.assertTrue(any(edited[300] in text for text in changed))
+        self.assertLessEqual(len(changed), 2)
+        # Only the chunks whose text changed reach the model
+        self.assertEqual(self.summarizer.generator.generated, len(changed))
+        print("✓ An edit regenerates only the chunks around it")
+
+
+class DeadlineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.summarizer = TextSummarizer(registry=StubRegistry(), generation_profile='quality')
+        self.summarizer.generator = RecordingGenerator(self.clock)
+        self.events = []
+        sentence = "Every clause of this agreement binds the user and the service. "
+        # The stub generator reads words as token ids
+        self.chunks = [
+            {'text': (sentence * 6).strip(), 'input_ids': (sentence * 6).split()} for _ in range(10)
+        ]
+
+    def test_remaining_chunks_degrade_when_at_risk(self):
+        """Chunks the budget has no time for are summarized extractively"""
+        deadline = Deadline(3.5, safety_margin=0, clock=self.clock)
+        gen_kwargs = [self.summarizer.policy.chunk_kwargs(60) for _ in self.chunks]
+
+        summaries = self.summarizer._summarize_chunks(
+            'bart', self.chunks, gen_kwargs, self.events.append, deadline=deadline
+        )
+
+        # A probe of one chunk takes 1s, so 9 more chunks and a reduce (10s) cannot fit in 2.5s
+        self.assertEqual([len(call) for call in self.summarizer.generator.calls], [1])
+        self.assertEqual(deadline.degradations, [{'stage': 'chunks', 'to': 'extractive', 'inputs': 9}])
+        self.assertTrue(all(summaries))
+        self.assertEqual(len(summaries[0].split()), 6)
+        self.assertEqual(summaries[-1].count('.'), 3)
+        self.assertIn({'type': 'degraded', 'stage': 'chunks', 'to': 'extractive', 'inputs': 9}, self.events)
+        print("✓ Chunks past the deadline are degraded to extractive")
+
+    def test_first_call_of_slow_model_is_probed(self):
+        """Without a measured rate a single chunk is run, so a slow model cannot overrun the budget"""
+        self.summarizer.generator = RecordingGenerator(self.clock, seconds_per_input=1.0)
+        deadline = Deadline(1.5, safety_margin=0, clock=self.clock)
+        gen_kwargs = [self.summarizer.policy.chunk_kwargs(60) for _ in self.chunks]
+
+        self.summarizer._summarize_chunks('bart', self.chunks, gen_kwargs, deadline=deadline)
+
+        # A first batch of 2 would have taken 2s
+        self.assertEqual([len(call) for call in self.summarizer.generator.calls], [1])
+        self.assertLessEqual(self.clock.now, 1.5)
+        self.assertEqual(deadline.degradations, [{'stage': 'chunks', 'to': 'extractive', 'inputs': 9}])
+        print("✓ A slow model's first call is sized to the deadline")
+
+    def test_reduce_degrades_after_deadline(self):
+        """An expired deadline replaces the model reduce with sentence selection"""
+        deadline = Deadline(1.0, clock=self.clock)
+        self.clock.now = 5.0
+
+        summary = self.summarizer._reduce_summaries(
+            'bart', [chunk['text'] for chunk in self.chunks], 2, deadline=deadline
+        )
+
+        self.assertEqual(self.summarizer.generator.calls, [])
+        self.assertEqual(summary.count('.'), 2)
+        self.assertTrue(deadline.degraded)
+        print("✓ Reduce is degraded once the deadline has passed")
+
+    def test_no_deadline_runs_everything(self):
+        """Without a deadline all chunks go to the model in one call"""
+        gen_kwargs = [self.summarizer.policy.chunk_kwargs(60) for _ in self.chunks]
+        self.summarizer._summarize_chunks('bart', self.chunks, gen_kwargs)
+        self.assertEqual([len(call) for call in self.summarizer.generator.calls], [10])
+        print("✓ Without a deadline every chunk is generated")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from utils.cache import SummaryCache, SQLiteCache
+
+
+class SummaryCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Create a scratch directory for the disk tier"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'cache.sqlite3')
+
+    def tearDown(self):
+        """Clean up after test"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_key_normalizes_text(self):
+        """Whitespace differences share a key; parameters do not"""
+        cache = SummaryCache()
+        key = cache.make_key("Terms  of\nservice. ", model_type='bart', max_length=3)
+
+        self.assertEqual(key, cache.make_key("Terms of service.", model_type='bart', max_length=3))
+        self.assertNotEqual(key, cache.make_key("Terms of service.", model_type='t5', max_length=3))
+        print("✓ Cache keys are content-addressed")
+
+    def test_memory_tier_hits_and_misses(self):
+        """Hits and misses are counted and the LRU tier stays bounded"""
+        cache = SummaryCache(max_entries=2)
+        cache.set('a', {'summary': 'A'})
+        cache.set('b', {'summary': 'B'})
+        cache.set('c', {'summary': 'C'})
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), {'summary': 'C'})
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['memory_entries'], 2)
+        print("✓ Memory tier counts hits and evicts old entries")
+
+    def test_disk_tier_survives_restart(self):
+        """A new cache instance is served from the shared disk tier"""
+        SummaryCache(db_path=self.db_path).set('key', {'summary': 'Cached'})
+
+        cache = SummaryCache(db_path=self.db_path)
+        self.assertEqual(cache.get('key'), {'summary': 'Cached'})
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+        print("✓ Disk tier persists between processes")
+
+    def test_disk_tier_ttl_and_size_limit(self):
+        """Expired and least recently used disk entries are evicted"""
+        disk = SQLiteCache(self.db_path, ttl_seconds=0.05)
+        disk.set('old', {'summary': 'Old'})
+        time.sleep(0.1)
+        self.assertIsNone(disk.get('old'))
+
+        disk = SQLiteCache(self.db_path, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            disk.set(key, {'summary': key})
+        self.assertEqual(len(disk), 2)
+        self.assertIsNone(disk.get('a'))
+        print("✓ Disk tier honours TTL and size limits")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from utils.text_processor import TextProcessor
+
+
+class TextProcessorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.processor = TextProcessor()
+
+    def test_preprocess_cleans_text(self):
+        """Markup, links and repeated punctuation are removed"""
+        text = ("<p>we may change these terms at any time!!!</p> "
+                "Questions go to help@example.com  or https://example.com/help today. ok")
+        processed = self.processor.preprocess(text)
+
+        self.assertEqual(processed, "We may change these terms at any time! Questions go to or today.")
+        print("✓ Preprocessing removes markup, links and noise")
+
+    def test_preprocess_fixes_typographic_characters(self):
+        """Curly quotes and dashes become their ASCII equivalents"""
+        processed = self.processor.preprocess("The user’s data is “shared” — sometimes.")
+        self.assertEqual(processed, "The user's data is \"shared\" - sometimes.")
+        print("✓ Typographic characters are normalized")
+
+    def test_preprocess_returns_sentence_spans(self):
+        """Sentence offsets point into the cleaned text"""
+        text, spans = self.processor.preprocess(
+            "the user agrees to these terms. we may suspend accounts at any time",
+            return_sentences=True
+        )
+
+        self.assertEqual([text[start:end] for start, end in spans],
+                         ["The user agrees to these terms.", "We may suspend accounts at any time."])
+        self.assertEqual(self.processor.preprocess('', return_sentences=True), ('', []))
+        print("✓ Preprocessing returns sentence boundaries")
+
+    def test_build_document(self):
+        """Documents expose sentence, word and term views of the cleaned text"""
+        document = self.processor.build_document(
+            "Users must accept the terms. The terms may change, users are notified."
+        )
+
+        self.assertEqual(document.sentence_count, 2)
+        self.assertEqual(document.word_count, len(document.text.split()))
+        self.assertEqual(document.sentence(1), "The terms may change, users are notified.")
+
+        terms = document.terms()
+        first_sentence = [terms[term_id] for term_id in document.sentence_term_ids(0)]
+        self.assertEqual(first_sentence, ['users', 'must', 'accept', 'the', 'terms'])
+        self.assertEqual(document.term_counts()[document.vocabulary['terms']], 2)
+        print("✓ Documents share sentence and word offsets")
+
+    def test_build_document_stream(self):
+        """Text streamed in small blocks and segments yields the same document"""
+        text = " ".join(
+            f"Clause {index}: the provider may suspend accounts that breach section {index}.\n"
+            for index in range(40)
+        )
+        blocks = [text[start:start + 37] for start in range(0, len(text), 37)]
+        expected = self.processor.build_document(text)
+        streamed = self.processor.build_document_stream(iter(blocks), segment_chars=300)
+
+        self.assertEqual(streamed.text, expected.text)
+        self.assertEqual(streamed.sentence_spans.tolist(), expected.sentence_spans.tolist())
+        self.assertEqual(self.processor.build_document_stream([]).text, '')
+        print("✓ Streamed text is preprocessed segment by segment")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.file_handler import FileHandler
+from utils.url_fetcher import URLFetcher, extract_html_text
+
+PAGE = b"""<html><head><title>Terms</title><script>var tracking = 1;</script></head>
+<body><nav>Home | About</nav><header>Example Inc.</header>
+<article><h1>Terms of Service</h1><p>We may suspend accounts that violate these terms.</p>
+<!-- internal note --><p>Fees are <b>non-refundable</b> once charged.</p></article>
+<footer>Copyright</footer></body></html>"""
+
+
+class PolicyHandler(BaseHTTPRequestHandler):
+    """Serves a policy page with validators and slow pages for concurrency checks"""
+
+    etag = '"v1"'
+    last_modified = 'Mon, 05 Oct 2026 10:00:00 GMT'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+
+        if self.path == '/terms':
+            if self.headers.get('If-None-Match') == self.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_page(PAGE, [('ETag', self.etag)])
+        elif self.path == '/privacy':
+            if self.headers.get('If-Modified-Since') == self.last_modified:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_page(b'<html><body><p>We never sell your data.</p></body></html>',
+                           [('Last-Modified', self.last_modified)])
+        elif self.path.startswith('/slow/'):
+            with server.lock:
+                server.active += 1
+                server.peak = max(server.peak, server.active)
+            time.sleep(0.1)
+            with server.lock:
+                server.active -= 1
+            self.send_page(f'<html><body><main>Page {self.path[6:]}</main></body></html>'.encode('utf-8'))
+        else:
+            self.send_error(404)
+
+    def send_page(self, body, headers=()):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class URLFetcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """Start a local stand-in for policy sites and a scratch cache directory"""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), PolicyHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.active = 0
+        self.server.peak = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Stop the server and clean up"""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def test_extracts_main_content(self):
+        """Scripts, navigation and comments are dropped; the article is kept"""
+        text = extract_html_text(PAGE)
+        self.assertIn('We may suspend accounts that violate these terms.', text)
+        self.assertIn('Fees are non-refundable once charged.', text)
+        for boilerplate in ('tracking', 'Home', 'Example Inc.', 'Copyright', 'internal note'):
+            self.assertNotIn(boilerplate, text)
+        self.assertIn('We never sell your data.', extract_html_text(b'<p>We never sell your data.</p>'))
+        print("✓ HTML extraction keeps the main content")
+
+    def test_conditional_revalidation(self):
+        """Cached pages are revalidated with their ETag or Last-Modified and reused on 304"""
+        fetcher = URLFetcher(cache_dir=self.cache_dir)
+        first = fetcher.fetch(self.base_url + '/terms')
+        self.assertFalse(first['from_cache'])
+
+        # A new fetcher (e.g. another worker) shares the disk cache
+        fetcher = URLFetcher(cache_dir=self.cache_dir)
+        second = fetcher.fetch(self.base_url + '/terms')
+        self.assertTrue(second['from_cache'])
+        self.assertEqual(second['content'], first['content'])
+        self.assertEqual(self.server.requests[-1][1].get('If-None-Match'), '"v1"')
+
+        fetcher.fetch(self.base_url + '/privacy')
+        privacy = fetcher.fetch(self.base_url + '/privacy')
+        self.assertTrue(privacy['from_cache'])
+        self.assertEqual(self.server.requests[-1][1].get('If-Modified-Since'), PolicyHandler.last_modified)
+        self.assertIn('never sell', extract_html_text(privacy['content'], privacy['encoding']))
+
+        # Without a cache every fetch is unconditional
+        URLFetcher().fetch(self.base_url + '/terms')
+        self.assertNotIn('If-None-Match', self.server.requests[-1][1])
+        print("✓ Cached pages are revalidated instead of re-downloaded")
+
+    def test_fetch_many_limits_per_host(self):
+        """Bulk fetches run concurrently, keep their order and respect the per-host limit"""
+        fetcher = URLFetcher(max_per_host=2, max_workers=8)
+        urls = [f'{self.base_url}/slow/{index}' for index in range(6)] + [self.base_url + '/missing']
+        pages = fetcher.fetch_many(urls)
+
+        self.assertEqual([page['url'] for page in pages], urls)
+        self.assertIn('Page 5', extract_html_text(pages[5]['content']))
+        self.assertIn('error', pages[-1])
+        self.assertEqual(self.server.peak, 2)
+        print("✓ Bulk fetches respect the per-host concurrency limit")
+
+    def test_fetch_many_reports_bad_urls(self):
+        """An entry that is not a URL string fails on its own without aborting the batch"""
+        fetcher = URLFetcher()
+        pages = fetcher.fetch_many([123, self.base_url + '/privacy', None])
+
+        self.assertEqual(pages[0], {'url': 123, 'error': 'URL must be a string, not int'})
+        self.assertIn('We never sell your data.', extract_html_text(pages[1]['content']))
+        self.assertIn('error', pages[2])
+        print("✓ Bad URLs are reported per entry")
+
+    def test_file_handler_urls(self):
+        """FileHandler extracts text from one or many URLs, with '' for failures"""
+        handler = FileHandler(url_fetcher=URLFetcher(cache_dir=self.cache_dir))
+        self.assertIn('non-refundable', handler.extract_from_url(self.base_url + '/terms'))
+        self.assertEqual(handler.extract_from_url(self.base_url + '/missing'), '')
+
+        texts = handler.extract_from_urls([self.base_url + '/privacy', self.base_url + '/missing'])
+        self.assertEqual(texts, ['We never sell your data.', ''])
+        print("✓ FileHandler extracts text from URLs")
+
+
+if __name__ == '__main__':
+    unittest.main()
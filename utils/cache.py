@@ -0,0 +1,230 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+class MemoryCache:
+    """In-process LRU cache tier"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk cache tier with TTL and size-based eviction"""
+
+    def __init__(self, path, ttl_seconds=None, max_entries=None, max_size_mb=None):
+        """
+        Args:
+            path (str): SQLite database file
+            ttl_seconds (float): Entries older than this are treated as missing
+            max_entries (int): Evict least recently used entries above this count
+            max_size_mb (float): Evict least recently used entries above this total size
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_size_mb = max_size_mb
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _connect(self):
+        """Open the database, reconnecting after a fork"""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value TEXT, size INTEGER, created REAL, accessed REAL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT value, created FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                conn.commit()
+                return None
+
+            conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+            conn.commit()
+        return json.loads(value)
+
+    def set(self, key, value):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, payload, len(payload), now, now)
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        """Drop expired entries, then least recently used ones until within limits"""
+        if self.ttl_seconds:
+            conn.execute('DELETE FROM entries WHERE created < ?', (now - self.ttl_seconds,))
+
+        if self.max_entries:
+            conn.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+        if self.max_size_mb:
+            limit = self.max_size_mb * 1024 * 1024
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            if total > limit:
+                for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed').fetchall():
+                    conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+                    total -= size
+                    if total <= limit:
+                        break
+
+    def __len__(self):
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+
+class SummaryCache:
+    """Content-addressed cache of summaries with an in-process tier and an optional disk tier"""
+
+    def __init__(self, max_entries=256, db_path=None, ttl_seconds=None, max_disk_entries=None,
+                 max_disk_mb=None):
+        """
+        Args:
+            max_entries (int): Entries kept in process memory
+            db_path (str): SQLite file for the shared disk tier (disabled if not set)
+            ttl_seconds (float): Lifetime of disk entries
+            max_disk_entries (int): Entry limit of the disk tier
+            max_disk_mb (float): Size limit of the disk tier
+        """
+        self.logger = logging.getLogger(__name__)
+        self.memory = MemoryCache(max_entries=max_entries)
+        self.disk = None
+        if db_path:
+            self.disk = SQLiteCache(
+                db_path,
+                ttl_seconds=ttl_seconds,
+                max_entries=max_disk_entries,
+                max_size_mb=max_disk_mb
+            )
+
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'sets': 0, 'errors': 0}
+
+    @staticmethod
+    def normalize(text):
+        """Normalize text so trivially different copies share a cache entry"""
+        text = unicodedata.normalize('NFC', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def make_key(self, text, **params):
+        """
+        Build a cache key from document text and everything that affects its summary
+
+        Args:
+            text (str): Document text
+            **params: Model type, lengths and generation settings
+
+        Returns:
+            str: Hex digest identifying the summary
+        """
+        digest = hashlib.sha256(self.normalize(text).encode('utf-8'))
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return a copy of the cached value, or None on a miss"""
+        value = self.memory.get(key)
+        tier = 'memory_hits'
+
+        if value is None and self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                self.logger.error(f"Cache read error: {str(e)}")
+                self._count('errors')
+            if value is not None:
+                self.memory.set(key, value)
+                tier = 'disk_hits'
+
+        if value is None:
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        self._count(tier)
+        return dict(value)
+
+    def set(self, key, value):
+        """Store a JSON-serializable value in every tier"""
+        self.memory.set(key, dict(value))
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                self.logger.error(f"Cache write error: {str(e)}")
+                self._count('errors')
+        self._count('sets')
+
+    def stats(self):
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0
+        stats['memory_entries'] = len(self.memory)
+        if self.disk is not None:
+            try:
+                stats['disk_entries'] = len(self.disk)
+            except sqlite3.Error:
+                stats['disk_entries'] = None
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
@@ -0,0 +1,272 @@
+import re
+import logging
+from functools import lru_cache
+
+# Section numbering: "1.2", "1.2.", "3." or "3)" followed by text
+NUMBERED_PATTERN = re.compile(r'(?P<number>\d{1,3}(?:\.\d{1,3})+\.?|\d{1,3}[.)])\s+(?P<rest>\S.*)')
+# "Section 4", "ARTICLE IV - Liability", "Clause 2.1: Fees"
+KEYWORD_PATTERN = re.compile(
+    r'(?P<keyword>section|article|clause|part)\s+(?P<number>\d{1,3}(?:\.\d{1,3})*|[ivxlc]{1,6})\b'
+    r'[.:)]?\s*(?:[-–—:]\s*)?(?P<rest>.*)',
+    re.IGNORECASE
+)
+# "IV. LIABILITY"
+ROMAN_PATTERN = re.compile(r'(?P<number>[IVXLC]{1,6})[.)]\s+(?P<rest>\S.*)')
+# "## Termination"
+MARKDOWN_PATTERN = re.compile(r'(?P<marks>#{1,6})\s+(?P<rest>\S.*)')
+# What follows a number that continues a sentence rather than starting a section:
+# "3.5 million users", "Section 4 of this Agreement", "clause 2, 3 and 5"
+CONTINUATION_PATTERN = re.compile(r'[a-z0-9%$€£,;]')
+# A short title at the start of a numbered paragraph: "5. Termination. We may..."
+INLINE_TITLE_PATTERN = re.compile(r'(?P<title>[A-Z][^.:;!?]{0,60})[.:]\s+(?P<body>\S.*)')
+LINE_PATTERN = re.compile(r'[^\n]*\n?')
+
+# Keywords that identify the clauses of a topic, matched as whole words; '*' marks a stem
+CLAUSE_TOPICS = {
+    'termination': ('terminat*', 'suspend*', 'suspension', 'cancel*', 'close your account', 'deactivat*'),
+    'data sharing': ('share', 'shares', 'shared', 'sharing', 'third part*', 'disclos*', 'sell', 'sells',
+                     'selling', 'sold', 'partner*', 'affiliate*'),
+    'privacy': ('privacy', 'personal data', 'personal information', 'cookie*', 'collect*'),
+    'liability': ('liabilit*', 'liable', 'damages', 'indemn*', 'warrant*'),
+    'payment': ('payment*', 'fee', 'fees', 'price*', 'pricing', 'billing', 'billed', 'subscription*',
+                'refund*', 'charge', 'charges', 'charged'),
+    'disputes': ('dispute*', 'arbitrat*', 'class action*', 'governing law', 'jurisdiction*', 'court', 'courts'),
+    'changes': ('change', 'changes', 'changed', 'modif*', 'amend*', 'update', 'updates', 'updated'),
+    'intellectual property': ('intellectual property', 'copyright*', 'trademark*', 'licen*'),
+    'account': ('account', 'accounts', 'registration', 'register*', 'password*', 'eligib*'),
+}
+
+
+@lru_cache(maxsize=256)
+def keyword_pattern(keywords):
+    """
+    Compile keywords into one case-insensitive pattern of whole words
+
+    A keyword ending in '*' is a stem and matches any word it starts
+    ("terminat*" matches "termination"); other keywords match only the
+    exact word or phrase, so "fee" does not match "feedback".
+    """
+    alternatives = []
+    for keyword in keywords:
+        words = re.escape(keyword.rstrip('*')).replace(r'\ ', r'\s+')
+        alternatives.append(words + (r'\w*' if keyword.endswith('*') else r'\b'))
+    return re.compile(r'\b(?:' + '|'.join(alternatives) + ')', re.IGNORECASE)
+
+
+class ClauseIndex:
+    """
+    Clauses of one document with their character offsets
+
+    Each clause is a dict with 'id', 'number' (e.g. '4.2', or None), 'title',
+    'level' (1 for top-level sections), 'parent' (id of the enclosing
+    clause, or None), 'start' and 'end' (offsets of the whole clause,
+    heading included) and 'body_start' (where the text after the heading
+    begins).
+    """
+
+    def __init__(self, text, clauses):
+        self.text = text
+        self.clauses = clauses
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def clause_text(self, clause):
+        """Text of a clause without its heading"""
+        return self.text[clause['body_start']:clause['end']].strip()
+
+    def find(self, topics, min_body_hits=2):
+        """
+        Find the clauses about some topics
+
+        A topic is a name from CLAUSE_TOPICS or free text whose words are
+        used as keywords. Clauses whose heading (or an enclosing heading)
+        mentions a topic win; only when no heading does, clauses whose text
+        mentions the topic at least min_body_hits times are returned.
+
+        Args:
+            topics (list): Topic names or phrases
+            min_body_hits (int): Keyword occurrences needed for a match on the text alone
+
+        Returns:
+            list: Matching clauses in document order, each with the 'topics' it matched
+        """
+        matches = {}
+        for topic in topics:
+            keywords = self.topic_keywords(topic)
+            if not keywords:
+                continue
+            pattern = keyword_pattern(keywords)
+
+            by_title = [clause for clause in self.clauses if self._mentions(self._heading_path(clause), pattern)]
+            if not by_title:
+                by_title = [
+                    clause for clause in self.clauses
+                    if self._mentions(self.clause_text(clause), pattern) >= min_body_hits
+                ]
+            for clause in by_title:
+                matches.setdefault(clause['id'], []).append(topic)
+
+        return [dict(self.clauses[clause_id], topics=matched) for clause_id, matched in sorted(matches.items())]
+
+    def to_list(self):
+        """Clauses without their text, for API responses"""
+        return [dict(clause) for clause in self.clauses]
+
+    @staticmethod
+    def topic_keywords(topic):
+        """Keywords of a known topic, or the words of a free-text topic (as stems)"""
+        topic = topic.strip().lower()
+        if topic in CLAUSE_TOPICS:
+            return CLAUSE_TOPICS[topic]
+        return tuple(word + '*' for word in re.findall(r'\w+', topic) if len(word) > 2)
+
+    def _heading_path(self, clause):
+        """Titles of a clause and the clauses enclosing it"""
+        titles = []
+        while clause is not None:
+            titles.append(clause['title'])
+            clause = self.clauses[clause['parent']] if clause['parent'] is not None else None
+        return ' '.join(titles)
+
+    @staticmethod
+    def _mentions(text, pattern):
+        """Number of keyword occurrences in text"""
+        return len(pattern.findall(text))
+
+
+class ClauseSegmenter:
+    """
+    Split legal text into clauses at its headings and section numbers
+
+    Works on the raw text, before preprocessing joins its lines: a clause
+    starts at a line with section numbering ("4.2", "Section 4",
+    "IV."), a markdown heading, or a short all-caps or title-case line.
+    """
+
+    def __init__(self, max_heading_words=12):
+        """
+        Args:
+            max_heading_words (int): Longer lines are never unnumbered headings
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_heading_words = max_heading_words
+
+    def segment(self, text):
+        """
+        Build the clause index of a document
+
+        Args:
+            text (str): Raw document text
+
+        Returns:
+            ClauseIndex: Clauses in document order; text before the first
+                heading forms an untitled clause
+        """
+        clauses = []
+        for match in LINE_PATTERN.finditer(text):
+            line = match.group()
+            if not line:
+                break
+            heading = self._heading(line.strip())
+            if heading is not None:
+                number, title, level, title_end = heading
+                indent = len(line) - len(line.lstrip())
+                clauses.append({
+                    'number': number,
+                    'title': title,
+                    'level': level,
+                    'start': match.start(),
+                    # A numbered paragraph's text starts on the heading line itself
+                    'body_start': match.start() + indent + title_end if title_end is not None else match.end(),
+                    'markdown': line.lstrip().startswith('#'),
+                })
+
+        # Markdown levels count from the document's top heading level ('##' may be the top)
+        markdown_levels = [clause['level'] for clause in clauses if clause['markdown']]
+        for clause in clauses:
+            if clause['markdown']:
+                clause['level'] -= min(markdown_levels) - 1
+
+        if not clauses or text[:clauses[0]['start']].strip():
+            clauses.insert(0, {'number': None, 'title': '', 'level': 1, 'start': 0, 'body_start': 0,
+                               'markdown': False})
+
+        for index, clause in enumerate(clauses):
+            clause['id'] = index
+            clause['end'] = clauses[index + 1]['start'] if index + 1 < len(clauses) else len(text)
+            clause['parent'] = None
+            for previous in reversed(clauses[:index]):
+                if previous['level'] < clause['level']:
+                    clause['parent'] = previous['id']
+                    break
+
+        keys = ('id', 'number', 'title', 'level', 'parent', 'start', 'end', 'body_start')
+        return ClauseIndex(text, [{key: clause[key] for key in keys} for clause in clauses])
+
+    def _heading(self, line):
+        """
+        Recognize a heading line
+
+        Returns:
+            tuple: (number, title, level, title_end) or None, where title_end is the
+                offset in the line where a numbered paragraph's own text starts
+                (None when the whole line is the heading)
+        """
+        if not line:
+            return None
+
+        match = KEYWORD_PATTERN.fullmatch(line)
+        if match:
+            number = match.group('number')
+            keyword = match.group('keyword').lower()
+            level = 1 if keyword in ('article', 'part') else number.count('.') + 1
+            return self._numbered(number, level, match.group('rest'), match.start('rest'))
+
+        match = NUMBERED_PATTERN.fullmatch(line)
+        if match:
+            number = match.group('number').rstrip('.)')
+            return self._numbered(number, number.count('.') + 1, match.group('rest'), match.start('rest'))
+
+        match = ROMAN_PATTERN.fullmatch(line)
+        if match and self._is_title(match.group('rest')):
+            return match.group('number'), match.group('rest').strip(), 1, None
+
+        match = MARKDOWN_PATTERN.fullmatch(line)
+        if match:
+            return None, match.group('rest').strip(' #'), len(match.group('marks')), None
+
+        if self._is_title(line):
+            return None, line.rstrip(':'), 1, None
+        return None
+
+    def _numbered(self, number, level, rest, rest_start):
+        """Heading of a numbered line: a title alone, or a numbered paragraph"""
+        rest = rest.strip()
+        if rest and CONTINUATION_PATTERN.match(rest):
+            # The number is part of a sentence, not a section number
+            return None
+        if not rest or self._is_title(rest, numbered=True):
+            return number, rest.rstrip(':'), level, None
+
+        match = INLINE_TITLE_PATTERN.fullmatch(rest)
+        if match and len(match.group('title').split()) <= 6:
+            return number, match.group('title'), level, rest_start + match.start('body')
+        return number, '', level, rest_start
+
+    def _is_title(self, line, numbered=False):
+        """Whether a line reads as a heading rather than a sentence"""
+        words = line.rstrip(':').split()
+        if not words or len(words) > self.max_heading_words or line[-1] in '.;,!?':
+            return False
+        letters = [char for char in line if char.isalpha()]
+        if not letters:
+            return False
+        if line.isupper():
+            return len(letters) >= 3
+        # Title case: every word longer than three letters is capitalized
+        significant = [word for word in words if len(word) > 3]
+        if not significant or not all(word[0].isupper() for word in significant):
+            return False
+        # Unnumbered title-case lines must be short to tell them from sentence fragments
+        return numbered or len(words) <= 8
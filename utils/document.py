@@ -0,0 +1,126 @@
+import re
+
+import nltk
+import numpy as np
+
+# Whitespace-delimited words, so counts match str.split()
+WORD_PATTERN = re.compile(r'\S+')
+# Characters stripped from a word before it becomes a vocabulary term
+TERM_PUNCTUATION = '.,!?;:"()[]\'-'
+
+_sentence_splitter = None
+
+def get_sentence_splitter():
+    """Return a shared Punkt sentence splitter, or None if its data is not installed"""
+    global _sentence_splitter
+    if _sentence_splitter is None:
+        try:
+            from nltk.tokenize import PunktTokenizer
+            _sentence_splitter = PunktTokenizer()
+        except ImportError:
+            try:
+                _sentence_splitter = nltk.data.load('tokenizers/punkt/english.pickle')
+            except LookupError:
+                _sentence_splitter = False
+        except LookupError:
+            _sentence_splitter = False
+    return _sentence_splitter or None
+
+def sentence_spans(text):
+    """Return (start, end) character offsets of each sentence in text"""
+    global _sentence_splitter
+    splitter = get_sentence_splitter()
+    if splitter is not None:
+        try:
+            return list(splitter.span_tokenize(text))
+        except LookupError:
+            _sentence_splitter = False
+    return [match.span() for match in re.finditer(r'[^.!?]+(?:[.!?]+|$)', text) if match.group().strip()]
+
+
+class Document:
+    """
+    Text split once into sentences and words, shared by every pipeline stage
+
+    Offsets and term ids are kept in NumPy arrays rather than lists of
+    strings; sentence and word strings are sliced from the text on demand.
+
+    Attributes:
+        text (str): Document text
+        sentence_spans (ndarray): (start, end) character offsets per sentence
+        word_spans (ndarray): (start, end) character offsets per word
+        sentence_words (ndarray): (first, last + 1) word index range per sentence
+        term_ids (ndarray): Lowercase vocabulary id per word, -1 for punctuation
+        vocabulary (dict): Term to id mapping
+    """
+
+    def __init__(self, text, spans=None, vocabulary=None):
+        """
+        Args:
+            text (str): Document text
+            spans (list): Sentence offsets if already known (e.g. from preprocessing)
+            vocabulary (dict): Term ids to extend, for documents scored together
+        """
+        self.text = text
+        if spans is None:
+            spans = sentence_spans(text)
+        self.sentence_spans = np.array(spans, dtype=np.int64).reshape(-1, 2)
+        self.vocabulary = {} if vocabulary is None else vocabulary
+
+        word_spans = []
+        term_ids = []
+        vocabulary = self.vocabulary
+        for match in WORD_PATTERN.finditer(text):
+            word_spans.append(match.span())
+            term = match.group().strip(TERM_PUNCTUATION).lower()
+            term_ids.append(vocabulary.setdefault(term, len(vocabulary)) if term else -1)
+
+        self.word_spans = np.array(word_spans, dtype=np.int64).reshape(-1, 2)
+        self.term_ids = np.array(term_ids, dtype=np.int32)
+        self.sentence_words = np.stack([
+            np.searchsorted(self.word_spans[:, 0], self.sentence_spans[:, 0], side='left'),
+            np.searchsorted(self.word_spans[:, 0], self.sentence_spans[:, 1], side='left'),
+        ], axis=1)
+
+    @property
+    def word_count(self):
+        return len(self.word_spans)
+
+    @property
+    def sentence_count(self):
+        return len(self.sentence_spans)
+
+    def sentence(self, index):
+        """Return the text of one sentence"""
+        start, end = self.sentence_spans[index]
+        return self.text[start:end]
+
+    def sentences(self):
+        """Return the text of every sentence"""
+        text = self.text
+        return [text[start:end] for start, end in self.sentence_spans.tolist()]
+
+    def sentence_term_ids(self, index):
+        """Return the term ids of one sentence's words (a view, not a copy)"""
+        first, last = self.sentence_words[index]
+        return self.term_ids[first:last]
+
+    def word_sentences(self):
+        """Return the sentence index of each word, -1 for words outside every sentence"""
+        words = np.arange(self.word_count)
+        index = np.searchsorted(self.sentence_words[:, 1], words, side='right')
+        inside = index < self.sentence_count
+        inside[inside] = words[inside] >= self.sentence_words[index[inside], 0]
+        return np.where(inside, index, -1)
+
+    def terms(self):
+        """Return vocabulary terms indexed by id"""
+        terms = [None] * len(self.vocabulary)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+        return terms
+
+    def term_counts(self):
+        """Return how often each vocabulary term occurs, indexed by id"""
+        ids = self.term_ids[self.term_ids >= 0]
+        return np.bincount(ids, minlength=len(self.vocabulary))
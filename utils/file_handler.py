@@ -1,16 +1,168 @@
 import os
+import re
+import mmap
+import uuid
+import codecs
+import shutil
 import requests
-from bs4 import BeautifulSoup
+import zipfile
+import atexit
 import PyPDF2
-from docx import Document
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+
+from utils.url_fetcher import URLFetcher, extract_html_text
+
+# Byte order marks, longest first so UTF-32 is not mistaken for UTF-16
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+# Bytes read from the start of a text file to detect its encoding
+ENCODING_SAMPLE_BYTES = 64 * 1024
+# Bytes decoded at a time when streaming text files and uploads
+TEXT_BLOCK_BYTES = 1024 * 1024
+
+# WordprocessingML element names
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+# Markup compatibility: text boxes are stored twice, as an mc:Choice and an mc:Fallback
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+# Elements that only wrap blocks (content controls, custom XML) and are looked through
+DOCX_BLOCK_WRAPPERS = (W + 'sdt', W + 'sdtContent', W + 'customXml')
+DOCX_HEADER_PART = re.compile(r'word/header(\d*)\.xml')
+DOCX_FOOTER_PART = re.compile(r'word/footer(\d*)\.xml')
+
+# Extraction worker pools shared by every FileHandler in the process, keyed by size
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = None
+
+def get_extraction_pool(workers):
+    """
+    Return the shared pool of extraction worker processes, created on first use
+    
+    Workers are spawned rather than forked: the server runs model, scheduler
+    and job threads, and a forked child could inherit a lock one of them held
+    at the time of the fork. The pool is kept for the life of the process,
+    so requests do not pay for starting workers.
+    
+    Args:
+        workers (int): Worker processes in the pool
+        
+    Returns:
+        ProcessPoolExecutor: Pool with a spawn start method
+    """
+    global _pools_pid
+    with _pools_lock:
+        # Pools inherited through a fork belong to the parent
+        if _pools_pid != os.getpid():
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pools[workers]
+
+def shutdown_extraction_pools():
+    """Stop the shared extraction workers of this process"""
+    with _pools_lock:
+        if _pools_pid == os.getpid():
+            for pool in _pools.values():
+                pool.shutdown(wait=True, cancel_futures=True)
+        _pools.clear()
+
+atexit.register(shutdown_extraction_pools)
+
+def _extract_pdf_page_range(filepath, start, end):
+    """Extract text of pages [start, end) in a worker process"""
+    with open(filepath, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[page_num].extract_text() or "" for page_num in range(start, end)]
+
+def _extract_file_text(filepath, max_pdf_pages):
+    """Extract the text of one file in a worker process"""
+    return FileHandler(pdf_workers=1, max_pdf_pages=max_pdf_pages).extract_text(filepath)
+
+def _docx_paragraph_text(paragraph):
+    """Text of a w:p element, with run tabs and line breaks, as python-docx renders it"""
+    parts = []
+    _docx_text_parts(paragraph, parts)
+    return ''.join(parts)
+
+def _docx_text_parts(element, parts):
+    """Collect the text under an element; text box paragraphs start on a new line"""
+    for child in element:
+        if child.tag == W + 't':
+            parts.append(child.text or '')
+        elif child.tag in (W + 'tab', W + 'br', W + 'cr'):
+            # Tab stops in paragraph properties are also w:tab
+            if element.tag == W + 'r':
+                parts.append('\t' if child.tag == W + 'tab' else '\n')
+        elif child.tag == MC_FALLBACK:
+            # The same text box as the mc:Choice next to it
+            continue
+        elif child.tag == W + 'p':
+            parts.append('\n')
+            _docx_text_parts(child, parts)
+        elif isinstance(child.tag, str):
+            _docx_text_parts(child, parts)
+
+def _docx_blocks(element, tags):
+    """Direct children of an element with the given tags, looking through wrapper elements"""
+    for child in element:
+        if child.tag in tags:
+            yield child
+        elif child.tag in DOCX_BLOCK_WRAPPERS:
+            yield from _docx_blocks(child, tags)
+
+def _docx_row_text(row):
+    """Text of a w:tr element: its cells separated by tabs"""
+    cells = []
+    for cell in _docx_blocks(row, (W + 'tc',)):
+        cells.append(_docx_cell_text(cell))
+    return '\t'.join(cell for cell in cells if cell)
+
+def _docx_cell_text(cell):
+    """Text of a w:tc element: its own paragraphs, then nested tables row by row"""
+    parts = []
+    for block in _docx_blocks(cell, (W + 'p', W + 'tbl')):
+        if block.tag == W + 'p':
+            parts.append(_docx_paragraph_text(block))
+        else:
+            parts.extend(_docx_row_text(row) for row in _docx_blocks(block, (W + 'tr',)))
+    # A row is one line, so line breaks inside a cell become spaces
+    return ' '.join(line.strip() for part in parts for line in part.split('\n') if line.strip())
 
 class FileHandler:
     """Handle file uploads and text extraction from various sources"""
     
-    def __init__(self):
+    def __init__(self, pdf_workers=None, max_pdf_pages=None, parallel_pdf_threshold=32,
+                 pdf_pages_per_task=8, url_fetcher=None):
+        """
+        Args:
+            pdf_workers (int): Processes used to extract large PDFs (default: up to 4)
+            max_pdf_pages (int): Only extract this many pages of each PDF (default: all)
+            parallel_pdf_threshold (int): Smaller PDFs are extracted in-process
+            pdf_pages_per_task (int): Pages extracted by a worker per task
+            url_fetcher (URLFetcher): Fetches web pages (default: pooled, without a cache)
+        """
         self.logger = logging.getLogger(__name__)
         self.allowed_extensions = {'txt', 'pdf', 'doc', 'docx'}
+        if pdf_workers is None:
+            pdf_workers = min(4, os.cpu_count() or 1)
+        self.pdf_workers = pdf_workers
+        self.max_pdf_pages = max_pdf_pages
+        self.parallel_pdf_threshold = parallel_pdf_threshold
+        self.pdf_pages_per_task = pdf_pages_per_task
+        self.url_fetcher = url_fetcher or URLFetcher()
     
     def allowed_file(self, filename):
         """Check if file extension is allowed"""
@@ -43,48 +195,269 @@ class FileHandler:
             self.logger.error(f"Error extracting text from {filepath}: {str(e)}")
             return ""
     
-    def _extract_from_txt(self, filepath):
-        """Extract text from TXT file"""
+    def iter_text(self, filepath):
+        """
+        Yield the text of a file in blocks, so large files need not be held in memory at once
+        
+        Args:
+            filepath (str): Path to a txt, pdf or docx file
+            
+        Yields:
+            str: Consecutive pieces of the file's text
+        """
+        file_extension = filepath.rsplit('.', 1)[-1].lower()
+        if file_extension == 'txt':
+            yield from self._iter_txt(filepath)
+        elif file_extension == 'pdf':
+            for page_text in self.iter_pdf_pages(filepath, max_pages=self.max_pdf_pages):
+                yield page_text + "\n"
+        elif file_extension in ['doc', 'docx']:
+            for paragraph in self.iter_docx_paragraphs(filepath):
+                yield paragraph + "\n"
+        else:
+            raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    def extract_many(self, filepaths, workers=None):
+        """
+        Extract the text of many files on the shared extraction worker pool
+        
+        Only a few files are in flight at once, so results can be consumed
+        as they arrive without holding every extracted text in memory.
+        
+        Args:
+            filepaths (iterable): Paths of txt, pdf or docx files
+            workers (int): Worker processes (default: pdf_workers)
+            
+        Yields:
+            tuple: (filepath, extracted text) in input order ("" for files that failed)
+        """
+        filepaths = list(filepaths)
+        workers = workers or self.pdf_workers
+        if workers <= 1 or len(filepaths) < 2 or multiprocessing.current_process().daemon:
+            for filepath in filepaths:
+                yield filepath, self.extract_text(filepath)
+            return
+        
+        window = workers * 2
+        executor = get_extraction_pool(workers)
+        pending = []
+        try:
+            next_file = 0
+            while next_file < len(filepaths) or pending:
+                while next_file < len(filepaths) and len(pending) < window:
+                    filepath = filepaths[next_file]
+                    pending.append((filepath, executor.submit(_extract_file_text, filepath, self.max_pdf_pages)))
+                    next_file += 1
+                
+                filepath, future = pending.pop(0)
+                yield filepath, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+    
+    def save_upload(self, stream, directory, extension):
+        """
+        Copy an uploaded file to disk in fixed-size chunks
+        
+        Args:
+            stream (file): Readable binary stream of the upload
+            directory (str): Upload directory
+            extension (str): File extension, which selects the extractor
+            
+        Returns:
+            str: Path of the saved file, unique per upload
+        """
+        filepath = os.path.join(directory, f"{uuid.uuid4().hex}.{extension.lower()}")
+        with open(filepath, 'wb') as file:
+            shutil.copyfileobj(stream, file, TEXT_BLOCK_BYTES)
+        return filepath
+    
+    def detect_encoding(self, sample):
+        """
+        Guess the encoding of a text file from its first bytes
+        
+        Args:
+            sample (bytes): Start of the file
+            
+        Returns:
+            str: Codec name
+        """
+        for bom, encoding in BOMS:
+            if sample.startswith(bom):
+                return encoding
+        
         try:
-            with open(filepath, 'r', encoding='utf-8') as file:
-                return file.read()
+            # The sample may end inside a multi-byte character
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return 'utf-8'
         except UnicodeDecodeError:
-            # Try with different encoding
-            with open(filepath, 'r', encoding='latin-1') as file:
-                return file.read()
+            pass
+        
+        try:
+            from charset_normalizer import from_bytes
+        except ImportError:
+            return 'latin-1'
+        match = from_bytes(sample).best()
+        return match.encoding if match else 'latin-1'
+    
+    def _iter_txt(self, filepath, block_size=TEXT_BLOCK_BYTES):
+        """Decode a text file block by block from a memory map"""
+        with open(filepath, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                encoding = self.detect_encoding(mapped[:ENCODING_SAMPLE_BYTES])
+                # Bytes the sample did not cover are replaced rather than failing the whole file
+                decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+                for start in range(0, len(mapped), block_size):
+                    text = decoder.decode(mapped[start:start + block_size])
+                    if text:
+                        yield text
+                text = decoder.decode(b'', final=True)
+                if text:
+                    yield text
+    
+    def _extract_from_txt(self, filepath):
+        """Extract text from TXT file"""
+        return ''.join(self._iter_txt(filepath))
     
     def _extract_from_pdf(self, filepath):
         """Extract text from PDF file"""
         try:
-            text = ""
-            with open(filepath, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
-            
-            return text.strip()
+            # Pages are joined once instead of growing a string page by page
+            return "\n".join(self.iter_pdf_pages(filepath, max_pages=self.max_pdf_pages)).strip()
             
         except Exception as e:
             self.logger.error(f"Error reading PDF: {str(e)}")
             return ""
     
+    def iter_pdf_pages(self, filepath, start_page=0, max_pages=None):
+        """
+        Yield the text of each PDF page in order, as soon as it is extracted
+        
+        Large files are split into page ranges extracted in parallel worker
+        processes; only a few ranges are in flight at once, so memory stays
+        bounded regardless of document size.
+        
+        Args:
+            filepath (str): Path to the PDF file
+            start_page (int): First page to extract (zero-based)
+            max_pages (int): Maximum number of pages to extract
+            
+        Yields:
+            str: Text of one page
+        """
+        with open(filepath, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            end_page = len(pdf_reader.pages)
+            if max_pages is not None:
+                end_page = min(end_page, start_page + max_pages)
+            
+            # Daemonic processes (e.g. CLI pool workers) cannot start their own workers
+            parallel = (
+                self.pdf_workers > 1
+                and end_page - start_page >= self.parallel_pdf_threshold
+                and not multiprocessing.current_process().daemon
+            )
+            if not parallel:
+                for page_num in range(start_page, end_page):
+                    yield pdf_reader.pages[page_num].extract_text() or ""
+                return
+        
+        ranges = [
+            (start, min(start + self.pdf_pages_per_task, end_page))
+            for start in range(start_page, end_page, self.pdf_pages_per_task)
+        ]
+        window = self.pdf_workers * 2
+        executor = get_extraction_pool(self.pdf_workers)
+        pending = []
+        try:
+            next_range = 0
+            while next_range < len(ranges) or pending:
+                while next_range < len(ranges) and len(pending) < window:
+                    start, end = ranges[next_range]
+                    pending.append(executor.submit(_extract_pdf_page_range, filepath, start, end))
+                    next_range += 1
+                
+                for page_text in pending.pop(0).result():
+                    yield page_text
+        finally:
+            # A reader that stops early leaves no work queued on the shared pool
+            for future in pending:
+                future.cancel()
+    
     def _extract_from_docx(self, filepath):
         """Extract text from DOCX file"""
         try:
-            doc = Document(filepath)
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            return text.strip()
+            return "\n".join(self.iter_docx_paragraphs(filepath)).strip()
             
         except Exception as e:
             self.logger.error(f"Error reading DOCX: {str(e)}")
             return ""
     
+    def iter_docx_paragraphs(self, filepath):
+        """
+        Yield the paragraphs and table rows of a DOCX file in document order
+        
+        The XML parts are parsed incrementally and each block is discarded
+        once yielded, so memory does not grow with the size of the document.
+        Headers come first and footers last; each table row is yielded as
+        one line with its cells separated by tabs.
+        
+        Args:
+            filepath (str): Path to the DOCX file
+            
+        Yields:
+            str: Text of one paragraph or table row
+        """
+        with zipfile.ZipFile(filepath) as archive:
+            names = archive.namelist()
+            
+            def numbered(pattern):
+                matches = [pattern.fullmatch(name) for name in names]
+                return [match.group(0) for match in sorted(
+                    (match for match in matches if match), key=lambda match: int(match.group(1) or 0)
+                )]
+            
+            for part in numbered(DOCX_HEADER_PART) + ['word/document.xml'] + numbered(DOCX_FOOTER_PART):
+                if part in names:
+                    with archive.open(part) as xml:
+                        yield from self._iter_docx_part(xml)
+    
+    def _iter_docx_part(self, xml):
+        """Stream the blocks of one WordprocessingML part"""
+        open_tables = 0
+        open_paragraphs = 0
+        
+        for event, element in etree.iterparse(xml, events=('start', 'end'),
+                                              tag=(W + 'p', W + 'tbl', W + 'tr')):
+            if event == 'start':
+                if element.tag == W + 'tbl':
+                    open_tables += 1
+                elif element.tag == W + 'p':
+                    open_paragraphs += 1
+                continue
+            
+            if element.tag == W + 'p':
+                open_paragraphs -= 1
+                # Paragraphs in tables belong to their row; text boxes belong to their paragraph
+                if open_tables or open_paragraphs:
+                    continue
+                yield _docx_paragraph_text(element)
+            elif element.tag == W + 'tr':
+                if open_tables != 1 or open_paragraphs:
+                    continue
+                yield _docx_row_text(element)
+            else:
+                open_tables -= 1
+                if open_tables or open_paragraphs:
+                    continue
+            
+            # Drop what has been yielded so the tree never holds more than one block
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    
     def extract_from_url(self, url):
         """
         Extract text content from a web URL
@@ -96,50 +469,8 @@ class FileHandler:
             str: Extracted text content
         """
         try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            # Make request with headers to avoid blocking
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Extract text from specific elements that usually contain main content
-            content_selectors = [
-                'article', 'main', '.content', '.post-content', 
-                '.entry-content', '.article-content', '#content'
-            ]
-            
-            text = ""
-            for selector in content_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    for element in elements:
-                        text += element.get_text(separator=' ', strip=True) + "\n"
-                    break
-            
-            # If no specific content found, extract from body
-            if not text.strip():
-                body = soup.find('body')
-                if body:
-                    text = body.get_text(separator=' ', strip=True)
-            
-            # Clean up the text
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            text = '\n'.join(lines)
-            
-            return text
+            page = self.url_fetcher.fetch(url)
+            return extract_html_text(page['content'], page['encoding'])
             
         except requests.RequestException as e:
             self.logger.error(f"Error fetching URL {url}: {str(e)}")
@@ -147,3 +478,25 @@ class FileHandler:
         except Exception as e:
             self.logger.error(f"Error processing URL content: {str(e)}")
             return ""
+    
+    def extract_from_urls(self, urls):
+        """
+        Extract text content from many web URLs concurrently
+        
+        Args:
+            urls (list): URLs to extract text from
+            
+        Returns:
+            list: Extracted text per URL, in order ("" for pages that failed)
+        """
+        texts = []
+        for page in self.url_fetcher.fetch_many(urls):
+            if 'error' in page:
+                texts.append("")
+                continue
+            try:
+                texts.append(extract_html_text(page['content'], page['encoding']))
+            except Exception as e:
+                self.logger.error(f"Error processing URL content from {page['url']}: {str(e)}")
+                texts.append("")
+        return texts
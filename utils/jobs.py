@@ -0,0 +1,183 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """State and progress events of one background summarization"""
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = 'queued'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self.progress = {}
+
+    @property
+    def done(self):
+        return self.status in ('completed', 'failed')
+
+    def to_dict(self):
+        """Snapshot of the job for the status endpoint"""
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+        if self.status == 'completed':
+            data['result'] = self.result
+        if self.status == 'failed':
+            data['error'] = self.error
+        return data
+
+
+class JobManager:
+    """Run summarizations on a local worker pool and record their progress"""
+
+    def __init__(self, max_workers=2, max_finished_jobs=200, retention_seconds=3600):
+        """
+        Args:
+            max_workers (int): Jobs processed concurrently
+            max_finished_jobs (int): Finished jobs kept for status queries
+            retention_seconds (float): How long finished jobs are kept
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self.retention_seconds = retention_seconds
+
+        self._jobs = OrderedDict()
+        self._condition = threading.Condition()
+        self._executor = None
+        self._pid = None
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue work for the pool
+
+        Args:
+            func (callable): Called with the given arguments plus a progress_callback
+                that accepts an event dict
+
+        Returns:
+            str: Job id
+        """
+        job = Job(uuid.uuid4().hex)
+        with self._condition:
+            self._prune()
+            self._jobs[job.id] = job
+
+        self._get_executor().submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        """Return a job snapshot, or None for unknown jobs"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def iter_events(self, job_id, start=0, heartbeat=15.0):
+        """
+        Yield progress events as they are recorded, until the job finishes
+
+        Args:
+            job_id (str): Job to follow
+            start (int): Index of the first event to yield (for resuming a stream)
+            heartbeat (float): Seconds of silence after which None is yielded
+
+        Yields:
+            tuple: (event index, event dict), or None as a keep-alive
+        """
+        index = start
+        while True:
+            with self._condition:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                if index >= len(job.events) and not job.done:
+                    self._condition.wait(timeout=heartbeat)
+                pending = job.events[index:]
+                done = job.done
+
+            if not pending and not done:
+                yield None
+            for event in pending:
+                yield index, event
+                index += 1
+            if done and not pending:
+                return
+
+    def stats(self):
+        """Return job counts by status"""
+        with self._condition:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def _run(self, job, func, args, kwargs):
+        """Execute one job and record its outcome"""
+        with self._condition:
+            job.status = 'running'
+            job.started = time.time()
+            self._record(job, {'type': 'started'})
+
+        def progress_callback(event):
+            with self._condition:
+                if event.get('type') == 'chunks':
+                    job.progress = {'total_chunks': event['total'], 'completed_chunks': 0}
+                elif event.get('type') == 'chunk' and job.progress:
+                    job.progress['completed_chunks'] += 1
+                self._record(job, event)
+
+        try:
+            result = func(*args, progress_callback=progress_callback, **kwargs)
+            with self._condition:
+                job.result = result
+                job.status = 'completed'
+                job.finished = time.time()
+                self._record(job, {'type': 'completed', 'result': result})
+        except Exception as e:
+            self.logger.error(f"Job {job.id} failed: {str(e)}")
+            with self._condition:
+                job.error = str(e)
+                job.status = 'failed'
+                job.finished = time.time()
+                self._record(job, {'type': 'failed', 'error': str(e)})
+
+    def _record(self, job, event):
+        """Append an event and wake stream readers (caller holds the condition)"""
+        job.events.append(event)
+        self._condition.notify_all()
+
+    def _prune(self):
+        """Forget old finished jobs (caller holds the condition)"""
+        cutoff = time.time() - self.retention_seconds
+        finished = [job for job in self._jobs.values() if job.done]
+        excess = len(finished) - self.max_finished_jobs
+        for job in finished:
+            if excess > 0 or job.finished < cutoff:
+                del self._jobs[job.id]
+                excess -= 1
+
+    def _get_executor(self):
+        """Create the worker pool lazily, and again after a fork"""
+        with self._condition:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='summary-job'
+                )
+                self._pid = os.getpid()
+            return self._executor
@@ -0,0 +1,62 @@
+import gc
+import os
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Thread pools sized by these variables are created when the libraries load
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+def worker_threads(workers, cpu_count=None):
+    """
+    Intra-op threads per worker so that all workers together use each core once
+
+    Args:
+        workers (int): Worker processes sharing the machine
+        cpu_count (int): Cores available (default: os.cpu_count())
+
+    Returns:
+        int: Threads per worker, at least 1
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, int(workers)))
+
+
+def set_thread_env(threads):
+    """Size the OpenMP/BLAS pools of libraries that are not imported yet; explicit settings win"""
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+
+
+def limit_threads(threads):
+    """
+    Set the intra-op thread count of an already imported torch
+
+    Called in each worker after fork, so N workers do not each start a
+    pool as large as the machine.
+
+    Args:
+        threads (int): Intra-op threads for this process
+    """
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(threads)
+    logger.info(f"Process {os.getpid()} uses {threads} inference thread(s)")
+
+
+def freeze_shared_state():
+    """
+    Move every object allocated so far out of the garbage collector's reach
+
+    Called in the master once models are loaded: forked workers then share
+    those pages copy-on-write, and collections in the workers no longer
+    touch (and so copy) them.
+
+    Returns:
+        int: Objects frozen
+    """
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
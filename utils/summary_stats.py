@@ -0,0 +1,31 @@
+def summary_statistics(text_content, summary_data, model_type):
+    """
+    Build the result fields shared by the web app, the JSON API and the CLI
+    
+    Args:
+        text_content (str): Original document text
+        summary_data (dict): Output of TextSummarizer.summarize_document (its
+            original_word_count is used when present)
+        model_type (str): Model the summary was generated with
+    
+    Returns:
+        dict: Summary, key points, word counts and timing
+    """
+    original_word_count = summary_data.get('original_word_count') or len(text_content.split())
+    summary_word_count = len(summary_data['summary'].split())
+    compression_ratio = round((1 - summary_word_count / original_word_count) * 100, 1)
+    
+    return {
+        'summary': summary_data['summary'],
+        'key_points': summary_data.get('key_points', []),
+        'key_point_details': summary_data.get('key_point_details', []),
+        'original_word_count': original_word_count,
+        'summary_word_count': summary_word_count,
+        'compression_ratio': compression_ratio,
+        'model_used': model_type.upper(),
+        'profile': summary_data.get('profile'),
+        'processing_time': summary_data.get('processing_time', 0),
+        'cached': summary_data.get('cached', False),
+        'degraded': summary_data.get('degraded', False),
+        'timings': summary_data.get('timings', {})
+    }
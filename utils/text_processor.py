@@ -4,6 +4,35 @@ from nltk.corpus import stopwords
 from nltk.tokenize import sent_tokenize, word_tokenize
 import string
 
+from utils.document import Document, sentence_spans
+
+# Patterns are compiled once at import instead of on every preprocess call
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+# Anchored to word starts so the scan does not retry from every character of a word
+EMAIL_PATTERN = re.compile(r'(?<!\S)\S+@\S+')
+REPEATED_PUNCTUATION_PATTERN = re.compile(r'([.!?])\1+')
+# Disallowed characters and whitespace collapse to a single space in one pass
+SEPARATOR_PATTERN = re.compile(r'[^\w.,!?;:()"\'-]+')
+PUNCTUATION_SPACING_PATTERN = re.compile(r' ?([.,!?;:]) ?')
+# End of a sentence followed by whitespace, where streamed text can be cut into segments
+SENTENCE_BREAK_PATTERN = re.compile(r'[.!?]["\')\]]*\s+')
+
+# Characters of raw text preprocessed at a time by preprocess_stream
+SEGMENT_CHARS = 256 * 1024
+
+# Typographic characters mapped to their ASCII equivalents
+ENCODING_FIXES = str.maketrans({
+    '\u2018': "'",  # Left single quotation mark
+    '\u2019': "'",  # Right single quotation mark
+    '\u201c': '"',  # Left double quotation mark
+    '\u201d': '"',  # Right double quotation mark
+    '\u2013': '-',  # En dash
+    '\u2014': '-',  # Em dash
+    '\u2026': '...',  # Ellipsis
+    '\u00a0': ' ',  # Non-breaking space
+})
+
 class TextProcessor:
     """Text preprocessing and cleaning utilities"""
     
@@ -21,18 +50,23 @@ class TextProcessor:
             except LookupError:
                 nltk.download(dataset, quiet=True)
     
-    def preprocess(self, text):
+    def preprocess(self, text, return_sentences=False):
         """
         Comprehensive text preprocessing
         
         Args:
             text (str): Raw input text
+            return_sentences (bool): Also return sentence boundaries of the cleaned text
             
         Returns:
-            str: Cleaned and preprocessed text
+            str: Cleaned and preprocessed text, or (text, sentence spans) when
+                return_sentences is set, so later stages need not re-split it
         """
         if not text or not isinstance(text, str):
-            return ""
+            return ("", []) if return_sentences else ""
+        
+        # Fix common encoding issues before any characters are stripped
+        text = self._fix_encoding(text)
         
         # Basic cleaning
         text = self._clean_text(text)
@@ -40,91 +74,137 @@ class TextProcessor:
         # Remove extra whitespace
         text = self._normalize_whitespace(text)
         
-        # Fix common encoding issues
-        text = self._fix_encoding(text)
-        
         # Ensure proper sentence structure
-        text = self._fix_sentences(text)
+        text, spans = self._fix_sentences(text)
         
-        return text.strip()
+        if return_sentences:
+            return text, spans
+        return text
     
-    def _clean_text(self, text):
-        """Remove unwanted characters and formatting"""
-        # Remove HTML tags if present
-        text = re.sub(r'<[^>]+>', '', text)
+    def build_document(self, text):
+        """
+        Preprocess text and split it into a shared Document
         
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+        Args:
+            text (str): Raw input text
+            
+        Returns:
+            Document: Cleaned text with its sentence and word offsets
+        """
+        text, spans = self.preprocess(text, return_sentences=True)
+        return Document(text, spans)
+    
+    def preprocess_stream(self, blocks, segment_chars=SEGMENT_CHARS):
+        """
+        Preprocess text arriving in blocks, one bounded segment at a time
         
-        # Remove email addresses
-        text = re.sub(r'\S+@\S+', '', text)
+        Blocks are buffered until a segment is full and cut after its last
+        sentence, so only one segment of raw text is held at once.
         
-        # Remove excessive punctuation
-        text = re.sub(r'[.]{2,}', '.', text)
-        text = re.sub(r'[!]{2,}', '!', text)
-        text = re.sub(r'[?]{2,}', '?', text)
+        Args:
+            blocks (iterable): Pieces of raw text, e.g. from FileHandler.iter_text
+            segment_chars (int): Raw characters preprocessed together
+            
+        Yields:
+            tuple: (cleaned text, sentence spans) of each segment
+        """
+        buffer = ''
+        for block in blocks:
+            buffer += block
+            while len(buffer) >= segment_chars:
+                cut = self._segment_end(buffer, segment_chars)
+                yield self.preprocess(buffer[:cut], return_sentences=True)
+                buffer = buffer[cut:]
+        
+        if buffer.strip():
+            yield self.preprocess(buffer, return_sentences=True)
+    
+    def build_document_stream(self, blocks, segment_chars=SEGMENT_CHARS):
+        """
+        Build a Document from text arriving in blocks
         
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,!?;:()"\'-]', ' ', text)
+        Args:
+            blocks (iterable): Pieces of raw text
+            segment_chars (int): Raw characters preprocessed together
+            
+        Returns:
+            Document: Cleaned text of all segments with their sentence offsets
+        """
+        texts = []
+        spans = []
+        offset = 0
         
-        return text
-    
-    def _normalize_whitespace(self, text):
-        """Normalize whitespace and remove extra spaces"""
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
+        for text, segment_spans in self.preprocess_stream(blocks, segment_chars):
+            if not text:
+                continue
+            if texts:
+                offset += 1  # Segments are joined with a space
+            spans.extend((start + offset, end + offset) for start, end in segment_spans)
+            texts.append(text)
+            offset += len(text)
         
-        # Fix spacing around punctuation
-        text = re.sub(r'\s+([.,!?;:])', r'\1', text)
-        text = re.sub(r'([.,!?;:])\s*', r'\1 ', text)
+        return Document(' '.join(texts), spans)
+    
+    def _segment_end(self, buffer, limit):
+        """Where to cut a full buffer: after the last sentence, else at a line or word break"""
+        last_break = None
+        for match in SENTENCE_BREAK_PATTERN.finditer(buffer, limit // 2, limit):
+            last_break = match
+        if last_break:
+            return last_break.end()
+        
+        for separator in ('\n', ' '):
+            cut = buffer.rfind(separator, limit // 2, limit)
+            if cut != -1:
+                return cut + 1
+        return limit
+    
+    def _clean_text(self, text):
+        """Remove unwanted characters and formatting"""
+        # Remove HTML tags, URLs and email addresses
+        text = HTML_TAG_PATTERN.sub('', text)
+        text = URL_PATTERN.sub('', text)
+        text = EMAIL_PATTERN.sub('', text)
         
-        # Remove spaces at beginning and end of lines
-        text = '\n'.join(line.strip() for line in text.split('\n'))
+        # Remove excessive punctuation
+        text = REPEATED_PUNCTUATION_PATTERN.sub(r'\1', text)
         
-        return text
+        # Replace special characters and whitespace runs with a single space
+        return SEPARATOR_PATTERN.sub(' ', text)
+    
+    def _normalize_whitespace(self, text):
+        """Fix spacing around punctuation"""
+        return PUNCTUATION_SPACING_PATTERN.sub(r'\1 ', text).strip()
     
     def _fix_encoding(self, text):
         """Fix common encoding issues"""
-        # Replace common encoding artifacts
-        replacements = {
-            ''': "'", ''': "'", '"': '"', '"': '"',
-            '–': '-', '—': '-', '…': '...',
-            '\u00a0': ' ',  # Non-breaking space
-            '\u2019': "'",  # Right single quotation mark
-            '\u201c': '"',  # Left double quotation mark
-            '\u201d': '"',  # Right double quotation mark
-        }
-        
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-        
-        return text
+        return text.translate(ENCODING_FIXES)
     
     def _fix_sentences(self, text):
-        """Ensure proper sentence structure"""
-        # Split into sentences
-        sentences = sent_tokenize(text)
-        
-        # Clean each sentence
+        """Ensure proper sentence structure, returning the text and its sentence spans"""
         cleaned_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
+        spans = []
+        position = 0
+        
+        for start, end in sentence_spans(text):
+            sentence = text[start:end].strip()
             
             # Skip very short sentences
-            if len(sentence.split()) < 3:
+            if len(sentence.split(None, 2)) < 3:
                 continue
             
             # Ensure sentence ends with punctuation
-            if sentence and sentence[-1] not in '.!?':
+            if sentence[-1] not in '.!?':
                 sentence += '.'
             
             # Capitalize first letter
-            if sentence:
-                sentence = sentence[0].upper() + sentence[1:]
+            sentence = sentence[0].upper() + sentence[1:]
             
             cleaned_sentences.append(sentence)
+            spans.append((position, position + len(sentence)))
+            position += len(sentence) + 1
         
-        return ' '.join(cleaned_sentences)
+        return ' '.join(cleaned_sentences), spans
     
     def extract_keywords(self, text, top_n=10):
         """Extract important keywords from text"""
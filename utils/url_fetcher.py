@@ -0,0 +1,289 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import etree, html as lxml_html
+
+from utils.metrics import CACHE_REQUESTS
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/91.0.4472.124 Safari/537.36'
+)
+
+# Elements that never hold the policy text
+BOILERPLATE_TAGS = ('script', 'style', 'nav', 'footer', 'header')
+
+# Elements that usually hold a page's main content, most specific first
+CONTENT_XPATHS = (
+    '//article',
+    '//main',
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' post-content ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' entry-content ')]",
+    "//*[contains(concat(' ', normalize-space(@class), ' '), ' article-content ')]",
+    "//*[@id='content']",
+)
+
+
+def normalize_url(url):
+    """Add a protocol to bare host names (https by default)"""
+    if not isinstance(url, str):
+        raise ValueError(f"URL must be a string, not {type(url).__name__}")
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+
+def extract_html_text(content, encoding=None):
+    """
+    Extract the readable text of an HTML page
+
+    Scripts, styles and navigation are dropped; the text of the main content
+    elements is returned one element per line, or the whole body if the page
+    has none.
+
+    Args:
+        content (bytes): Raw HTML
+        encoding (str): Charset declared by the server (default: detect from the page)
+
+    Returns:
+        str: Extracted text
+    """
+    if not content or not content.strip():
+        return ""
+    parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+    try:
+        tree = lxml_html.document_fromstring(content, parser=parser)
+    except LookupError:
+        # Unknown charset in the headers; let the parser detect it
+        tree = lxml_html.document_fromstring(content)
+
+    # Removed elements keep their tail text, which belongs to the parent
+    etree.strip_elements(tree, etree.Comment, *BOILERPLATE_TAGS, with_tail=False)
+
+    def element_text(element):
+        return ' '.join(part.strip() for part in element.itertext() if part.strip())
+
+    lines = []
+    for xpath in CONTENT_XPATHS:
+        elements = tree.xpath(xpath)
+        if elements:
+            lines = [element_text(element) for element in elements]
+            break
+
+    if not any(lines):
+        body = tree.find('body')
+        lines = [element_text(body)] if body is not None else []
+
+    lines = [line.strip() for text in lines for line in text.split('\n') if line.strip()]
+    return '\n'.join(lines)
+
+
+class HTTPCache:
+    """On-disk copies of fetched pages with the validators needed to revalidate them"""
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Directory holding one body and one metadata file per URL
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, name)
+        return base + '.json', base + '.body'
+
+    def get(self, url):
+        """Return the cached entry for a URL (metadata plus 'content'), or None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            with open(body_path, 'rb') as file:
+                entry['content'] = file.read()
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url:
+            return None
+        return entry
+
+    def set(self, url, content, etag=None, last_modified=None, content_type=None, encoding=None):
+        """Store a page; the body is written before the metadata that points to it"""
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_type': content_type,
+            'encoding': encoding,
+        }
+        try:
+            self._write(body_path, content)
+            self._write(meta_path, json.dumps(entry).encode('utf-8'))
+        except OSError as e:
+            self.logger.error(f"Error caching {url}: {str(e)}")
+
+    @staticmethod
+    def _write(path, data):
+        """Write a file atomically so concurrent readers never see a partial copy"""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+
+class URLFetcher:
+    """
+    Fetch pages over pooled connections, many at a time
+
+    Connections are kept alive in a shared session, at most max_per_host
+    requests run against one host at a time, and with a cache directory,
+    pages are revalidated with If-None-Match/If-Modified-Since so unchanged
+    pages are not downloaded again.
+    """
+
+    def __init__(self, cache_dir=None, max_per_host=4, max_workers=16, timeout=30,
+                 user_agent=DEFAULT_USER_AGENT):
+        """
+        Args:
+            cache_dir (str): Directory for the HTTP cache (disabled if not set)
+            max_per_host (int): Concurrent requests allowed against one host
+            max_workers (int): Concurrent requests in total for fetch_many
+            timeout (float): Connect and read timeout in seconds
+            user_agent (str): User-Agent header sent with every request
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_per_host = max(1, int(max_per_host))
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+
+        self._lock = threading.Lock()
+        self._host_slots = {}
+        self._session = None
+        self._pid = None
+
+    def session(self):
+        """Return the shared session, recreated after a fork so workers do not share sockets"""
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers['User-Agent'] = self.user_agent
+                self._session = session
+                self._pid = os.getpid()
+            return self._session
+
+    def _host_slot(self, url):
+        """Semaphore limiting concurrent requests against the URL's host"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def fetch(self, url):
+        """
+        Fetch one page, revalidating a cached copy if there is one
+
+        Args:
+            url (str): Page URL (https:// is assumed if no protocol is given)
+
+        Returns:
+            dict: 'url', 'status', 'content' (bytes), 'content_type', 'encoding'
+                and 'from_cache' (True if the server confirmed the cached copy)
+
+        Raises:
+            requests.RequestException: If the request fails or returns an error status
+        """
+        url = normalize_url(url)
+        cached = self.cache.get(url) if self.cache else None
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        with self._host_slot(url):
+            response = self.session().get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and cached:
+            CACHE_REQUESTS.inc(cache='http', result='revalidated')
+            return {
+                'url': url,
+                'status': 304,
+                'content': cached['content'],
+                'content_type': cached.get('content_type'),
+                'encoding': cached.get('encoding'),
+                'from_cache': True,
+            }
+
+        response.raise_for_status()
+        if self.cache:
+            CACHE_REQUESTS.inc(cache='http', result='miss')
+
+        content_type = response.headers.get('Content-Type', '')
+        # Only a charset the server states explicitly; otherwise the page's <meta> decides
+        match = re.search(r'charset=["\']?([\w.:-]+)', content_type, re.IGNORECASE)
+        encoding = match.group(1) if match else None
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        cacheable = 'no-store' not in response.headers.get('Cache-Control', '').lower()
+        if self.cache and cacheable and (etag or last_modified):
+            self.cache.set(url, response.content, etag=etag, last_modified=last_modified,
+                           content_type=content_type, encoding=encoding)
+
+        return {
+            'url': url,
+            'status': response.status_code,
+            'content': response.content,
+            'content_type': content_type,
+            'encoding': encoding,
+            'from_cache': False,
+        }
+
+    def fetch_many(self, urls):
+        """
+        Fetch many pages concurrently, within the per-host limit
+
+        Args:
+            urls (list): Page URLs
+
+        Returns:
+            list: One result per URL, in order, as returned by fetch(); a failed
+                URL gets a dict with 'url' and 'error' instead
+        """
+        def fetch_one(url):
+            try:
+                return self.fetch(url)
+            except requests.RequestException as e:
+                self.logger.error(f"Error fetching URL {url}: {str(e)}")
+                return {'url': url, 'error': str(e)}
+            except Exception as e:
+                # A bad entry (e.g. not a string) must not abort the rest of the batch
+                self.logger.error(f"Error fetching URL {url!r}: {str(e)}")
+                return {'url': url, 'error': str(e)}
+
+        if not urls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return list(executor.map(fetch_one, urls))